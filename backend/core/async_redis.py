@@ -0,0 +1,59 @@
+"""
+Asyncio Redis client used by the async code paths of `core.cache`.
+
+It connects to the same Redis as the `default` django_redis cache, and values go through
+the cache's own serializer and compressor (`cache.client.encode/decode`), so sync and
+async workers read and write the same entries.
+
+Asyncio connections are bound to the event loop that opened them: each loop gets its own
+client, whose connection pool is shared by every coroutine running on that loop.
+"""
+
+from typing import Any, Dict, Optional
+import asyncio
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.asyncio import ConnectionPool, Redis
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_redis() -> Redis:
+    """Returns the client of the running event loop, creating its connection pool if needed."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        config = settings.CACHES["default"]
+        pool = ConnectionPool.from_url(config["LOCATION"], **_connection_pool_kwargs(config))
+        client = Redis(connection_pool=pool)
+        _clients[loop] = client
+    return client
+
+
+def _connection_pool_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+    options = config.get("OPTIONS", {})
+    kwargs = dict(options.get("CONNECTION_POOL_KWARGS", {}))
+    if "SOCKET_CONNECT_TIMEOUT" in options:
+        kwargs["socket_connect_timeout"] = options["SOCKET_CONNECT_TIMEOUT"]
+    if "SOCKET_TIMEOUT" in options:
+        kwargs["socket_timeout"] = options["SOCKET_TIMEOUT"]
+    return kwargs
+
+
+def make_key(key: str) -> str:
+    """Full Redis key of a cache key, as django_redis builds it."""
+    return cache.make_key(key)
+
+
+def encode(value: Any) -> Any:
+    return cache.client.encode(value)
+
+
+def decode(value: Optional[bytes]) -> Any:
+    if value is None:
+        return None
+    return cache.client.decode(value)
@@ -1,116 +1,1086 @@
-# File: backend/core/cache.py
 from functools import wraps
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
 from django.core.cache import cache
-from django.http import HttpRequest
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseNotModified
+from django.http.response import HttpResponseBase
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+import asyncio
 import hashlib
 import json
+import math
+import random
+import re
+import time
+import uuid
+
+from core import async_redis, metrics
+from core.cache_warming import CACHE_WARMING_ATTRIBUTE, arecord_params, record_params
+from core.db_router import use_replica
+from core.local_cache import (
+    TierStats,
+    get_local_cache_info,
+    is_coherent,
+    local_cache,
+    publish_invalidation,
+)
+
+LOCK_SUFFIX = "lock"
+LOCK_POLL_INTERVAL = 0.05  # seconds
+GENERATION_KEY_PREFIX = "cache:gen"
+GENERATION_LOCAL_TIMEOUT = 30  # seconds
+SCAN_BATCH_SIZE = 500
+
+TIER_LOCAL = "local"
+TIER_REDIS = "redis"
+
+redis_stats = TierStats()
+# Key prefixes of the decorated views, to label the invalidations of their object tags
+_key_prefixes: Set[str] = set()
+# `<key_prefix>:g<generations>[...]`, see `_format_cache_key`
+CACHE_KEY_REGEX = re.compile(r"^(?P<prefix>.+?):g\d+(\.\d+)*(:|$)")
+GLOB_CHARACTERS_REGEX = re.compile(r"[*?\[]")
 
 
 def cache_api_response(
     timeout: int = 300,
     key_prefix: Optional[str] = None,
     vary_on_user: bool = False,
-    vary_on_params: bool = True,
+    vary_on_params: Union[bool, Sequence[str]] = True,
+    stale_timeout: int = 0,
+    lock_timeout: int = 10,
+    early_expiry_beta: float = 1.0,
+    jitter: float = 0.1,
+    negative_timeout: int = 0,
+    cache_rendered: bool = False,
+    local_timeout: int = 0,
+    object_kwarg: Optional[str] = None,
+    track_params: bool = False,
+    max_entry_bytes: Optional[int] = None,
 ) -> Callable:
     """
     Decorator to cache API responses using Redis.
 
+    Entries are stored with their soft expiry and the time it took to compute them,
+    which allows the decorator to protect hot keys against cache stampedes:
+
+    - Only one worker recomputes a key at a time (short Redis lock), the others
+      wait for its result instead of hitting the database as well.
+    - Once the entry is past its soft expiry, it is still served for
+      `stale_timeout` seconds while the lock owner refreshes it.
+    - Entries may be recomputed slightly before their expiry, with a probability
+      growing as the expiry approaches and as the computation gets slower.
+    - The timeout is randomly jittered so that keys cached together do not expire together.
+
+    Both sync and async views can be decorated. Async views (`async def`) talk to Redis
+    through the asyncio client of `core.async_redis` and never block the event loop.
+    They share their keys and entries with the sync views.
+
     Args:
         timeout: Cache timeout in seconds (default: 300 = 5 minutes)
         key_prefix: Optional prefix for cache keys
         vary_on_user: If True, cache separately per authenticated user
         vary_on_params: If True, include query parameters in cache key
+            (only the named ones if a sequence of names is given)
+        stale_timeout: How long (in seconds) an expired entry can be served while it is being refreshed
+        lock_timeout: Maximum duration (in seconds) of the recomputation lock
+        early_expiry_beta: Aggressiveness of the early recomputation (0 to disable)
+        jitter: Maximum relative variation applied to the timeout (e.g. 0.1 for +/- 10%)
+        negative_timeout: If set, 404 responses are cached for that many seconds
+        cache_rendered: If True, cache the rendered body (with its content type and a strong
+            ETag) instead of `response.data`. Hits then skip unpickling and rendering entirely,
+            and requests with a matching `If-None-Match` get a 304. Required to cache plain
+            Django responses, which have no `data`.
+        local_timeout: If set, entries are also kept for that many seconds in the worker's
+            memory (see `core.local_cache`), saving the Redis round trip on very hot keys.
+        object_kwarg: URL kwarg identifying the object of a detail view (e.g. "pk"). Entries are
+            then also tagged with `object_tag(key_prefix, <value>)`, to invalidate a single object.
+        track_params: If True, count how often each query string is requested, so that
+            the most requested ones can be warmed (see `core.cache_warming`)
+        max_entry_bytes: Responses larger than this are not cached
+            (default: `settings.API_CACHE_MAX_ENTRY_BYTES`)
+
+    Each `key_prefix` has a generation folded into the cache keys: see `invalidate_cache_tags`.
 
     Example:
-        @cache_api_response(timeout=600, key_prefix="products")
+        @cache_api_response(timeout=600, key_prefix="products", stale_timeout=60)
         def list(self, request):
             return super().list(request)
+
+        @cache_api_response(timeout=600, key_prefix="products:export", cache_rendered=True)
+        async def get(self, request):
+            ...
     """
+    if key_prefix is not None:
+        _key_prefixes.add(key_prefix)
+
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(self, request: HttpRequest, *args: Any, **kwargs: Any) -> Response:
-            # Build cache key
-            cache_key_parts = []
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(
+                self, request: HttpRequest, *args: Any, **kwargs: Any
+            ) -> HttpResponseBase:
+                prefix = key_prefix or f"{self.__class__.__name__}.{func.__name__}"
+                cache_key = await _abuild_cache_key(
+                    self,
+                    func,
+                    request,
+                    kwargs,
+                    prefix,
+                    vary_on_user,
+                    vary_on_params,
+                    object_kwarg=object_kwarg,
+                )
+                if cache_rendered:
+                    cache_key = _with_media_type(cache_key, request)
 
-            # Add prefix
-            if key_prefix:
-                cache_key_parts.append(key_prefix)
-            else:
-                cache_key_parts.append(f"{self.__class__.__name__}.{func.__name__}")
+                # Cache warming always recomputes the entry
+                warming = getattr(request, CACHE_WARMING_ATTRIBUTE, False)
+                if warming:
+                    entry, tier = None, TIER_REDIS
+                else:
+                    entry, tier = await _aget_entry(cache_key, prefix, local_timeout)
+                    if track_params and request.GET:
+                        await arecord_params(prefix, dict(request.GET), hit=entry is not None)
+
+                # Try to get cached response
+                if entry is not None and not _should_recompute(entry, early_expiry_beta):
+                    metrics.api_cache_hits_total.labels(prefix, tier).inc()
+                    return _entry_to_response(entry, request)
+
+                # Only one worker at a time recomputes the entry
+                lock_token = await _aacquire_lock(cache_key, lock_timeout)
+                if lock_token is None and not warming:
+                    if entry is not None:
+                        return _serve_while_locked(entry, prefix, tier, request)
+                    entry, tier = await _await_for_entry(
+                        cache_key, prefix, lock_timeout, local_timeout
+                    )
+                    if entry is not None:
+                        metrics.api_cache_hits_total.labels(prefix, tier).inc()
+                        return _entry_to_response(entry, request)
+
+                if not warming:
+                    metrics.api_cache_misses_total.labels(prefix).inc()
 
-            # Add user ID if varying on user
-            if vary_on_user and hasattr(request, "user") and request.user.is_authenticated:
-                cache_key_parts.append(f"user:{request.user.id}")
+                try:
+                    return await _acompute_and_store(
+                        func,
+                        self,
+                        request,
+                        args,
+                        kwargs,
+                        cache_key=cache_key,
+                        prefix=prefix,
+                        timeout=_jittered(timeout, jitter),
+                        stale_timeout=stale_timeout,
+                        negative_timeout=negative_timeout,
+                        cache_rendered=cache_rendered,
+                        local_timeout=local_timeout,
+                        max_entry_bytes=max_entry_bytes,
+                    )
+                finally:
+                    if lock_token is not None:
+                        await _arelease_lock(cache_key, lock_token)
 
-            # Add query parameters if varying on params
-            if vary_on_params and request.GET:
-                params_hash = hashlib.md5(
-                    json.dumps(dict(request.GET), sort_keys=True).encode()
-                ).hexdigest()
-                cache_key_parts.append(f"params:{params_hash}")
+            return async_wrapper
 
-            # Add URL kwargs (like pk for detail views)
-            if kwargs:
-                kwargs_hash = hashlib.md5(
-                    json.dumps(kwargs, sort_keys=True).encode()
-                ).hexdigest()
-                cache_key_parts.append(f"kwargs:{kwargs_hash}")
+        @wraps(func)
+        def wrapper(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+            prefix = key_prefix or f"{self.__class__.__name__}.{func.__name__}"
+            cache_key = _build_cache_key(
+                self,
+                func,
+                request,
+                kwargs,
+                prefix,
+                vary_on_user,
+                vary_on_params,
+                object_kwarg=object_kwarg,
+            )
+            if cache_rendered:
+                cache_key = _with_media_type(cache_key, request)
 
-            cache_key = ":".join(cache_key_parts)
+            # Cache warming always recomputes the entry
+            warming = getattr(request, CACHE_WARMING_ATTRIBUTE, False)
+            if warming:
+                entry, tier = None, TIER_REDIS
+            else:
+                entry, tier = _get_entry(cache_key, prefix, local_timeout)
+                if track_params and request.GET:
+                    record_params(prefix, dict(request.GET), hit=entry is not None)
 
             # Try to get cached response
-            cached_response = cache.get(cache_key)
-            if cached_response is not None:
-                return Response(cached_response)
+            if entry is not None and not _should_recompute(entry, early_expiry_beta):
+                metrics.api_cache_hits_total.labels(prefix, tier).inc()
+                return _entry_to_response(entry, request)
 
-            # Call the original function
-            response = func(self, request, *args, **kwargs)
+            # Only one worker at a time recomputes the entry
+            lock_token = _acquire_lock(cache_key, lock_timeout)
+            if lock_token is None and not warming:
+                if entry is not None:
+                    return _serve_while_locked(entry, prefix, tier, request)
+                entry, tier = _wait_for_entry(cache_key, prefix, lock_timeout, local_timeout)
+                if entry is not None:
+                    metrics.api_cache_hits_total.labels(prefix, tier).inc()
+                    return _entry_to_response(entry, request)
 
-            # Cache successful responses
-            if hasattr(response, "data") and 200 <= response.status_code < 300:
-                cache.set(cache_key, response.data, timeout)
+            if not warming:
+                metrics.api_cache_misses_total.labels(prefix).inc()
 
-            return response
+            try:
+                return _compute_and_store(
+                    func,
+                    self,
+                    request,
+                    args,
+                    kwargs,
+                    cache_key=cache_key,
+                    prefix=prefix,
+                    timeout=_jittered(timeout, jitter),
+                    stale_timeout=stale_timeout,
+                    negative_timeout=negative_timeout,
+                    cache_rendered=cache_rendered,
+                    local_timeout=local_timeout,
+                    max_entry_bytes=max_entry_bytes,
+                )
+            finally:
+                if lock_token is not None:
+                    _release_lock(cache_key, lock_token)
 
         return wrapper
     return decorator
 
 
+def _build_cache_key(
+    view: Any,
+    func: Callable,
+    request: HttpRequest,
+    kwargs: Dict[str, Any],
+    key_prefix: Optional[str],
+    vary_on_user: bool,
+    vary_on_params: Union[bool, Sequence[str]],
+    object_kwarg: Optional[str] = None,
+) -> str:
+    prefix = key_prefix or f"{view.__class__.__name__}.{func.__name__}"
+    generations = get_generations(*_generation_tags(prefix, kwargs, object_kwarg))
+    user = getattr(request, "user", None) if vary_on_user else None
+    return _format_cache_key(prefix, generations, request, kwargs, user, vary_on_params)
+
+
+async def _abuild_cache_key(
+    view: Any,
+    func: Callable,
+    request: HttpRequest,
+    kwargs: Dict[str, Any],
+    key_prefix: Optional[str],
+    vary_on_user: bool,
+    vary_on_params: Union[bool, Sequence[str]],
+    object_kwarg: Optional[str] = None,
+) -> str:
+    prefix = key_prefix or f"{view.__class__.__name__}.{func.__name__}"
+    generations = await aget_generations(*_generation_tags(prefix, kwargs, object_kwarg))
+    user = None
+    if vary_on_user:
+        # `request.user` would hit the database synchronously on first access
+        if hasattr(request, "auser"):
+            user = await request.auser()
+        else:
+            user = getattr(request, "user", None)
+    return _format_cache_key(prefix, generations, request, kwargs, user, vary_on_params)
+
+
+def _generation_tags(prefix: str, kwargs: Dict[str, Any], object_kwarg: Optional[str]) -> List[str]:
+    if object_kwarg and object_kwarg in kwargs:
+        return [prefix, object_tag(prefix, kwargs[object_kwarg])]
+    return [prefix]
+
+
+def _format_cache_key(
+    prefix: str,
+    generations: List[int],
+    request: Optional[HttpRequest],
+    kwargs: Dict[str, Any],
+    user: Optional[Any],
+    vary_on_params: Union[bool, Sequence[str]],
+) -> str:
+    # Add prefix and its generation, so the whole namespace can be invalidated at once
+    cache_key_parts = [prefix, "g" + ".".join(str(generation) for generation in generations)]
+
+    # Add user ID if varying on user
+    if user is not None and user.is_authenticated:
+        cache_key_parts.append(f"user:{user.id}")
+
+    # Add query parameters if varying on params
+    params = dict(request.GET) if vary_on_params and request is not None else {}
+    if params and vary_on_params is not True:
+        params = {name: value for name, value in params.items() if name in vary_on_params}
+    if params:
+        params_hash = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        cache_key_parts.append(f"params:{params_hash}")
+
+    # Add URL kwargs (like pk for detail views)
+    if kwargs:
+        kwargs_hash = hashlib.md5(
+            json.dumps(kwargs, sort_keys=True).encode()
+        ).hexdigest()
+        cache_key_parts.append(f"kwargs:{kwargs_hash}")
+
+    return ":".join(cache_key_parts)
+
+
+def _with_media_type(cache_key: str, request: HttpRequest) -> str:
+    # The rendered body depends on the negotiated renderer
+    media_type = getattr(request, "accepted_media_type", None)
+    if media_type:
+        return f"{cache_key}:media:{media_type}"
+    return cache_key
+
+
+def _compute_and_store(
+    func: Callable,
+    view: Any,
+    request: HttpRequest,
+    args: Any,
+    kwargs: Dict[str, Any],
+    *,
+    cache_key: str,
+    prefix: str,
+    timeout: float,
+    stale_timeout: int,
+    negative_timeout: int,
+    cache_rendered: bool,
+    local_timeout: int,
+    max_entry_bytes: Optional[int],
+) -> HttpResponseBase:
+    start = time.monotonic()
+    # Computed on the primary: a lagging replica would store rows older than the generation
+    # folded into the key, served until the entry expires (see core.db_router)
+    with use_replica(None):
+        try:
+            response = func(view, request, *args, **kwargs)
+        except (Http404, NotFound) as e:
+            if negative_timeout:
+                entry = _not_found_entry(e, start, negative_timeout)
+                _set_entry(cache_key, prefix, local_timeout=local_timeout, **entry)
+            raise
+        response, entry = _prepare_entry(
+            view,
+            request,
+            response,
+            args,
+            kwargs,
+            prefix=prefix,
+            start=start,
+            timeout=timeout,
+            stale_timeout=stale_timeout,
+            negative_timeout=negative_timeout,
+            cache_rendered=cache_rendered,
+            max_entry_bytes=max_entry_bytes,
+        )
+    if entry is not None:
+        _set_entry(cache_key, prefix, local_timeout=local_timeout, **entry)
+    return response
+
+
+async def _acompute_and_store(
+    func: Callable,
+    view: Any,
+    request: HttpRequest,
+    args: Any,
+    kwargs: Dict[str, Any],
+    *,
+    cache_key: str,
+    prefix: str,
+    timeout: float,
+    stale_timeout: int,
+    negative_timeout: int,
+    cache_rendered: bool,
+    local_timeout: int,
+    max_entry_bytes: Optional[int],
+) -> HttpResponseBase:
+    start = time.monotonic()
+    # Computed on the primary: a lagging replica would store rows older than the generation
+    # folded into the key, served until the entry expires (see core.db_router)
+    with use_replica(None):
+        try:
+            response = await func(view, request, *args, **kwargs)
+        except (Http404, NotFound) as e:
+            if negative_timeout:
+                entry = _not_found_entry(e, start, negative_timeout)
+                await _aset_entry(cache_key, prefix, local_timeout=local_timeout, **entry)
+            raise
+        response, entry = _prepare_entry(
+            view,
+            request,
+            response,
+            args,
+            kwargs,
+            prefix=prefix,
+            start=start,
+            timeout=timeout,
+            stale_timeout=stale_timeout,
+            negative_timeout=negative_timeout,
+            cache_rendered=cache_rendered,
+            max_entry_bytes=max_entry_bytes,
+        )
+    if entry is not None:
+        await _aset_entry(cache_key, prefix, local_timeout=local_timeout, **entry)
+    return response
+
+
+def _not_found_entry(error: Exception, start: float, negative_timeout: int) -> Dict[str, Any]:
+    return {
+        "data": {"detail": str(error) or NotFound.default_detail},
+        "status_code": 404,
+        "delta": time.monotonic() - start,
+        "timeout": negative_timeout,
+        "stale_timeout": 0,
+    }
+
+
+def _prepare_entry(
+    view: Any,
+    request: HttpRequest,
+    response: HttpResponseBase,
+    args: Any,
+    kwargs: Dict[str, Any],
+    *,
+    prefix: str,
+    start: float,
+    timeout: float,
+    stale_timeout: int,
+    negative_timeout: int,
+    cache_rendered: bool,
+    max_entry_bytes: Optional[int],
+) -> Tuple[HttpResponseBase, Optional[Dict[str, Any]]]:
+    """
+    Returns the response to send, and the arguments of `_set_entry` if it must be cached.
+    Rendered responses get their ETag, and become a 304 if the client already has them.
+    """
+    if cache_rendered and 200 <= response.status_code < 300:
+        response = _render_response(view, request, response, args, kwargs)
+    delta = time.monotonic() - start
+    metrics.api_cache_compute_seconds.labels(prefix).observe(delta)
+
+    # Cache successful responses
+    if cache_rendered and 200 <= response.status_code < 300:
+        content = response.content
+        etag = _make_etag(content)
+        entry = {
+            "data": content,
+            "status_code": response.status_code,
+            "delta": delta,
+            "timeout": timeout,
+            "stale_timeout": stale_timeout,
+            "max_entry_bytes": max_entry_bytes,
+            "content_type": response["Content-Type"],
+            "etag": etag,
+        }
+        response["ETag"] = etag
+        if _etag_matches(request, etag):
+            return _not_modified(etag), entry
+        return response, entry
+    if hasattr(response, "data") and 200 <= response.status_code < 300:
+        return response, {
+            "data": response.data,
+            "status_code": response.status_code,
+            "delta": delta,
+            "timeout": timeout,
+            "stale_timeout": stale_timeout,
+            "max_entry_bytes": max_entry_bytes,
+        }
+    if negative_timeout and hasattr(response, "data") and response.status_code == 404:
+        return response, {
+            "data": response.data,
+            "status_code": 404,
+            "delta": delta,
+            "timeout": negative_timeout,
+            "stale_timeout": 0,
+        }
+    return response, None
+
+
+def _render_response(
+    view: Any, request: HttpRequest, response: HttpResponseBase, args: Any, kwargs: Dict[str, Any]
+) -> HttpResponseBase:
+    """Renders a DRF response right away, as `APIView.dispatch` would after the handler."""
+    if isinstance(response, Response) and not response.is_rendered:
+        response = view.finalize_response(request, response, *args, **kwargs)
+        response.render()
+    return response
+
+
+def _make_etag(content: bytes) -> str:
+    return f'"{hashlib.md5(content).hexdigest()}"'
+
+
+def _etag_matches(request: HttpRequest, etag: str) -> bool:
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison (e.g. after GZipMiddleware weakened the ETag)
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified(etag: str) -> HttpResponseNotModified:
+    response = HttpResponseNotModified()
+    response["ETag"] = etag
+    return response
+
+
+def _get_entry(
+    cache_key: str, prefix: str, local_timeout: int = 0
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Returns the cached entry, if any, and the tier it was found in."""
+    entry = _get_local_entry(cache_key, local_timeout)
+    if entry is not None:
+        return entry, TIER_LOCAL
+
+    with metrics.api_cache_redis_seconds.labels(prefix, "get").time():
+        encoded = cache.client.get_client(write=False).get(async_redis.make_key(cache_key))
+    return _accept_redis_entry(cache_key, encoded, local_timeout), TIER_REDIS
+
+
+async def _aget_entry(
+    cache_key: str, prefix: str, local_timeout: int = 0
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    entry = _get_local_entry(cache_key, local_timeout)
+    if entry is not None:
+        return entry, TIER_LOCAL
+
+    redis_conn = async_redis.get_async_redis()
+    with metrics.api_cache_redis_seconds.labels(prefix, "get").time():
+        encoded = await redis_conn.get(async_redis.make_key(cache_key))
+    return _accept_redis_entry(cache_key, encoded, local_timeout), TIER_REDIS
+
+
+def _get_local_entry(cache_key: str, local_timeout: int) -> Optional[Dict[str, Any]]:
+    if not local_timeout:
+        return None
+    is_coherent()  # Makes sure this worker listens to invalidations
+    entry = local_cache.get(cache_key)
+    # Expired local entries are re-read from Redis, where another worker may have refreshed them
+    if entry is not None and time.time() < entry["expires_at"]:
+        return entry
+    return None
+
+
+def _accept_redis_entry(
+    cache_key: str, encoded: Optional[bytes], local_timeout: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Decodes an entry read from Redis. Its encoded size is what the local tier accounts for,
+    as for the entries stored by this worker (see `_make_entry`).
+    """
+    redis_stats.record(encoded is not None)
+    entry = async_redis.decode(encoded)
+    # Ignore values stored by previous versions of the decorator
+    if not isinstance(entry, dict) or "expires_at" not in entry:
+        return None
+    if local_timeout:
+        local_cache.set(cache_key, entry, local_timeout, size=len(encoded))
+    return entry
+
+
+def _set_entry(
+    cache_key: str,
+    prefix: str,
+    data: Any,
+    status_code: int,
+    delta: float,
+    timeout: float,
+    stale_timeout: int,
+    local_timeout: int = 0,
+    max_entry_bytes: Optional[int] = None,
+    content_type: Optional[str] = None,
+    etag: Optional[str] = None,
+) -> None:
+    made = _make_entry(
+        prefix, data, status_code, delta, timeout, max_entry_bytes, content_type, etag
+    )
+    if made is None:
+        return
+    entry, encoded = made
+    # The entry physically lives longer than its soft expiry so it can be served stale
+    with metrics.api_cache_redis_seconds.labels(prefix, "set").time():
+        _set_encoded({cache_key: encoded}, math.ceil(timeout + stale_timeout))
+    if local_timeout:
+        local_timeout = min(local_timeout, timeout + stale_timeout)
+        local_cache.set(cache_key, entry, local_timeout, size=len(encoded))
+
+
+async def _aset_entry(
+    cache_key: str,
+    prefix: str,
+    data: Any,
+    status_code: int,
+    delta: float,
+    timeout: float,
+    stale_timeout: int,
+    local_timeout: int = 0,
+    max_entry_bytes: Optional[int] = None,
+    content_type: Optional[str] = None,
+    etag: Optional[str] = None,
+) -> None:
+    made = _make_entry(
+        prefix, data, status_code, delta, timeout, max_entry_bytes, content_type, etag
+    )
+    if made is None:
+        return
+    entry, encoded = made
+    redis_conn = async_redis.get_async_redis()
+    with metrics.api_cache_redis_seconds.labels(prefix, "set").time():
+        await redis_conn.set(
+            async_redis.make_key(cache_key), encoded, ex=math.ceil(timeout + stale_timeout)
+        )
+    if local_timeout:
+        local_timeout = min(local_timeout, timeout + stale_timeout)
+        local_cache.set(cache_key, entry, local_timeout, size=len(encoded))
+
+
+def _make_entry(
+    prefix: str,
+    data: Any,
+    status_code: int,
+    delta: float,
+    timeout: float,
+    max_entry_bytes: Optional[int],
+    content_type: Optional[str],
+    etag: Optional[str],
+) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    Builds the entry to store and encodes it as written to Redis (serialized and compressed),
+    or returns None if the encoded entry exceeds the maximum entry size.
+    """
+    entry = {
+        "data": data,
+        "status": status_code,
+        "delta": delta,
+        "expires_at": time.time() + timeout,
+    }
+    if etag is not None:
+        entry["content_type"] = content_type
+        entry["etag"] = etag
+
+    encoded = async_redis.encode(entry)
+    metrics.api_cache_payload_bytes.labels(prefix).observe(len(encoded))
+    if max_entry_bytes is None:
+        max_entry_bytes = settings.API_CACHE_MAX_ENTRY_BYTES
+    if len(encoded) > max_entry_bytes:
+        metrics.api_cache_rejected_total.labels(prefix).inc()
+        return None
+    return entry, encoded
+
+
+def _set_encoded(entries: Dict[str, bytes], timeout: int) -> None:
+    """Writes entries already encoded by `_make_entry`, in a single pipeline."""
+    client = cache.client.get_client(write=True)
+    with client.pipeline() as pipeline:
+        for cache_key, encoded in entries.items():
+            pipeline.set(async_redis.make_key(cache_key), encoded, ex=timeout)
+        pipeline.execute()
+
+
+def _entry_to_response(entry: Dict[str, Any], request: HttpRequest) -> HttpResponseBase:
+    etag = entry.get("etag")
+    if etag is None:
+        return Response(entry["data"], status=entry["status"])
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    response = HttpResponse(
+        entry["data"], status=entry["status"], content_type=entry["content_type"]
+    )
+    response["ETag"] = etag
+    return response
+
+
+def _serve_while_locked(
+    entry: Dict[str, Any], prefix: str, tier: str, request: HttpRequest
+) -> HttpResponseBase:
+    """Serves the current entry, possibly stale, while the lock owner refreshes it."""
+    if time.time() >= entry["expires_at"]:
+        metrics.api_cache_stale_total.labels(prefix).inc()
+    else:
+        metrics.api_cache_hits_total.labels(prefix, tier).inc()
+    return _entry_to_response(entry, request)
+
+
+def _should_recompute(entry: Dict[str, Any], beta: float) -> bool:
+    """
+    Probabilistic early expiration (XFetch): the closer we get to the expiry
+    and the longer the entry took to compute, the likelier we recompute it early.
+    """
+    now = time.time()
+    if now >= entry["expires_at"]:
+        return True
+    if beta <= 0 or entry["status"] == 404:
+        return False
+    return now - entry["delta"] * beta * math.log(1 - random.random()) >= entry["expires_at"]
+
+
+def _jittered(timeout: int, jitter: float) -> float:
+    if jitter <= 0:
+        return timeout
+    return timeout * random.uniform(1 - jitter, 1 + jitter)
+
+
+def _acquire_lock(cache_key: str, lock_timeout: int) -> Optional[str]:
+    token = uuid.uuid4().hex
+    if cache.add(f"{cache_key}:{LOCK_SUFFIX}", token, lock_timeout):
+        return token
+    return None
+
+
+def _release_lock(cache_key: str, token: str) -> None:
+    lock_key = f"{cache_key}:{LOCK_SUFFIX}"
+    # Do not release a lock that expired and was acquired by another worker
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _wait_for_entry(
+    cache_key: str, prefix: str, lock_timeout: int, local_timeout: int
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Waits for the lock owner to store the entry, or gives up when its lock expires."""
+    lock_key = f"{cache_key}:{LOCK_SUFFIX}"
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry, tier = _get_entry(cache_key, prefix, local_timeout)
+        if entry is not None:
+            return entry, tier
+        if cache.get(lock_key) is None:
+            break
+    return None, TIER_REDIS
+
+
+async def _aacquire_lock(cache_key: str, lock_timeout: int) -> Optional[str]:
+    token = uuid.uuid4().hex
+    redis_conn = async_redis.get_async_redis()
+    lock_key = async_redis.make_key(f"{cache_key}:{LOCK_SUFFIX}")
+    if await redis_conn.set(lock_key, async_redis.encode(token), nx=True, ex=lock_timeout):
+        return token
+    return None
+
+
+async def _arelease_lock(cache_key: str, token: str) -> None:
+    redis_conn = async_redis.get_async_redis()
+    lock_key = async_redis.make_key(f"{cache_key}:{LOCK_SUFFIX}")
+    # Do not release a lock that expired and was acquired by another worker
+    if async_redis.decode(await redis_conn.get(lock_key)) == token:
+        await redis_conn.delete(lock_key)
+
+
+async def _await_for_entry(
+    cache_key: str, prefix: str, lock_timeout: int, local_timeout: int
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    redis_conn = async_redis.get_async_redis()
+    lock_key = async_redis.make_key(f"{cache_key}:{LOCK_SUFFIX}")
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        entry, tier = await _aget_entry(cache_key, prefix, local_timeout)
+        if entry is not None:
+            return entry, tier
+        if not await redis_conn.exists(lock_key):
+            break
+    return None, TIER_REDIS
+
+
+def get_cached_objects(
+    key_prefix: str,
+    pks: Sequence[Any],
+    load: Callable[[List[Any]], Dict[Any, Any]],
+    timeout: int = 300,
+    object_kwarg: str = "pk",
+    stale_timeout: int = 0,
+    jitter: float = 0.1,
+) -> Dict[Any, Any]:
+    """
+    Returns the data of several objects, sharing the entries of a detail view decorated with
+    `cache_api_response(key_prefix=key_prefix, object_kwarg=object_kwarg)` (requested without
+    query parameters, and caching `response.data`).
+
+    All generations are read with a single MGET, then all entries with another one. The objects
+    without a fresh entry are loaded in a single call of `load` and cached with a single
+    pipeline. Entries cached as 404 are left out.
+
+    Args:
+        key_prefix: Key prefix of the detail view
+        pks: Primary keys of the objects, as their URL kwarg
+        load: Returns the data of the objects of the given primary keys, by primary key
+            (ideally from a single query). Objects that do not exist are simply left out.
+        timeout, stale_timeout, jitter: As given to `cache_api_response` for the detail view
+        object_kwarg: URL kwarg identifying the object in the detail view
+
+    Returns:
+        The data of the objects found, by primary key
+    """
+    if not pks:
+        return {}
+    generations = get_generations(key_prefix, *(object_tag(key_prefix, pk) for pk in pks))
+    cache_keys = {
+        pk: _format_cache_key(
+            key_prefix, [generations[0], generation], None, {object_kwarg: str(pk)}, None, False
+        )
+        for pk, generation in zip(pks, generations[1:])
+    }
+    with metrics.api_cache_redis_seconds.labels(key_prefix, "get_many").time():
+        found = cache.get_many(list(cache_keys.values()))
+
+    now = time.time()
+    objects, missing = {}, []
+    for pk, cache_key in cache_keys.items():
+        entry = found.get(cache_key)
+        redis_stats.record(entry is not None)
+        if not isinstance(entry, dict) or now >= entry.get("expires_at", now):
+            missing.append(pk)
+        elif entry["status"] == 200:
+            objects[pk] = entry["data"]
+    metrics.api_cache_hits_total.labels(key_prefix, TIER_REDIS).inc(len(pks) - len(missing))
+    if not missing:
+        return objects
+
+    metrics.api_cache_misses_total.labels(key_prefix).inc(len(missing))
+    start = time.monotonic()
+    with use_replica(None):
+        loaded = load(missing)
+    delta = (time.monotonic() - start) / len(missing)
+    metrics.api_cache_compute_seconds.labels(key_prefix).observe(delta)
+    timeout = _jittered(timeout, jitter)
+    entries = {}
+    for pk, data in loaded.items():
+        made = _make_entry(key_prefix, data, 200, delta, timeout, None, None, None)
+        if made is not None:
+            entries[cache_keys[pk]] = made[1]
+    # The entries physically live longer than their soft expiry so they can be served stale
+    with metrics.api_cache_redis_seconds.labels(key_prefix, "set_many").time():
+        _set_encoded(entries, math.ceil(timeout + stale_timeout))
+    objects.update(loaded)
+    return objects
+
+
+def get_generation(tag: str) -> int:
+    """
+    Returns the current generation of a cache tag (usually a `key_prefix`).
+
+    Generations are seeded with the current timestamp (in ms) rather than 1, so that
+    a tag whose counter was evicted never reuses the generation of older entries.
+    Generations are kept in the local cache as long as this worker receives the
+    invalidation messages, so most requests do not need a Redis round trip for it.
+    """
+    return get_generations(tag)[0]
+
+
+def get_generations(*tags: str) -> List[int]:
+    """Returns the current generation of each tag, fetching the missing ones in a single MGET."""
+    generation_keys = [_generation_key(tag) for tag in tags]
+    coherent, generations = _get_local_generations(generation_keys)
+
+    missing_keys = [key for key in generation_keys if key not in generations]
+    if missing_keys:
+        found = cache.get_many(missing_keys)
+        fetched = {}
+        for generation_key in missing_keys:
+            generation = found.get(generation_key)
+            if generation is None:
+                cache.add(generation_key, _generation_seed(), None)
+                generation = cache.get(generation_key)
+            fetched[generation_key] = int(generation)
+        generations.update(fetched)
+        if coherent:
+            _set_local_generations(fetched)
+    return [generations[key] for key in generation_keys]
+
+
+async def aget_generations(*tags: str) -> List[int]:
+    """Async version of `get_generations`."""
+    generation_keys = [_generation_key(tag) for tag in tags]
+    coherent, generations = _get_local_generations(generation_keys)
+
+    missing_keys = [key for key in generation_keys if key not in generations]
+    if missing_keys:
+        redis_conn = async_redis.get_async_redis()
+        redis_keys = [async_redis.make_key(key) for key in missing_keys]
+        fetched = {}
+        for generation_key, redis_key, generation in zip(
+            missing_keys, redis_keys, await redis_conn.mget(redis_keys)
+        ):
+            if generation is None:
+                await redis_conn.set(redis_key, _generation_seed(), nx=True)
+                generation = await redis_conn.get(redis_key)
+            fetched[generation_key] = int(generation)
+        generations.update(fetched)
+        if coherent:
+            _set_local_generations(fetched)
+    return [generations[key] for key in generation_keys]
+
+
+def _get_local_generations(generation_keys: List[str]) -> Tuple[bool, Dict[str, int]]:
+    coherent = is_coherent()
+    generations: Dict[str, int] = {}
+    if coherent:
+        for generation_key in generation_keys:
+            generation = local_cache.get(generation_key)
+            if generation is not None:
+                generations[generation_key] = generation
+    return coherent, generations
+
+
+def _set_local_generations(generations: Dict[str, int]) -> None:
+    for generation_key, generation in generations.items():
+        local_cache.set(generation_key, generation, GENERATION_LOCAL_TIMEOUT)
+
+
+def object_tag(tag: str, pk: Any) -> str:
+    """Tag of the entries cached for a single object, see `object_kwarg` in `cache_api_response`."""
+    return f"{tag}:{pk}"
+
+
+def invalidate_cache_tags(*tags: str) -> None:
+    """
+    Invalidate every entry cached under the given tags by bumping their generation.
+
+    This is O(1) per tag: the old entries are simply never read again and age out
+    through their TTL. When using Redis, all tags are bumped in a single transaction.
+
+    Args:
+        *tags: Tags (key prefixes) to invalidate
+
+    Example:
+        invalidate_cache_tags("products:list", "products:stats")
+    """
+    if not tags:
+        return
+    _record_invalidation("tags", [_tag_prefix(tag) for tag in tags])
+    _bump_generations(tags)
+    publish_invalidation(keys=[_generation_key(tag) for tag in tags])
+
+
+def _bump_generations(tags: Tuple[str, ...]) -> None:
+    try:
+        from django_redis import get_redis_connection
+        redis_conn = get_redis_connection("default")
+    except Exception:
+        redis_conn = None
+
+    if redis_conn is None:
+        for tag in tags:
+            generation_key = _generation_key(tag)
+            cache.add(generation_key, _generation_seed(), None)
+            cache.incr(generation_key)
+        return
+
+    seed = _generation_seed()
+    with redis_conn.pipeline(transaction=True) as pipe:
+        for tag in tags:
+            redis_key = cache.make_key(_generation_key(tag))
+            pipe.set(redis_key, seed, nx=True)
+            pipe.incr(redis_key)
+        pipe.execute()
+
+
+def _generation_key(tag: str) -> str:
+    return f"{GENERATION_KEY_PREFIX}:{tag}"
+
+
+def _generation_seed() -> int:
+    return int(time.time() * 1000)
+
+
 def invalidate_cache_pattern(pattern: str) -> None:
     """
     Invalidate all cache keys matching a pattern.
 
+    Keys are iterated with SCAN and removed in batches with UNLINK, so Redis is
+    never blocked by a full keyspace scan. This is meant for ad-hoc purges only:
+    prefer `invalidate_cache_tags` to invalidate a whole namespace.
+
     Args:
         pattern: Pattern to match cache keys (e.g., "ProductViewSet*")
 
     Example:
-        # In a signal handler or update view
+        # From a shell or a maintenance command
         invalidate_cache_pattern("ProductViewSet*")
     """
     try:
         from django_redis import get_redis_connection
         redis_conn = get_redis_connection("default")
 
-        # Get all keys matching the pattern
-        keys = redis_conn.keys(f"*{pattern}*")
-        if keys:
-            redis_conn.delete(*keys)
+        batch = []
+        deleted = 0
+        for key in redis_conn.scan_iter(match=f"*{pattern}*", count=SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                deleted += redis_conn.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += redis_conn.unlink(*batch)
+        # The literal start of the pattern, e.g. "products:list" for "products:list:g*"
+        literal = GLOB_CHARACTERS_REGEX.split(pattern)[0].rstrip(":")
+        prefix = _tag_prefix(literal or pattern)
+        metrics.api_cache_invalidations_total.labels(prefix, "pattern").inc()
+        metrics.api_cache_invalidation_fanout.labels(prefix, "pattern").observe(deleted)
     except Exception:
         # Fallback: just pass if redis is not available
         pass
+    publish_invalidation(patterns=[f"*{pattern}*"])
 
 
 def invalidate_cache_keys(*keys: str) -> None:
     """
-    Invalidate specific cache keys.
+    Invalidate specific cache keys, as fully built by `cache_api_response`.
+
+    Keys embed the current generations of their tags (e.g. "products:detail:g4.2:kwargs:<md5>"),
+    so logical names such as "products:list" match no entry: this is meant for purging single
+    entries found in Redis (e.g. with `redis-cli --scan`). To invalidate the entries of a tag, or
+    of a single object, use `invalidate_cache_tags` (with `object_tag` for objects).
 
     Args:
-        *keys: Cache keys to invalidate
+        *keys: Full cache keys to invalidate (without the KEY_PREFIX of the cache)
 
     Example:
-        invalidate_cache_keys("products:list", "products:detail:123")
+        invalidate_cache_keys("products:stats:g12")
     """
+    _record_invalidation("keys", [_key_prefix(key) for key in keys])
     for key in keys:
-        cache.delete(key)
\ No newline at end of file
+        cache.delete(key)
+    publish_invalidation(keys=keys)
+
+
+def _record_invalidation(kind: str, prefixes: Iterable[str]) -> None:
+    """Counts an invalidation of each key prefix, with its number of tags or keys."""
+    fanouts: Dict[str, int] = {}
+    for prefix in prefixes:
+        fanouts[prefix] = fanouts.get(prefix, 0) + 1
+    for prefix, fanout in fanouts.items():
+        metrics.api_cache_invalidations_total.labels(prefix, kind).inc()
+        metrics.api_cache_invalidation_fanout.labels(prefix, kind).observe(fanout)
+
+
+def _tag_prefix(tag: str) -> str:
+    """The key prefix of a tag: itself, or the prefix of an object tag (see `object_tag`)."""
+    if tag in _key_prefixes:
+        return tag
+    prefixes = [prefix for prefix in _key_prefixes if tag.startswith(f"{prefix}:")]
+    return max(prefixes, key=len) if prefixes else tag
+
+
+def _key_prefix(key: str) -> str:
+    match = CACHE_KEY_REGEX.match(key)
+    return match.group("prefix") if match else _tag_prefix(key)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Hit ratios of each cache tier for this worker.
+    Local hits never reach Redis, so the Redis tier only counts local misses.
+    """
+    return {
+        "local": get_local_cache_info(),
+        "redis": redis_stats.as_dict(),
+    }
@@ -0,0 +1,148 @@
+"""
+Model-driven invalidation of the API response cache.
+
+Models declare which cache tags (`key_prefix` of `cache_api_response`) depend on them.
+Saving or deleting an instance, as well as bulk operations going through
+`CacheInvalidatingQuerySet`, then invalidates exactly those tags. Invalidations are
+batched and only sent once the surrounding transaction has been committed,
+after which the affected warm targets are scheduled for recomputation.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Set, Type
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.cache import invalidate_cache_tags, object_tag
+from core.cache_warming import schedule_warming
+
+
+class CacheDependency:
+    def __init__(self, tags: Iterable[str], object_tags: Iterable[str]) -> None:
+        self.tags = set(tags)
+        self.object_tags = set(object_tags)
+
+    def tags_for(self, pks: Optional[Iterable[Any]]) -> Set[str]:
+        tags = set(self.tags)
+        if pks is None:
+            # Unknown objects: every object of the model must be invalidated
+            tags.update(self.object_tags)
+        else:
+            tags.update(object_tag(tag, pk) for tag in self.object_tags for pk in pks)
+        return tags
+
+
+_registry: Dict[Type[models.Model], CacheDependency] = {}
+_pending = threading.local()
+
+
+def register_cache_dependency(
+    model: Type[models.Model],
+    tags: Iterable[str] = (),
+    object_tags: Iterable[str] = (),
+) -> None:
+    """
+    Declares the cached endpoints depending on a model.
+
+    Args:
+        model: The model whose writes invalidate the cache
+        tags: Tags to invalidate on any write (e.g. list endpoints)
+        object_tags: Tags of per-object entries (cached with `object_kwarg`),
+            only invalidated for the objects that were written
+
+    Example:
+        register_cache_dependency(
+            Product, tags=["products:list"], object_tags=["products:detail"]
+        )
+    """
+    dependency = _registry.setdefault(model, CacheDependency((), ()))
+    dependency.tags.update(tags)
+    dependency.object_tags.update(object_tags)
+    label = model._meta.label
+    post_save.connect(_on_save, sender=model, dispatch_uid=f"cache-invalidation-save-{label}")
+    post_delete.connect(
+        _on_delete, sender=model, dispatch_uid=f"cache-invalidation-delete-{label}"
+    )
+
+
+def invalidate_model_cache(
+    model: Type[models.Model],
+    pks: Optional[Iterable[Any]] = None,
+    using: str = DEFAULT_DB_ALIAS,
+) -> None:
+    """
+    Invalidates the cache tags depending on a model once the current transaction commits.
+
+    Args:
+        model: The model that was written
+        pks: Primary keys of the written objects, or None if unknown
+        using: Database alias of the transaction
+    """
+    dependency = _registry.get(model)
+    if dependency is None:
+        return
+    _get_pending_tags().update(dependency.tags_for(pks))
+    # Every call registers a callback, so that tags still get flushed if the savepoint
+    # of a previous callback is rolled back. Only the first callback has tags to send.
+    # Robust: cache failures are logged, the write is committed already
+    transaction.on_commit(_flush_pending_tags, using=using, robust=True)
+
+
+def _get_pending_tags() -> Set[str]:
+    if not hasattr(_pending, "tags"):
+        _pending.tags = set()
+    return _pending.tags
+
+
+def _flush_pending_tags() -> None:
+    tags = _get_pending_tags()
+    if not tags:
+        return
+    _pending.tags = set()
+    invalidate_cache_tags(*sorted(tags))
+    schedule_warming(tags)
+
+
+def _on_save(sender: Type[models.Model], instance: models.Model, using: str, **kwargs: Any) -> None:
+    invalidate_model_cache(sender, [instance.pk], using=using)
+
+
+def _on_delete(
+    sender: Type[models.Model], instance: models.Model, using: str, **kwargs: Any
+) -> None:
+    invalidate_model_cache(sender, [instance.pk], using=using)
+
+
+class CacheInvalidatingQuerySet(models.QuerySet):
+    """
+    QuerySet invalidating the cache on bulk operations, which do not send model signals.
+    (`delete` is not overridden: the deletion collector sends `post_delete` for each object.)
+    """
+
+    def update(self, **kwargs: Any) -> int:
+        rows = super().update(**kwargs)
+        # `bulk_update` relies on `update` but knows exactly which objects it wrote
+        if rows and not getattr(_pending, "in_bulk_update", False):
+            invalidate_model_cache(self.model, using=self.db)
+        return rows
+
+    def bulk_create(self, objs: Iterable[models.Model], *args: Any, **kwargs: Any) -> Any:
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            pks = [obj.pk for obj in objs]
+            invalidate_model_cache(
+                self.model, None if None in pks else pks, using=self.db
+            )
+        return objs
+
+    def bulk_update(self, objs: Iterable[models.Model], *args: Any, **kwargs: Any) -> int:
+        objs = list(objs)
+        _pending.in_bulk_update = True
+        try:
+            rows = super().bulk_update(objs, *args, **kwargs)
+        finally:
+            _pending.in_bulk_update = False
+        if rows:
+            invalidate_model_cache(self.model, [obj.pk for obj in objs], using=self.db)
+        return rows
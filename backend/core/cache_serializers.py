@@ -0,0 +1,172 @@
+"""
+Compact serialization and compression of the values stored in Redis by django_redis.
+
+`CompactSerializer` uses msgpack when it is installed, with extension types for the few
+Python types found in API responses (Decimal, datetimes, tuples...) and a pickle fallback
+for anything else. `AutoCompressor` compresses values above a size threshold with the best
+algorithm available (zstd, then lz4, then zlib).
+
+Both write a small header, so that values stored by the previous pickle serializer,
+or by a worker that picked another algorithm, can still be read.
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Tuple
+import pickle
+import uuid
+import zlib
+
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.base import BaseSerializer
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover
+    lz4_frame = None
+
+# --------------------------------------------------------------------------------
+# > Serializer
+# --------------------------------------------------------------------------------
+MSGPACK_HEADER = b"M"
+PICKLE_HEADER = b"P"
+
+EXT_PICKLE = 0
+EXT_DECIMAL = 1
+EXT_DATETIME = 2
+EXT_DATE = 3
+EXT_TIME = 4
+EXT_UUID = 5
+EXT_TUPLE = 6
+
+
+class CompactSerializer(BaseSerializer):
+    """msgpack serializer with a pickle fallback, for django_redis' `SERIALIZER` option."""
+
+    def dumps(self, value: Any) -> bytes:
+        if msgpack is None:  # pragma: no cover
+            return PICKLE_HEADER + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return MSGPACK_HEADER + _pack(value)
+
+    def loads(self, value: bytes) -> Any:
+        header, payload = value[:1], value[1:]
+        if header == MSGPACK_HEADER:
+            return _unpack(payload)
+        if header == PICKLE_HEADER:
+            return pickle.loads(payload)
+        # Value stored by django_redis' default pickle serializer
+        return pickle.loads(value)
+
+
+def _encode_ext(value: Any) -> Any:
+    # With `strict_types`, subclasses reach this hook instead of being packed as their base type.
+    # Dict, list and str subclasses (OrderedDict, DRF's ReturnDict/ReturnList...) are packed as such.
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, tuple):
+        return msgpack.ExtType(EXT_TUPLE, _pack(list(value)))
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(value).encode())
+    if isinstance(value, datetime):
+        return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+    if isinstance(value, time):
+        return msgpack.ExtType(EXT_TIME, value.isoformat().encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(EXT_UUID, value.bytes)
+    return msgpack.ExtType(EXT_PICKLE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def _decode_ext(code: int, data: bytes) -> Any:
+    decoder = EXT_DECODERS.get(code)
+    if decoder is None:  # pragma: no cover
+        return msgpack.ExtType(code, data)
+    return decoder(data)
+
+
+def _pack(value: Any) -> bytes:
+    return msgpack.packb(value, default=_encode_ext, strict_types=True)
+
+
+def _unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_decode_ext, strict_map_key=False)
+
+
+EXT_DECODERS: Dict[int, Callable[[bytes], Any]] = {
+    EXT_PICKLE: pickle.loads,
+    EXT_DECIMAL: lambda data: Decimal(data.decode()),
+    EXT_DATETIME: lambda data: datetime.fromisoformat(data.decode()),
+    EXT_DATE: lambda data: date.fromisoformat(data.decode()),
+    EXT_TIME: lambda data: time.fromisoformat(data.decode()),
+    EXT_UUID: lambda data: uuid.UUID(bytes=data),
+    EXT_TUPLE: lambda data: tuple(_unpack(data)),
+}
+
+# --------------------------------------------------------------------------------
+# > Compressor
+# --------------------------------------------------------------------------------
+# 0xc1 is never used by msgpack, nor by the serializer headers
+COMPRESSION_MAGIC = b"\xc1"
+ALGORITHM_ZSTD = b"s"
+ALGORITHM_LZ4 = b"4"
+ALGORITHM_ZLIB = b"z"
+
+DEFAULT_MIN_LENGTH = 1024  # bytes
+
+
+class AutoCompressor(BaseCompressor):
+    """
+    Compresses values larger than `COMPRESS_MIN_LENGTH` (django_redis option) with
+    zstd, lz4 or zlib, whichever is available first. Smaller values are stored as-is.
+    """
+
+    def __init__(self, options: Dict[str, Any]) -> None:
+        super().__init__(options)
+        self.min_length = int(options.get("COMPRESS_MIN_LENGTH", DEFAULT_MIN_LENGTH))
+        self.algorithm, self._compress = _best_algorithm()
+
+    def compress(self, value: bytes) -> bytes:
+        if len(value) < self.min_length:
+            return value
+        return COMPRESSION_MAGIC + self.algorithm + self._compress(value)
+
+    def decompress(self, value: bytes) -> bytes:
+        if value[:1] != COMPRESSION_MAGIC:
+            raise CompressorError("Value is not compressed")
+        algorithm, payload = value[1:2], value[2:]
+        try:
+            return DECOMPRESSORS[algorithm](payload)
+        except KeyError as e:  # pragma: no cover
+            raise CompressorError(f"Compression algorithm {algorithm!r} is not available") from e
+
+
+def _best_algorithm() -> Tuple[bytes, Callable[[bytes], bytes]]:
+    # zstandard (de)compressors are not thread-safe, hence one per call
+    if zstandard is not None:
+        return ALGORITHM_ZSTD, lambda value: zstandard.ZstdCompressor(level=3).compress(value)
+    if lz4_frame is not None:
+        return ALGORITHM_LZ4, lz4_frame.compress
+    return ALGORITHM_ZLIB, lambda value: zlib.compress(value, 6)
+
+
+DECOMPRESSORS: Dict[bytes, Callable[[bytes], bytes]] = {ALGORITHM_ZLIB: zlib.decompress}
+if zstandard is not None:
+    DECOMPRESSORS[ALGORITHM_ZSTD] = lambda value: zstandard.ZstdDecompressor().decompress(value)
+if lz4_frame is not None:
+    DECOMPRESSORS[ALGORITHM_LZ4] = lz4_frame.decompress
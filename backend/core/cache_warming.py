@@ -0,0 +1,240 @@
+"""
+Proactive recomputation of the API response cache.
+
+Endpoints cached with `cache_api_response` are registered as warm targets, each with the
+query parameters to warm. Besides fixed parameter sets, a target can warm the query
+strings most often requested by users, which are tracked in a Redis sorted set.
+Warming replays the request through the view with a flag telling the decorator to skip
+the cached value, so the fresh response is stored for the next users. Requests are made on
+the route of the target and on `settings.API_CACHE_WARMING_HOST`, like real ones.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import logging
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.test import APIRequestFactory
+
+from core.async_redis import get_async_redis
+
+LOGGER = logging.getLogger("default")
+
+CACHE_WARMING_ATTRIBUTE = "_cache_warming"
+TRACKED_PARAMS_KEY_PREFIX = "cache:warm:params"
+TRACKED_PARAMS_MAX_SIZE = 1000
+TRACKED_PARAMS_HIT_SAMPLE_RATE = 0.05
+WARM_SCHEDULE_KEY = "cache:warm:scheduled"
+WARM_PENDING_TAGS_KEY = "cache:warm:pending"
+WARM_DEBOUNCE_DELAY = 5  # seconds
+
+
+class WarmTarget:
+    def __init__(
+        self,
+        name: str,
+        view: str,
+        action: str,
+        url_name: str,
+        key_prefix: str,
+        params: Iterable[Dict[str, Any]],
+        top_params: int,
+    ) -> None:
+        self.name = name
+        self.view = view
+        self.action = action
+        self.url_name = url_name
+        self.key_prefix = key_prefix
+        self.params = list(params)
+        self.top_params = top_params
+
+    def get_params(self) -> List[Dict[str, Any]]:
+        params = list(self.params)
+        for tracked in get_top_params(self.key_prefix, self.top_params):
+            if tracked not in params:
+                params.append(tracked)
+        return params
+
+
+_registry: Dict[str, WarmTarget] = {}
+
+
+def register_warm_target(
+    name: str,
+    view: str,
+    action: str,
+    url_name: str,
+    key_prefix: str,
+    params: Iterable[Dict[str, Any]] = ({},),
+    top_params: int = 0,
+) -> None:
+    """
+    Registers an endpoint to warm.
+
+    Args:
+        name: Unique name of the target
+        view: Dotted path to the ViewSet
+        action: ViewSet action serving GET requests (e.g. "list")
+        url_name: Name of the route of the action (e.g. "product-list")
+        key_prefix: The `key_prefix` the action is cached with
+        params: Query parameters to always warm (the default warms the bare endpoint)
+        top_params: How many of the most requested query strings to warm as well
+            (requires `track_params=True` on the decorator)
+
+    Example:
+        register_warm_target(
+            "products:list",
+            "products.views.ProductViewSet",
+            "list",
+            "product-list",
+            key_prefix="products:list",
+            top_params=20,
+        )
+    """
+    _registry[name] = WarmTarget(name, view, action, url_name, key_prefix, params, top_params)
+
+
+def get_warm_targets(
+    names: Optional[Iterable[str]] = None, tags: Optional[Iterable[str]] = None
+) -> List[WarmTarget]:
+    targets = list(_registry.values())
+    if names is not None:
+        names = set(names)
+        targets = [target for target in targets if target.name in names]
+    if tags is not None:
+        tags = set(tags)
+        targets = [target for target in targets if target.key_prefix in tags]
+    return targets
+
+
+def warm_targets(targets: Iterable[WarmTarget]) -> Dict[str, Dict[str, int]]:
+    """Recomputes and stores every parameter set of the targets. Returns counts per target."""
+    results = {}
+    factory = APIRequestFactory()
+    for target in targets:
+        view = import_string(target.view).as_view({"get": target.action})
+        path = reverse(target.url_name)
+        counts = {"warmed": 0, "failed": 0}
+        for params in target.get_params():
+            request = factory.get(path, data=params, HTTP_HOST=settings.API_CACHE_WARMING_HOST)
+            setattr(request, CACHE_WARMING_ATTRIBUTE, True)
+            try:
+                response = view(request)
+            except Exception as e:
+                LOGGER.warning(f"Failed to warm {target.name} with {params}: {e}")
+                response = None
+            if response is not None and 200 <= response.status_code < 300:
+                counts["warmed"] += 1
+            else:
+                counts["failed"] += 1
+        _trim_tracked_params(target.key_prefix)
+        results[target.name] = counts
+    return results
+
+
+def schedule_warming(tags: Iterable[str]) -> None:
+    """
+    Schedules the warming of the targets depending on the invalidated tags.
+
+    Warmings are debounced, so a burst of writes only triggers a single task: the tags
+    of every write are accumulated in a Redis set, which the task drains when it runs.
+    The debounce key expires when the task is due, so tags added after it drained the set
+    schedule another task. Called after commit: failures are logged, never raised to the write.
+    """
+    tags = sorted({target.key_prefix for target in get_warm_targets(tags=tags)})
+    if not tags:
+        return
+    try:
+        _get_redis_connection().sadd(cache.make_key(WARM_PENDING_TAGS_KEY), *tags)
+        if not cache.add(WARM_SCHEDULE_KEY, 1, WARM_DEBOUNCE_DELAY):
+            return
+        from core.tasks import warm_api_cache
+
+        warm_api_cache.apply_async(kwargs={"pending": True}, countdown=WARM_DEBOUNCE_DELAY)
+    except Exception as e:
+        LOGGER.warning(f"Failed to schedule the warming of {tags}: {e}")
+
+
+def pop_pending_tags() -> List[str]:
+    """Drains the tags accumulated by `schedule_warming`."""
+    key = cache.make_key(WARM_PENDING_TAGS_KEY)
+    pipeline = _get_redis_connection().pipeline(transaction=True)
+    pipeline.smembers(key)
+    pipeline.delete(key)
+    members, _ = pipeline.execute()
+    return sorted(member.decode() for member in members)
+
+
+# --------------------------------------------------------------------------------
+# > Query parameters tracking
+# --------------------------------------------------------------------------------
+def record_params(key_prefix: str, params: Dict[str, List[str]], hit: bool) -> None:
+    """
+    Counts a request of the query parameters. Misses are always counted,
+    hits are sampled (and weighted accordingly) to avoid a Redis write per hit.
+    """
+    weight = _params_weight(hit)
+    if weight is None:
+        return
+    try:
+        redis_conn = _get_redis_connection()
+        member = json.dumps(params, sort_keys=True)
+        redis_conn.zincrby(_tracked_params_key(key_prefix), weight, member)
+    except Exception as e:
+        LOGGER.debug(f"Failed to track cache params for {key_prefix}: {e}")
+
+
+async def arecord_params(key_prefix: str, params: Dict[str, List[str]], hit: bool) -> None:
+    """Async version of `record_params`."""
+    weight = _params_weight(hit)
+    if weight is None:
+        return
+    try:
+        member = json.dumps(params, sort_keys=True)
+        await get_async_redis().zincrby(_tracked_params_key(key_prefix), weight, member)
+    except Exception as e:
+        LOGGER.debug(f"Failed to track cache params for {key_prefix}: {e}")
+
+
+def _params_weight(hit: bool) -> Optional[float]:
+    if not hit:
+        return 1.0
+    if random.random() >= TRACKED_PARAMS_HIT_SAMPLE_RATE:
+        return None
+    return 1 / TRACKED_PARAMS_HIT_SAMPLE_RATE
+
+
+def get_top_params(key_prefix: str, count: int) -> List[Dict[str, Any]]:
+    if count <= 0:
+        return []
+    try:
+        redis_conn = _get_redis_connection()
+        members = redis_conn.zrevrange(_tracked_params_key(key_prefix), 0, count - 1)
+    except Exception as e:
+        LOGGER.debug(f"Failed to read tracked cache params for {key_prefix}: {e}")
+        return []
+    return [json.loads(member) for member in members]
+
+
+def _trim_tracked_params(key_prefix: str) -> None:
+    try:
+        redis_conn = _get_redis_connection()
+        redis_conn.zremrangebyrank(
+            _tracked_params_key(key_prefix), 0, -(TRACKED_PARAMS_MAX_SIZE + 1)
+        )
+    except Exception as e:
+        LOGGER.debug(f"Failed to trim tracked cache params for {key_prefix}: {e}")
+
+
+def _tracked_params_key(key_prefix: str) -> str:
+    return cache.make_key(f"{TRACKED_PARAMS_KEY_PREFIX}:{key_prefix}")
+
+
+def _get_redis_connection() -> Any:
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
@@ -0,0 +1,127 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the primary (`default`). Reads go to a read replica (one of
+`settings.DATABASE_REPLICAS`) only within the requests allowed to use one, see
+`ReplicaRoutingMiddleware`: safe requests of clients that did not write recently.
+Everything else (writes, transactions, cache misses of `core.cache`, Celery tasks,
+management commands) reads from the primary, so it never sees stale data: in particular,
+cached responses are never computed from a replica lagging behind an invalidation.
+
+Each worker checks the replicas at most every `DATABASE_REPLICA_CHECK_INTERVAL` seconds:
+a replica that cannot be reached, or lags more than `DATABASE_REPLICA_MAX_LAG` seconds
+behind the primary, is skipped until its next check.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+LOGGER = logging.getLogger("default")
+
+# Lag of a PostgreSQL standby, 0 when it has replayed everything it received (or on a primary)
+POSTGRESQL_LAG_SQL = """
+SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+"""
+DEFAULT_LAG_SQL = "SELECT 0"
+
+# Replica used by the current request, if any (a context variable, to also isolate async requests)
+_replica: ContextVar[Optional[str]] = ContextVar("replica", default=None)
+# Alias -> (healthy, time of the check)
+_health: Dict[str, Tuple[bool, float]] = {}
+_health_lock = threading.Lock()
+
+
+class ReplicaRouter:
+    """Database router sending the reads of the current request to its replica, if any."""
+
+    def db_for_read(self, model: Any, **hints: Any) -> str:
+        replica = _replica.get()
+        # Reads within a transaction must see its writes
+        if replica is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> Optional[bool]:
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> Optional[bool]:
+        # Replicas get their schema through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def choose_replica() -> Optional[str]:
+    """A healthy replica picked at random, or None if there is none."""
+    replicas = [alias for alias in settings.DATABASE_REPLICAS if is_replica_healthy(alias)]
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def use_replica(alias: Optional[str]) -> Iterator[None]:
+    """Sends the reads of the block to the given replica (to the primary if None)."""
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def get_current_replica() -> Optional[str]:
+    return _replica.get()
+
+
+def is_replica_healthy(alias: str) -> bool:
+    """Whether the replica is reachable and up to date, as of its last check."""
+    now = time.monotonic()
+    health = _health.get(alias)
+    if health is not None and now - health[1] < settings.DATABASE_REPLICA_CHECK_INTERVAL:
+        return health[0]
+    with _health_lock:
+        # Another thread may have checked it in the meantime
+        health = _health.get(alias)
+        if health is None or now - health[1] >= settings.DATABASE_REPLICA_CHECK_INTERVAL:
+            health = (_check_replica(alias), time.monotonic())
+            _health[alias] = health
+    return health[0]
+
+
+def mark_replica_unhealthy(alias: str) -> None:
+    """Skips the replica until its next check, e.g. after a failed query."""
+    _health[alias] = (False, time.monotonic())
+
+
+def reset_replica_health() -> None:
+    _health.clear()
+
+
+def _check_replica(alias: str) -> bool:
+    connection = connections[alias]
+    sql = POSTGRESQL_LAG_SQL if connection.vendor == "postgresql" else DEFAULT_LAG_SQL
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            lag = float(cursor.fetchone()[0])
+    except DatabaseError as e:
+        LOGGER.warning(f"Database replica {alias} is unavailable: {e}")
+        return False
+    if lag > settings.DATABASE_REPLICA_MAX_LAG:
+        LOGGER.warning(f"Database replica {alias} lags {lag:.1f}s behind the primary")
+        return False
+    return True
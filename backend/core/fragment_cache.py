@@ -0,0 +1,110 @@
+"""
+Per-object fragment caching, to assemble list responses from individually cached objects.
+
+A list endpoint only computes (or caches) the ids and versions of the objects it returns.
+Each object is serialized once per version and stored as a fragment under
+`{namespace}:{pk}:{version}`: editing an object creates a new version, so the next list
+response only serializes that object again and reuses the fragments of all the others.
+"""
+
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from rest_framework.response import Response
+
+from core import metrics
+from core.cache import _etag_matches, _make_etag, _not_modified
+from core.db_router import use_replica
+
+FRAGMENT_TIMEOUT = 24 * 3600  # seconds, outdated versions simply age out
+
+
+def object_version(updated_at: datetime) -> int:
+    """Version of an object, from its last modification date (in microseconds)."""
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+def fragment_key(namespace: str, pk: Any, version: Any) -> str:
+    return f"{namespace}:{pk}:{version}"
+
+
+def get_fragments(
+    namespace: str,
+    versions: Sequence[Tuple[Any, Any]],
+    load: Callable[[List[Any]], Iterable[Any]],
+    serialize: Callable[[List[Any]], Iterable[Any]],
+    timeout: int = FRAGMENT_TIMEOUT,
+    get_pk: Callable[[Any], Any] = attrgetter("pk"),
+) -> List[Any]:
+    """
+    Returns the serialized objects in the order of `versions`. All fragments are read with
+    a single MGET, and the missing ones are loaded and serialized in a single batch.
+
+    Args:
+        namespace: Namespace of the fragments (e.g. "product:v1"), to change
+            whenever the serialized representation changes
+        versions: (pk, version) of each object
+        load: Returns the objects of the given primary keys, ideally in a single query
+        serialize: Serializes a list of objects (e.g. a `many=True` serializer)
+        timeout: How long (in seconds) the fragments are kept
+        get_pk: Returns the primary key of a loaded object (e.g. `itemgetter("id")`
+            for `.values()` rows)
+
+    Example:
+        get_fragments(
+            "product:v1",
+            versions,
+            load=lambda pks: Product.objects.filter(pk__in=pks),
+            serialize=lambda products: ProductSerializer(products, many=True).data,
+        )
+    """
+    keys = [fragment_key(namespace, pk, version) for pk, version in versions]
+    if not keys:
+        return []
+    with metrics.api_cache_redis_seconds.labels(namespace, "get_many").time():
+        fragments: Dict[str, Any] = cache.get_many(keys)
+
+    missing = {pk: key for (pk, _), key in zip(versions, keys) if key not in fragments}
+    metrics.api_cache_fragment_hits_total.labels(namespace).inc(len(keys) - len(missing))
+    if missing:
+        metrics.api_cache_fragment_misses_total.labels(namespace).inc(len(missing))
+        # Loaded from the primary, to match the versions (see core.cache._compute_and_store)
+        with use_replica(None):
+            objs = list(load(list(missing)))
+            # Objects deleted since the versions were computed are simply left out
+            computed = {
+                missing[get_pk(obj)]: fragment for obj, fragment in zip(objs, serialize(objs))
+            }
+        with metrics.api_cache_redis_seconds.labels(namespace, "set_many").time():
+            cache.set_many(computed, timeout)
+        fragments.update(computed)
+    return [fragments[key] for key in keys if key in fragments]
+
+
+def fragments_response(
+    request: HttpRequest,
+    namespace: str,
+    versions: Sequence[Tuple[Any, Any]],
+    load: Callable[[List[Any]], Iterable[Any]],
+    serialize: Callable[[List[Any]], Iterable[Any]],
+    timeout: int = FRAGMENT_TIMEOUT,
+    envelope: Optional[Dict[str, Any]] = None,
+    get_pk: Callable[[Any], Any] = attrgetter("pk"),
+) -> HttpResponseBase:
+    """
+    List response assembled with `get_fragments`. Its ETag derives from the versions,
+    so clients that are up to date get a 304 without any fragment being read.
+    With an `envelope` (e.g. pagination links), the fragments are returned in its `results`.
+    """
+    etag = _make_etag(json.dumps([namespace, list(versions), envelope]).encode())
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    results = get_fragments(namespace, versions, load, serialize, timeout, get_pk)
+    response = Response(results if envelope is None else {**envelope, "results": results})
+    response["ETag"] = etag
+    return response
@@ -0,0 +1,245 @@
+"""
+In-process (L1) cache used in front of Redis by `core.cache`.
+
+Each worker keeps its hottest entries in memory, bounded in size and evicted in LRU order.
+Workers stay coherent through Redis pub/sub: every invalidation is published on a channel
+that each worker listens to from a background thread.
+"""
+
+from collections import OrderedDict
+from fnmatch import fnmatch
+from typing import Any, Dict, Iterable, Optional, Tuple
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+
+from django.conf import settings
+
+from core import metrics
+
+LOGGER = logging.getLogger("default")
+
+LISTENER_POLL_TIMEOUT = 1.0  # seconds
+LISTENER_RETRY_DELAY = 5.0  # seconds
+
+
+class TierStats:
+    """Thread-safe hit/miss counters of a cache tier."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+class LocalCache:
+    """Thread-safe LRU cache with a per-entry TTL and a bound on its total size in bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.stats = TierStats()
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, value)
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._size = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] <= time.monotonic():
+                self._pop(key)
+                self._report()
+                item = None
+            if item is not None:
+                self._entries.move_to_end(key)
+        self.stats.record(item is not None)
+        return item[2] if item is not None else None
+
+    def set(self, key: str, value: Any, timeout: float, size: Optional[int] = None) -> None:
+        """Stores a value, whose size is estimated unless given (e.g. its encoded size)."""
+        if not self.enabled or timeout <= 0:
+            return
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (time.monotonic() + timeout, size, value)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+            self._report()
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._pop(key)
+            self._report()
+
+    def delete_pattern(self, pattern: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if fnmatch(key, pattern)]:
+                self._pop(key)
+            self._report()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._report()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            **self.stats.as_dict(),
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _report(self) -> None:
+        # Called with the lock held, whenever entries are stored or evicted
+        metrics.api_cache_local_bytes.set(self._size)
+        metrics.api_cache_local_entries.set(len(self._entries))
+
+    def _pop(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self._size -= item[1]
+
+
+def estimate_size(value: Any) -> int:
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+# --------------------------------------------------------------------------------
+# > Pub/sub coherence
+# --------------------------------------------------------------------------------
+class InvalidationListener:
+    """
+    Listens to the invalidation channel in a daemon thread and applies the messages
+    to the local cache. The thread is (re)started lazily, including after a fork.
+    Whenever the subscription is lost, the local cache is cleared since messages
+    may have been missed in the meantime.
+    """
+
+    def __init__(self, local_cache: LocalCache, channel: str) -> None:
+        self.local_cache = local_cache
+        self.channel = channel
+        self.connected = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self.connected.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="cache-invalidation-listener", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                LOGGER.warning(f"Cache invalidation listener disconnected: {e}")
+            self.connected.clear()
+            self.local_cache.clear()
+            time.sleep(LISTENER_RETRY_DELAY)
+
+    def _listen(self) -> None:
+        from django_redis import get_redis_connection
+
+        pubsub = get_redis_connection("default").pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self.channel)
+            self.local_cache.clear()
+            self.connected.set()
+            while True:
+                message = pubsub.get_message(timeout=LISTENER_POLL_TIMEOUT)
+                if message is not None:
+                    apply_invalidation(self.local_cache, message["data"])
+        finally:
+            pubsub.close()
+
+
+def apply_invalidation(local_cache: LocalCache, payload: Any) -> None:
+    if isinstance(payload, bytes):
+        payload = payload.decode()
+    message = json.loads(payload)
+    if message.get("clear"):
+        local_cache.clear()
+    local_cache.delete(*message.get("keys", []))
+    for pattern in message.get("patterns", []):
+        local_cache.delete_pattern(pattern)
+
+
+def publish_invalidation(
+    keys: Iterable[str] = (), patterns: Iterable[str] = (), clear: bool = False
+) -> None:
+    """Drops the keys from this worker's local cache, then notifies the other workers."""
+    keys, patterns = list(keys), list(patterns)
+    payload = json.dumps({"keys": keys, "patterns": patterns, "clear": clear})
+    apply_invalidation(local_cache, payload)
+    if not local_cache.enabled:
+        return
+    try:
+        from django_redis import get_redis_connection
+
+        get_redis_connection("default").publish(listener.channel, payload)
+    except Exception as e:
+        LOGGER.warning(f"Failed to publish cache invalidation: {e}")
+
+
+def is_coherent() -> bool:
+    """Whether this worker currently receives the invalidation messages."""
+    if not local_cache.enabled:
+        return False
+    listener.ensure_started()
+    return listener.connected.is_set()
+
+
+def get_local_cache_info() -> Dict[str, Any]:
+    return {**local_cache.info(), "coherent": listener.connected.is_set()}
+
+
+local_cache = LocalCache(settings.API_CACHE_LOCAL_MAX_BYTES)
+listener = InvalidationListener(local_cache, settings.API_CACHE_INVALIDATION_CHANNEL)
@@ -0,0 +1,60 @@
+from collections import defaultdict
+from typing import Any, Dict
+import pickle
+
+from django.core.cache import cache
+from django.core.management import BaseCommand, CommandParser
+
+from core.cache import CACHE_KEY_REGEX, SCAN_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Report, per key prefix, the memory used in Redis by the cached values "
+        "compared to their size with the default pickle serializer"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=200,
+            help="Maximum number of keys to inspect per prefix",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        from django_redis import get_redis_connection
+
+        redis_conn = get_redis_connection("default")
+        client = cache.client
+        key_prefix = cache.make_key("")
+        report: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"keys": 0, "pickle_bytes": 0, "stored_bytes": 0, "memory_bytes": 0}
+        )
+
+        for redis_key in redis_conn.scan_iter(match=f"{key_prefix}*", count=SCAN_BATCH_SIZE):
+            key = redis_key.decode()[len(key_prefix) :]
+            match = CACHE_KEY_REGEX.match(key)
+            prefix = match.group("prefix") if match else "other"
+            stats = report[prefix]
+            if stats["keys"] >= options["sample"]:
+                continue
+            raw = redis_conn.get(redis_key)
+            if raw is None:
+                continue
+            value = client.decode(raw)
+            stats["keys"] += 1
+            stats["pickle_bytes"] += len(pickle.dumps(value))
+            stats["stored_bytes"] += len(raw)
+            stats["memory_bytes"] += redis_conn.memory_usage(redis_key) or 0
+
+        if not report:
+            print("No cached value found")
+            return
+        print(f"{'prefix':<40} {'keys':>6} {'pickle':>12} {'stored':>12} {'ratio':>6} {'memory':>12}")
+        for prefix, stats in sorted(report.items()):
+            ratio = stats["stored_bytes"] / stats["pickle_bytes"] if stats["pickle_bytes"] else 0
+            print(
+                f"{prefix:<40} {stats['keys']:>6} {stats['pickle_bytes']:>12} "
+                f"{stats['stored_bytes']:>12} {ratio:>6.2f} {stats['memory_bytes']:>12}"
+            )
@@ -0,0 +1,34 @@
+from typing import Any
+
+from django.core.management import BaseCommand, CommandParser
+
+from core.cache_warming import get_warm_targets, warm_targets
+from core.tasks import warm_api_cache
+
+
+class Command(BaseCommand):
+    help = "Recompute and store the cached responses of the registered warm targets"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "targets", nargs="*", help="Names of the targets to warm (default: all)"
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Send the warming to the celery workers instead of running it here",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        names = options["targets"] or None
+        targets = get_warm_targets(names=names)
+        if not targets:
+            print("No warm target found")
+            return
+        if options["run_async"]:
+            warm_api_cache.delay(names=[target.name for target in targets])
+            print(f"Warming of {len(targets)} target(s) scheduled")
+            return
+        for name, counts in warm_targets(targets).items():
+            print(f"{name}: {counts['warmed']} warmed, {counts['failed']} failed")
@@ -0,0 +1,102 @@
+"""
+Prometheus metrics of the API response cache (`core.cache`).
+They are exported by django_prometheus on the `/metrics/` endpoint.
+"""
+
+from django_prometheus.conf import NAMESPACE
+from prometheus_client import Counter, Gauge, Histogram
+
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, float("inf"))
+FANOUT_BUCKETS = (1, 2, 5, 10, 50, 100, 500, 1000, 10000, float("inf"))
+REDIS_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    float("inf"),
+)
+
+api_cache_hits_total = Counter(
+    "api_cache_hits_total",
+    "Cached API responses served fresh, by cache tier",
+    ["key_prefix", "tier"],
+    namespace=NAMESPACE,
+)
+api_cache_misses_total = Counter(
+    "api_cache_misses_total",
+    "API responses computed because no usable entry was cached",
+    ["key_prefix"],
+    namespace=NAMESPACE,
+)
+api_cache_stale_total = Counter(
+    "api_cache_stale_total",
+    "Expired API responses served while another worker refreshes them",
+    ["key_prefix"],
+    namespace=NAMESPACE,
+)
+api_cache_rejected_total = Counter(
+    "api_cache_rejected_total",
+    "API responses not cached because they exceed the maximum entry size",
+    ["key_prefix"],
+    namespace=NAMESPACE,
+)
+api_cache_fragment_hits_total = Counter(
+    "api_cache_fragment_hits_total",
+    "Object fragments read from the cache to assemble list responses",
+    ["namespace"],
+    namespace=NAMESPACE,
+)
+api_cache_fragment_misses_total = Counter(
+    "api_cache_fragment_misses_total",
+    "Object fragments serialized because they were not cached",
+    ["namespace"],
+    namespace=NAMESPACE,
+)
+api_cache_compute_seconds = Histogram(
+    "api_cache_compute_seconds",
+    "Time spent computing an API response on cache miss",
+    ["key_prefix"],
+    namespace=NAMESPACE,
+)
+api_cache_payload_bytes = Histogram(
+    "api_cache_payload_bytes",
+    "Size of the API responses stored in the cache",
+    ["key_prefix"],
+    buckets=BYTES_BUCKETS,
+    namespace=NAMESPACE,
+)
+api_cache_redis_seconds = Histogram(
+    "api_cache_redis_seconds",
+    "Latency of the Redis operations of the API response cache",
+    ["key_prefix", "operation"],
+    buckets=REDIS_LATENCY_BUCKETS,
+    namespace=NAMESPACE,
+)
+api_cache_invalidations_total = Counter(
+    "api_cache_invalidations_total",
+    "Invalidations of the API response cache, by key prefix and kind (tags, keys or pattern)",
+    ["key_prefix", "kind"],
+    namespace=NAMESPACE,
+)
+api_cache_invalidation_fanout = Histogram(
+    "api_cache_invalidation_fanout",
+    "Number of tags, keys or matched keys of a key prefix affected by an invalidation",
+    ["key_prefix", "kind"],
+    buckets=FANOUT_BUCKETS,
+    namespace=NAMESPACE,
+)
+api_cache_local_bytes = Gauge(
+    "api_cache_local_bytes",
+    "Size of the entries held in the in-process cache tier",
+    namespace=NAMESPACE,
+)
+api_cache_local_entries = Gauge(
+    "api_cache_local_entries",
+    "Number of entries held in the in-process cache tier",
+    namespace=NAMESPACE,
+)
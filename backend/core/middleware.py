@@ -1,6 +1,14 @@
 # File: backend/core/middleware.py
+from django.conf import settings
+from django.db import OperationalError
 from django.utils.deprecation import MiddlewareMixin
 from django.views.decorators.csrf import csrf_exempt
+from rest_framework.permissions import SAFE_METHODS
+
+from core.db_router import choose_replica, get_current_replica, mark_replica_unhealthy, use_replica
+
+# Set after a write, so that the client reads from the primary for a while
+READ_YOUR_WRITES_COOKIE = "read_primary"
 
 
 class CSRFExemptAPIMiddleware(MiddlewareMixin):
@@ -25,4 +33,45 @@ class PermissionsPolicyMiddleware(MiddlewareMixin):
     def process_response(self, request, response):
         # Set permissions policy to allow unload events
         response['Permissions-Policy'] = 'unload=*'
-        return response
\ No newline at end of file
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware sending the reads of safe requests to a read replica (see core.db_router).
+    Clients that wrote within the last `READ_YOUR_WRITES_WINDOW` seconds keep reading
+    from the primary, to see their own writes. A safe request failing on its replica
+    is retried once on the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE,
+                "1",
+                max_age=settings.READ_YOUR_WRITES_WINDOW,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+            return response
+
+        replica = None if READ_YOUR_WRITES_COOKIE in request.COOKIES else choose_replica()
+        with use_replica(replica):
+            return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        replica = get_current_replica()
+        if replica is None or not isinstance(exception, OperationalError):
+            return None
+        mark_replica_unhealthy(replica)
+        match = request.resolver_match
+        with use_replica(None):
+            return match.func(request, *match.args, **match.kwargs)
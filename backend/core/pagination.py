@@ -0,0 +1,326 @@
+"""
+Keyset (a.k.a. seek) pagination.
+
+Pages are fetched with `WHERE (field, pk) > (value, last_pk) ORDER BY field, pk LIMIT n`
+instead of an OFFSET, so deep pages cost the same as the first one and an index on
+`(field, id)` serves every page. The position is carried by an opaque cursor, and the
+primary key breaks ties between rows sharing the same value.
+"""
+
+from base64 import b64decode, b64encode
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Field, Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+FALSE_VALUES = {"0", "false", "no", "off"}
+# Unfiltered tables smaller than this are counted exactly
+EXACT_COUNT_LIMIT = 10_000
+
+
+class Cursor:
+    def __init__(self, ordering: str, position: Tuple[Any, Any], reverse: bool) -> None:
+        self.ordering = ordering
+        self.position = position
+        self.reverse = reverse
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over one of several orderings, with the primary key as tie-breaker.
+
+    Contrary to DRF's `CursorPagination`, ties are resolved with the primary key rather
+    than an offset, so pages stay O(page size) even with many identical values.
+    The ordering fields must not be nullable. They can also be annotations
+    of the queryset, as long as their values survive a JSON round trip.
+
+    The total `count` is returned unless the client opts out with `?count=false`,
+    which saves a COUNT(*) over the whole filtered queryset.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    ordering_query_param = "ordering"
+    # Supported orderings (e.g. "-created_at", "price"), the first one is the default
+    orderings: Sequence[str] = ("-pk",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> List[Any]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        self.cursor = self.decode_cursor(request, queryset)
+        self.count = queryset.count() if self.get_with_count(request) else None
+
+        field, descending = _parse_ordering(self.ordering)
+        reverse = self.cursor is not None and self.cursor.reverse
+        # Previous pages are fetched by scanning backwards from the cursor
+        scan_descending = descending != reverse
+        prefix = "-" if scan_descending else ""
+        queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}pk")
+        if self.cursor is not None:
+            value, pk = self.cursor.position
+            lookup = "lt" if scan_descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{field}__{lookup}": value}) | Q(**{field: value, f"pk__{lookup}": pk})
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = self.cursor is not None, has_more
+        self.first_position = _position(rows[0], field) if rows else None
+        self.last_position = _position(rows[-1], field) if rows else None
+        return rows
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request: Request) -> str:
+        ordering = request.query_params.get(self.ordering_query_param)
+        if ordering in self.orderings:
+            return ordering
+        return self.orderings[0]
+
+    def get_with_count(self, request: Request) -> bool:
+        value = request.query_params.get(self.count_query_param, "")
+        return value.lower() not in FALSE_VALUES
+
+    def get_next_cursor(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        position = self.last_position
+        if position is None:
+            # Empty page reached backwards: the next page starts right at the cursor
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(self.ordering, position, reverse=False))
+
+    def get_previous_cursor(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        position = self.first_position
+        if position is None:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(self.ordering, position, reverse=True))
+
+    def get_next_link(self) -> Optional[str]:
+        return self.get_link(self.request, self.get_next_cursor())
+
+    def get_previous_link(self) -> Optional[str]:
+        return self.get_link(self.request, self.get_previous_cursor())
+
+    def get_link(self, request: Request, cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        return replace_query_param(request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_page_info(self) -> Dict[str, Any]:
+        """
+        Everything but the results, e.g. to cache them separately. `next` and `previous`
+        are raw cursors, the same for every client: see `link_page_info`.
+        """
+        info = {"next": self.get_next_cursor(), "previous": self.get_previous_cursor()}
+        if self.count is not None:
+            info["count"] = self.count
+        return info
+
+    def link_page_info(self, request: Request, info: Dict[str, Any]) -> Dict[str, Any]:
+        """The page info with the cursors turned into links built from the given request."""
+        return {
+            **info,
+            "next": self.get_link(request, info["next"]),
+            "previous": self.get_link(request, info["previous"]),
+        }
+
+    def get_paginated_response(self, data: Any) -> Response:
+        info = self.link_page_info(self.request, self.get_page_info())
+        return Response({**info, "results": data})
+
+    def get_paginated_response_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer", "description": "Omitted with count=false"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view: Any) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of results to return per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to false to skip counting the results.",
+                "schema": {"type": "boolean"},
+            },
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Ordering of the results.",
+                "schema": {"type": "string", "enum": list(self.orderings)},
+            },
+        ]
+
+    def encode_cursor(self, cursor: Cursor) -> str:
+        value, pk = cursor.position
+        payload = {"o": cursor.ordering, "v": _encode_value(value), "pk": pk}
+        if cursor.reverse:
+            payload["r"] = 1
+        return b64encode(json.dumps(payload).encode()).decode()
+
+    def decode_cursor(self, request: Request, queryset: QuerySet) -> Optional[Cursor]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(b64decode(encoded.encode(), validate=True))
+            ordering = payload["o"]
+            if ordering != self.ordering:
+                raise ValueError("The cursor was issued for another ordering")
+            field, _ = _parse_ordering(ordering)
+            value = payload["v"]
+            model_field = _get_model_field(queryset, field)
+            if model_field is not None:
+                value = model_field.to_python(value)
+            pk = queryset.model._meta.pk.to_python(payload["pk"])
+        except (
+            binascii.Error,
+            KeyError,
+            TypeError,
+            UnicodeDecodeError,
+            ValidationError,
+            ValueError,
+        ) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+        return Cursor(ordering, (value, pk), reverse=bool(payload.get("r")))
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator (e.g. for the admin) for large tables, where exact counts mean scanning
+    every row:
+    - Unfiltered querysets are counted from the table statistics (see `estimate_count`).
+    - Filtered querysets are counted up to `max_count` rows: deeper pages are not reachable,
+      narrower filters are needed.
+    - Pages are read with a late row lookup: the offset only walks the primary keys (read from
+      the index of the ordering), then the rows of the page are fetched by primary key.
+    """
+
+    max_count = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not queryset.query.where and not queryset.query.extra:
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate >= EXACT_COUNT_LIMIT:
+                return estimate
+        return queryset[: self.max_count].count()
+
+    def page(self, number: Any) -> Page:
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        pks = list(self.object_list.values_list("pk", flat=True)[bottom : bottom + self.per_page])
+        return self._get_page(list(self.object_list.filter(pk__in=pks)), number, self)
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Estimated number of rows of the table of a queryset, None if unknown: from `reltuples`
+    on PostgreSQL (kept up to date by autovacuum) and `sqlite_stat1` on SQLite (after ANALYZE).
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == "sqlite":
+            try:
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            except DatabaseError:
+                # Never analyzed
+                return None
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    # The stat of SQLite starts with the number of rows, reltuples is -1 if never analyzed
+    estimate = int(float(str(row[0]).split()[0]))
+    return estimate if estimate >= 0 else None
+
+
+def _parse_ordering(ordering: str) -> Tuple[str, bool]:
+    return ordering.removeprefix("-"), ordering.startswith("-")
+
+
+def _get_model_field(queryset: QuerySet, field: str) -> Optional[Field]:
+    meta = queryset.model._meta
+    if field == "pk":
+        return meta.pk
+    try:
+        return meta.get_field(field)
+    except FieldDoesNotExist:
+        # Annotation (e.g. a relevance rank): the JSON value is used as-is
+        return None
+
+
+def _position(row: Any, field: str) -> Tuple[Any, Any]:
+    if isinstance(row, dict):
+        return row[field], row["pk"]
+    return getattr(row, field), row.pk
+
+
+def _encode_value(value: Any) -> Any:
+    # Full precision: truncated datetimes or decimals would skip or repeat rows
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
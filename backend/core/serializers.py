@@ -1,4 +1,6 @@
 # File: core/serializers.py
+from typing import Any, Iterable, List, Mapping, Optional
+
 from django.conf import settings
 from rest_framework import serializers
 
@@ -7,4 +9,93 @@ class AppConfigSerializer(serializers.Serializer):
     debug = serializers.BooleanField(initial=lambda: settings.DEBUG)
     media_url = serializers.CharField(initial=lambda: settings.MEDIA_URL)
     static_url = serializers.CharField(initial=lambda: settings.STATIC_URL)
-    app_version = serializers.CharField(initial=lambda: settings.APP_VERSION)
\ No newline at end of file
+    app_version = serializers.CharField(initial=lambda: settings.APP_VERSION)
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer whose representation can be restricted to some of its fields,
+    e.g. from the `fields`, `omit` and `representation` query parameters.
+
+    Meta options:
+        representations: Named sets of fields (e.g. {"summary": ["id", "name"]}),
+            in addition to "full" (all the fields)
+        field_sources: Model fields read by the fields without a model source
+            (e.g. {"price_display": ["price"]}), see `get_model_fields`
+
+    Example:
+        fields = ProductSerializer.select_fields(request.query_params, "summary")
+        queryset = queryset.only(*ProductSerializer.get_model_fields(fields))
+        ProductSerializer(queryset, many=True, fields=fields).data
+    """
+
+    FULL_REPRESENTATION = "full"
+
+    def __init__(self, *args: Any, fields: Optional[Iterable[str]] = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            selected = set(fields)
+            for name in list(self.fields):
+                if name not in selected:
+                    self.fields.pop(name)
+
+    @classmethod
+    def select_fields(
+        cls, params: Mapping[str, str], default_representation: Optional[str] = None
+    ) -> List[str]:
+        """
+        Names of the selected fields, in declaration order.
+
+        Args:
+            params: The `fields` (comma-separated names, which take precedence),
+                `representation` and `omit` (comma-separated names) parameters
+            default_representation: Representation used if none is requested
+                (default: "full")
+
+        Raises:
+            serializers.ValidationError: On unknown fields or representations
+        """
+        available = list(cls().fields)
+        representations = getattr(cls.Meta, "representations", {})
+        if params.get("fields"):
+            names = _split(params["fields"])
+        else:
+            representation = (
+                params.get("representation") or default_representation or cls.FULL_REPRESENTATION
+            )
+            if representation == cls.FULL_REPRESENTATION:
+                names = available
+            elif representation in representations:
+                names = representations[representation]
+            else:
+                choices = ", ".join([cls.FULL_REPRESENTATION, *representations])
+                raise serializers.ValidationError(
+                    {"representation": f"Unknown representation, expected one of {choices}."}
+                )
+        omitted = _split(params.get("omit", ""))
+        unknown = sorted((set(names) | set(omitted)) - set(available))
+        if unknown:
+            raise serializers.ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}."})
+        selected = [name for name in available if name in names and name not in omitted]
+        if not selected:
+            raise serializers.ValidationError({"fields": "No field selected."})
+        return selected
+
+    @classmethod
+    def get_model_fields(cls, field_names: Iterable[str]) -> List[str]:
+        """Model fields to load (e.g. with `QuerySet.only`) to serialize the given fields."""
+        fields = cls().fields
+        field_sources = getattr(cls.Meta, "field_sources", {})
+        model_fields: List[str] = []
+        for name in field_names:
+            field = fields[name]
+            if field.source == "*":
+                sources = field_sources.get(name, [])
+            else:
+                sources = [field.source_attrs[0]]
+            model_fields.extend(source for source in sources if source not in model_fields)
+        return model_fields
+
+
+def _split(value: str) -> List[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
@@ -0,0 +1,29 @@
+from typing import Dict, List, Optional
+
+from celery import shared_task
+from celery.schedules import crontab
+from django.conf import settings
+
+
+@shared_task(queue=settings.RABBITMQ_CACHE_QUEUE)
+def warm_api_cache(
+    names: Optional[List[str]] = None,
+    tags: Optional[List[str]] = None,
+    pending: bool = False,
+) -> Dict[str, Dict[str, int]]:
+    """Warms the given targets (all by default), or the ones of the pending tags."""
+    from core.cache_warming import get_warm_targets, pop_pending_tags, warm_targets
+
+    if pending:
+        tags = pop_pending_tags()
+        if not tags:
+            return {}
+    return warm_targets(get_warm_targets(names=names, tags=tags))
+
+
+scheduled_cron_tasks = {
+    "warm_api_cache": {
+        "task": "core.tasks.warm_api_cache",
+        "schedule": crontab(minute="*/10"),
+    }
+}
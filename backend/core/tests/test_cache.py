@@ -0,0 +1,287 @@
+import time
+from typing import Any
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import Http404, HttpResponseNotFound
+from django.test import RequestFactory
+from prometheus_client import REGISTRY
+from rest_framework.response import Response
+
+from core.cache import (
+    _build_cache_key,
+    cache_api_response,
+    get_cache_stats,
+    get_generation,
+    invalidate_cache_keys,
+    invalidate_cache_pattern,
+    invalidate_cache_tags,
+    object_tag,
+)
+from core.local_cache import estimate_size, local_cache
+
+from .utils import BaseTestCase
+
+
+class FakeViewSet:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @cache_api_response(timeout=60, key_prefix="tests:list", jitter=0)
+    def list(self, request: Any) -> Response:
+        self.calls += 1
+        return Response({"calls": self.calls})
+
+    @cache_api_response(
+        timeout=60, key_prefix="tests:stale", stale_timeout=60, jitter=0
+    )
+    def stale(self, request: Any) -> Response:
+        self.calls += 1
+        return Response({"calls": self.calls})
+
+    @cache_api_response(timeout=60, key_prefix="tests:search", vary_on_params=["search"])
+    def search(self, request: Any) -> Response:
+        self.calls += 1
+        return Response({"calls": self.calls})
+
+    @cache_api_response(timeout=60, key_prefix="tests:local", local_timeout=30)
+    def local(self, request: Any) -> Response:
+        self.calls += 1
+        return Response({"calls": self.calls})
+
+    @cache_api_response(timeout=60, key_prefix="tests:detail", negative_timeout=30)
+    def retrieve(self, request: Any, pk: str) -> Response:
+        self.calls += 1
+        raise Http404("Not found.")
+
+    @cache_api_response(timeout=60, key_prefix="tests:plain", negative_timeout=30)
+    def plain(self, request: Any) -> HttpResponseNotFound:
+        self.calls += 1
+        return HttpResponseNotFound()
+
+
+class FakeAsyncView:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    # Same key prefix as `FakeViewSet.list`: both share their entries
+    @cache_api_response(timeout=60, key_prefix="tests:list", jitter=0)
+    async def list(self, request: Any) -> Response:
+        self.calls += 1
+        return Response({"calls": self.calls})
+
+    @cache_api_response(timeout=60, key_prefix="tests:detail", negative_timeout=30)
+    async def retrieve(self, request: Any, pk: str) -> Response:
+        self.calls += 1
+        raise Http404("Not found.")
+
+
+class CacheApiResponseTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.factory = RequestFactory()
+        self.view = FakeViewSet()
+
+    def _key(self, func_name: str, key_prefix: str, **kwargs: Any) -> str:
+        request = self.factory.get("/")
+        func = getattr(FakeViewSet, func_name)
+        return _build_cache_key(
+            self.view, func, request, kwargs, key_prefix, False, True
+        )
+
+    def test_caches_successful_responses(self) -> None:
+        request = self.factory.get("/")
+        self.assertEqual(self.view.list(request).data, {"calls": 1})
+        self.assertEqual(self.view.list(request).data, {"calls": 1})
+        self.assertEqual(self.view.calls, 1)
+
+    def test_varies_on_params(self) -> None:
+        self.view.list(self.factory.get("/", {"search": "a"}))
+        self.view.list(self.factory.get("/", {"search": "b"}))
+        self.assertEqual(self.view.calls, 2)
+
+    def test_varies_on_named_params(self) -> None:
+        self.view.search(self.factory.get("/", {"search": "a", "page": "1"}))
+        self.view.search(self.factory.get("/", {"search": "a", "page": "2"}))
+        self.assertEqual(self.view.calls, 1)
+        self.view.search(self.factory.get("/", {"search": "b"}))
+        self.assertEqual(self.view.calls, 2)
+
+    def test_serves_stale_entry_while_locked(self) -> None:
+        request = self.factory.get("/")
+        self.view.stale(request)
+        key = self._key("stale", "tests:stale")
+        entry = cache.get(key)
+        entry["expires_at"] = time.time() - 1
+        cache.set(key, entry, 60)
+        # Another worker is refreshing the entry
+        cache.add(f"{key}:lock", "other-worker", 10)
+        self.assertEqual(self.view.stale(request).data, {"calls": 1})
+        self.assertEqual(self.view.calls, 1)
+
+    def test_refreshes_expired_entry_when_lock_is_free(self) -> None:
+        request = self.factory.get("/")
+        self.view.stale(request)
+        key = self._key("stale", "tests:stale")
+        entry = cache.get(key)
+        entry["expires_at"] = time.time() - 1
+        cache.set(key, entry, 60)
+        self.assertEqual(self.view.stale(request).data, {"calls": 2})
+        self.assertIsNone(cache.get(f"{key}:lock"))
+
+    @patch("core.cache.LOCK_POLL_INTERVAL", 0.01)
+    def test_waits_for_lock_owner_on_cold_miss(self) -> None:
+        request = self.factory.get("/")
+        key = self._key("list", "tests:list")
+        cache.add(f"{key}:lock", "other-worker", 1)
+        # The lock expires without a value being stored: we compute it ourselves
+        self.assertEqual(self.view.list(request).data, {"calls": 1})
+
+    def test_local_tier(self) -> None:
+        request = self.factory.get("/")
+        self.view.local(request)
+        local_misses = get_cache_stats()["local"]["misses"]
+        with patch("core.cache.cache.client.get_client") as get_client_mock:
+            self.assertEqual(self.view.local(request).data, {"calls": 1})
+        get_client_mock.return_value.get.assert_not_called()
+        self.assertEqual(get_cache_stats()["local"]["misses"], local_misses)
+
+    def test_local_tier_admits_redis_entries_without_reencoding(self) -> None:
+        request = self.factory.get("/")
+        self.view.local(request)
+        local_cache.clear()
+        with patch("core.local_cache.estimate_size", wraps=estimate_size) as estimate_size_mock:
+            self.assertEqual(self.view.local(request).data, {"calls": 1})
+        # Only the generations are estimated, not the entry
+        self.assertFalse(
+            any(isinstance(call.args[0], dict) for call in estimate_size_mock.call_args_list)
+        )
+
+    def test_local_tier_is_invalidated(self) -> None:
+        request = self.factory.get("/")
+        self.view.local(request)
+        invalidate_cache_keys(self._key("local", "tests:local"))
+        self.assertEqual(self.view.local(request).data, {"calls": 2})
+
+    def test_metrics(self) -> None:
+        def sample(name: str, **labels: str) -> float:
+            return REGISTRY.get_sample_value(name, labels) or 0
+
+        labels = {"key_prefix": "tests:list"}
+        hits = sample("api_cache_hits_total", tier="redis", **labels)
+        misses = sample("api_cache_misses_total", **labels)
+        computes = sample("api_cache_compute_seconds_count", **labels)
+        request = self.factory.get("/")
+        self.view.list(request)
+        self.view.list(request)
+        self.assertEqual(sample("api_cache_hits_total", tier="redis", **labels), hits + 1)
+        self.assertEqual(sample("api_cache_misses_total", **labels), misses + 1)
+        self.assertEqual(
+            sample("api_cache_compute_seconds_count", **labels), computes + 1
+        )
+        self.assertGreater(sample("api_cache_payload_bytes_sum", **labels), 0)
+
+    def test_negative_caching(self) -> None:
+        request = self.factory.get("/")
+        with self.assertRaises(Http404):
+            self.view.retrieve(request, pk="1")
+        response = self.view.retrieve(request, pk="1")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.view.calls, 1)
+
+    def test_plain_not_found_responses_are_not_cached(self) -> None:
+        request = self.factory.get("/")
+        self.assertEqual(self.view.plain(request).status_code, 404)
+        self.assertEqual(self.view.plain(request).status_code, 404)
+        self.assertEqual(self.view.calls, 2)
+
+
+class AsyncCacheApiResponseTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.factory = RequestFactory()
+        self.view = FakeAsyncView()
+
+    async def test_caches_successful_responses(self) -> None:
+        request = self.factory.get("/")
+        self.assertEqual((await self.view.list(request)).data, {"calls": 1})
+        self.assertEqual((await self.view.list(request)).data, {"calls": 1})
+        self.assertEqual(self.view.calls, 1)
+
+    async def test_shares_entries_with_sync_views(self) -> None:
+        request = self.factory.get("/")
+        sync_view = FakeViewSet()
+        await sync_to_async(sync_view.list)(request)
+        self.assertEqual((await self.view.list(request)).data, {"calls": 1})
+        self.assertEqual(self.view.calls, 0)
+
+    async def test_invalidate_cache_tags(self) -> None:
+        request = self.factory.get("/")
+        await self.view.list(request)
+        await sync_to_async(invalidate_cache_tags)("tests:list")
+        self.assertEqual((await self.view.list(request)).data, {"calls": 2})
+
+    async def test_negative_caching(self) -> None:
+        request = self.factory.get("/")
+        with self.assertRaises(Http404):
+            await self.view.retrieve(request, pk="1")
+        response = await self.view.retrieve(request, pk="1")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.view.calls, 1)
+
+
+class CacheInvalidationTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.factory = RequestFactory()
+        self.view = FakeViewSet()
+
+    def test_invalidate_cache_tags(self) -> None:
+        request = self.factory.get("/")
+        self.view.list(request)
+        self.view.stale(request)
+        invalidate_cache_tags("tests:list")
+        self.view.list(request)
+        self.view.stale(request)
+        self.assertEqual(self.view.calls, 3)
+
+    def test_invalidate_cache_tags_bumps_all_generations(self) -> None:
+        first, second = get_generation("tests:a"), get_generation("tests:b")
+        invalidate_cache_tags("tests:a", "tests:b", "tests:c")
+        self.assertEqual(get_generation("tests:a"), first + 1)
+        self.assertEqual(get_generation("tests:b"), second + 1)
+        self.assertGreater(get_generation("tests:c"), 1)
+
+    def test_invalidate_cache_pattern(self) -> None:
+        cache.set("tests:pattern:1", 1)
+        cache.set("tests:pattern:2", 2)
+        cache.set("tests:other", 3)
+        invalidate_cache_pattern("tests:pattern")
+        self.assertIsNone(cache.get("tests:pattern:1"))
+        self.assertIsNone(cache.get("tests:pattern:2"))
+        self.assertEqual(cache.get("tests:other"), 3)
+
+    def test_metrics_by_key_prefix(self) -> None:
+        def sample(name: str, prefix: str, kind: str) -> float:
+            labels = {"key_prefix": prefix, "kind": kind}
+            return REGISTRY.get_sample_value(name, labels) or 0
+
+        tags = sample("api_cache_invalidations_total", "tests:detail", "tags")
+        fanout = sample("api_cache_invalidation_fanout_sum", "tests:detail", "tags")
+        keys = sample("api_cache_invalidations_total", "tests:list", "keys")
+        # Object tags count for the key prefix of their view
+        invalidate_cache_tags(object_tag("tests:detail", 1), object_tag("tests:detail", 2))
+        invalidate_cache_keys(self._key())
+        self.assertEqual(sample("api_cache_invalidations_total", "tests:detail", "tags"), tags + 1)
+        self.assertEqual(
+            sample("api_cache_invalidation_fanout_sum", "tests:detail", "tags"), fanout + 2
+        )
+        self.assertEqual(sample("api_cache_invalidations_total", "tests:list", "keys"), keys + 1)
+
+    def _key(self) -> str:
+        request = self.factory.get("/")
+        return _build_cache_key(self.view, FakeViewSet.list, request, {}, "tests:list", False, True)
@@ -0,0 +1,99 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import StringIO
+from typing import Any
+from unittest.mock import patch
+import uuid
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory
+from rest_framework.response import Response
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from core.cache import cache_api_response
+from core.cache_serializers import (
+    COMPRESSION_MAGIC,
+    MSGPACK_HEADER,
+    AutoCompressor,
+    CompactSerializer,
+)
+from core.tests.test_cache import FakeViewSet
+
+from .utils import BaseTestCase
+
+
+class CompactSerializerTestCase(BaseTestCase):
+    def test_round_trip(self) -> None:
+        serializer = CompactSerializer({})
+        value = {
+            "data": ReturnList([{"price": Decimal("10.50")}], serializer=None),
+            "created_at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            "day": date(2025, 1, 2),
+            "uuid": uuid.uuid4(),
+            "tuple": (1, "a"),
+            "set": {1, 2},
+            "bytes": b"content",
+            "none": None,
+            "bool": True,
+        }
+        dumped = serializer.dumps(value)
+        self.assertTrue(dumped.startswith(MSGPACK_HEADER))
+        loaded = serializer.loads(dumped)
+        self.assertEqual(loaded, {**value, "data": [{"price": Decimal("10.50")}]})
+        self.assertIsInstance(loaded["tuple"], tuple)
+
+    def test_reads_pickled_values(self) -> None:
+        import pickle
+
+        serializer = CompactSerializer({})
+        self.assertEqual(serializer.loads(pickle.dumps({"a": 1})), {"a": 1})
+
+
+class AutoCompressorTestCase(BaseTestCase):
+    def test_compresses_above_threshold(self) -> None:
+        compressor = AutoCompressor({"COMPRESS_MIN_LENGTH": 100})
+        small, large = b"a" * 99, b"a" * 10_000
+        self.assertEqual(compressor.compress(small), small)
+        compressed = compressor.compress(large)
+        self.assertTrue(compressed.startswith(COMPRESSION_MAGIC))
+        self.assertLess(len(compressed), 1000)
+        self.assertEqual(compressor.decompress(compressed), large)
+
+
+class LargeViewSet:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    # About 100 KB, compressed to a few hundred bytes
+    @cache_api_response(timeout=60, key_prefix="tests:large", max_entry_bytes=10_000)
+    def list(self, request: Any) -> Response:
+        self.calls += 1
+        return Response({"text": "a" * 100_000})
+
+
+class CacheAdmissionTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_oversized_responses_are_not_cached(self) -> None:
+        view = FakeViewSet()
+        request = RequestFactory().get("/")
+        with self.settings(API_CACHE_MAX_ENTRY_BYTES=1):
+            view.list(request)
+            view.list(request)
+        self.assertEqual(view.calls, 2)
+
+    def test_limit_applies_to_the_stored_bytes(self) -> None:
+        view = LargeViewSet()
+        request = RequestFactory().get("/")
+        view.list(request)
+        view.list(request)
+        self.assertEqual(view.calls, 1)
+
+    def test_cache_footprint_command(self) -> None:
+        FakeViewSet().list(RequestFactory().get("/"))
+        with patch("sys.stdout", new=StringIO()) as stdout:
+            call_command("cache_footprint")
+        self.assertIn("tests:list", stdout.getvalue())
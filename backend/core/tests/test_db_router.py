@@ -0,0 +1,141 @@
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.db import OperationalError, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.cache import cache_api_response
+from core.db_router import (
+    get_current_replica,
+    is_replica_healthy,
+    mark_replica_unhealthy,
+    reset_replica_health,
+    use_replica,
+)
+from core.middleware import READ_YOUR_WRITES_COOKIE, ReplicaRoutingMiddleware
+from products.models import Product
+
+from .utils import BaseTestCase
+
+
+# Routing only, without queries: TestCase would wrap every test in a transaction,
+# whose reads always go to the primary
+@override_settings(DATABASE_REPLICAS=["replica"])
+@patch("core.db_router._check_replica", return_value=True)
+class ReplicaRoutingTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        reset_replica_health()
+        self.addCleanup(reset_replica_health)
+        self.factory = RequestFactory()
+
+    def read_database(self, request) -> str:
+        databases = []
+
+        def view(request):
+            databases.append(router.db_for_read(Product))
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        self.response = response
+        return databases[0]
+
+    def test_safe_requests_read_from_a_replica(self, _) -> None:
+        self.assertEqual(self.read_database(self.factory.get("/api/v1/products/")), "replica")
+        self.assertEqual(router.db_for_write(Product), "default")
+        # Outside requests (e.g. tasks)
+        self.assertEqual(router.db_for_read(Product), "default")
+
+    def test_writes_pin_the_client_to_the_primary(self, _) -> None:
+        self.assertEqual(self.read_database(self.factory.post("/api/v1/products/")), "default")
+        cookie = self.response.cookies[READ_YOUR_WRITES_COOKIE]
+        self.assertEqual(cookie["max-age"], 10)
+
+        request = self.factory.get("/api/v1/products/")
+        request.COOKIES[READ_YOUR_WRITES_COOKIE] = cookie.value
+        self.assertEqual(self.read_database(request), "default")
+
+    def test_reads_within_transactions_use_the_primary(self, _) -> None:
+        def view(request):
+            with patch.object(transaction.get_connection(), "in_atomic_block", True):
+                return HttpResponse(router.db_for_read(Product))
+
+        response = ReplicaRoutingMiddleware(view)(self.factory.get("/api/v1/products/"))
+        self.assertEqual(response.content, b"default")
+
+    def test_unhealthy_replicas_are_skipped(self, check_replica) -> None:
+        check_replica.return_value = False
+        self.assertEqual(self.read_database(self.factory.get("/api/v1/products/")), "default")
+        # The result of the check is reused until the next one
+        self.read_database(self.factory.get("/api/v1/products/"))
+        self.assertEqual(check_replica.call_count, 1)
+
+    def test_failed_requests_are_retried_on_the_primary(self, _) -> None:
+        databases = []
+
+        def view(request):
+            databases.append(get_current_replica())
+            if databases[-1] is not None:
+                raise OperationalError("replica is gone")
+            return HttpResponse()
+
+        request = self.factory.get("/api/v1/products/")
+        request.resolver_match = Mock(func=view, args=(), kwargs={})
+        middleware = ReplicaRoutingMiddleware(view)
+
+        def get_response(request):
+            try:
+                return view(request)
+            except OperationalError as e:
+                return middleware.process_exception(request, e)
+
+        middleware.get_response = get_response
+        self.assertEqual(middleware(request).status_code, 200)
+        self.assertEqual(databases, ["replica", None])
+        self.assertFalse(is_replica_healthy("replica"))
+
+    def test_cache_misses_are_computed_on_the_primary(self, _) -> None:
+        cache.clear()
+        databases = []
+
+        class ViewSet:
+            @cache_api_response(timeout=60, key_prefix="tests:replica")
+            def list(self, request):
+                databases.append(router.db_for_read(Product))
+                return HttpResponse()
+
+        with use_replica("replica"):
+            ViewSet().list(self.factory.get("/"))
+            self.assertEqual(router.db_for_read(Product), "replica")
+        self.assertEqual(databases, ["default"])
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self, _) -> None:
+        self.assertEqual(self.read_database(self.factory.get("/api/v1/products/")), "default")
+        self.read_database(self.factory.post("/api/v1/products/"))
+        self.assertNotIn(READ_YOUR_WRITES_COOKIE, self.response.cookies)
+
+
+class ReplicaHealthTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        reset_replica_health()
+        self.addCleanup(reset_replica_health)
+
+    def test_healthy(self) -> None:
+        self.assertTrue(is_replica_healthy("default"))
+
+    @override_settings(DATABASE_REPLICA_MAX_LAG=-1)
+    def test_lagging(self) -> None:
+        self.assertFalse(is_replica_healthy("default"))
+
+    def test_unavailable(self) -> None:
+        with patch("core.db_router.connections") as connections:
+            connections.__getitem__.return_value.cursor.side_effect = OperationalError()
+            self.assertFalse(is_replica_healthy("default"))
+
+    @override_settings(DATABASE_REPLICA_CHECK_INTERVAL=0)
+    def test_rechecked_after_interval(self) -> None:
+        mark_replica_unhealthy("default")
+        self.assertTrue(is_replica_healthy("default"))
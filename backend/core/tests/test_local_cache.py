@@ -0,0 +1,57 @@
+import json
+from unittest.mock import patch
+
+from core import metrics
+from core.local_cache import LocalCache, apply_invalidation
+
+from .utils import BaseTestCase
+
+
+class LocalCacheTestCase(BaseTestCase):
+    def test_get_and_set(self) -> None:
+        local_cache = LocalCache(max_bytes=1024)
+        self.assertIsNone(local_cache.get("key"))
+        local_cache.set("key", b"value", 10)
+        self.assertEqual(local_cache.get("key"), b"value")
+        self.assertEqual(local_cache.stats.hits, 1)
+        self.assertEqual(local_cache.stats.misses, 1)
+
+    def test_entries_expire(self) -> None:
+        local_cache = LocalCache(max_bytes=1024)
+        with patch("core.local_cache.time.monotonic", return_value=100):
+            local_cache.set("key", b"value", 10)
+        with patch("core.local_cache.time.monotonic", return_value=111):
+            self.assertIsNone(local_cache.get("key"))
+        self.assertEqual(local_cache.info()["size_bytes"], 0)
+
+    def test_evicts_least_recently_used_entries(self) -> None:
+        local_cache = LocalCache(max_bytes=10)
+        local_cache.set("a", b"aaaa", 10)
+        local_cache.set("b", b"bbbb", 10)
+        local_cache.get("a")
+        local_cache.set("c", b"cccc", 10)
+        self.assertEqual(local_cache.get("a"), b"aaaa")
+        self.assertIsNone(local_cache.get("b"))
+        self.assertEqual(local_cache.get("c"), b"cccc")
+        self.assertEqual(local_cache.info()["size_bytes"], 8)
+        self.assertEqual(metrics.api_cache_local_bytes._value.get(), 8)
+        self.assertEqual(metrics.api_cache_local_entries._value.get(), 2)
+
+    def test_refuses_entries_larger_than_the_cache(self) -> None:
+        local_cache = LocalCache(max_bytes=4)
+        local_cache.set("a", b"aaaaa", 10)
+        self.assertIsNone(local_cache.get("a"))
+
+    def test_apply_invalidation(self) -> None:
+        local_cache = LocalCache(max_bytes=1024)
+        for key in ["products:list:1", "products:list:2", "products:stats", "other"]:
+            local_cache.set(key, b"value", 10)
+        payload = json.dumps(
+            {"keys": ["products:stats"], "patterns": ["*products:list*"]}
+        )
+        apply_invalidation(local_cache, payload.encode())
+        self.assertEqual(local_cache.info()["entries"], 1)
+        self.assertEqual(local_cache.get("other"), b"value")
+        apply_invalidation(local_cache, json.dumps({"clear": True}))
+        self.assertEqual(local_cache.info()["entries"], 0)
+        self.assertEqual(metrics.api_cache_local_entries._value.get(), 0)
@@ -5,9 +5,12 @@ from django.http import HttpResponse
 from django.test import override_settings
 from rest_framework.reverse import reverse
 
+from user.tests.factories import AdminFactory
+
 from .utils import BaseActionTestCase
 
 APP_CONFIG_URL = reverse("app-config")
+APP_CACHE_STATS_URL = reverse("app-cache-stats")
 INDEX_URL = "/"
 ROBOTS_TXT_URL = "/robots.txt/"
 
@@ -43,3 +46,15 @@ class AppViewSetTestCase(BaseActionTestCase):
     def test_config_error_if_not_authenticated(self) -> None:
         response = self.api_client.get(APP_CONFIG_URL)
         self.assertEqual(response.status_code, 401)
+
+    def test_cache_stats_success(self) -> None:
+        self.api_client.force_authenticate(AdminFactory())
+        response = self.api_client.get(APP_CACHE_STATS_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hit_ratio", response.data["local"])
+        self.assertIn("hit_ratio", response.data["redis"])
+
+    def test_cache_stats_error_if_not_admin(self) -> None:
+        self.api_client.force_authenticate(self.user)
+        response = self.api_client.get(APP_CACHE_STATS_URL)
+        self.assertEqual(response.status_code, 403)
@@ -7,6 +7,7 @@ from django.conf import settings
 from django_utils_kit.test_utils import APITestCase, ImprovedTestCase
 from meilisearch import Client
 
+from core.local_cache import local_cache
 from user.models import User as UserType
 from user.tests.factories import UserFactory
 
@@ -24,6 +25,7 @@ class BaseTestCase(ImprovedTestCase):
 
     def setUp(self) -> None:
         super().setUp()
+        local_cache.clear()
         self._mock_celery_tasks()
 
     def _mock_celery_tasks(self) -> None:
@@ -32,10 +34,18 @@ class BaseTestCase(ImprovedTestCase):
         """
         names = [
             # Delay
+            "core.tasks.warm_api_cache.delay",
+            "products.tasks.generate_product_image_variants.delay",
+            "products.tasks.prune_product_tombstones.delay",
+            "products.tasks.repair_product_summary.delay",
             "user.tasks.index_all_users_atomically.delay",
             "user.tasks.index_users.delay",
             "user.tasks.unindex_users.delay",
             # Apply Async
+            "core.tasks.warm_api_cache.apply_async",
+            "products.tasks.generate_product_image_variants.apply_async",
+            "products.tasks.prune_product_tombstones.apply_async",
+            "products.tasks.repair_product_summary.apply_async",
             "user.tasks.index_all_users_atomically.apply_async",
             "user.tasks.index_users.apply_async",
             "user.tasks.unindex_users.apply_async",
@@ -10,6 +10,7 @@ from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from core.cache import get_cache_stats
 from core.serializers import AppConfigSerializer
 
 
@@ -31,6 +32,7 @@ class AppViewSet(ImprovedViewSet):
     default_permission_classes = [permissions.AllowAny]
     permission_classes_per_action = {
         "config": [permissions.AllowAny],
+        "cache_stats": [permissions.IsAdminUser],
     }
     serializer_class_per_action = {
         "config": AppConfigSerializer,
@@ -39,4 +41,9 @@ class AppViewSet(ImprovedViewSet):
     @action(detail=False, methods=["GET"])
     def config(self, _request: Request) -> Response:
         serializer = self.get_serializer()
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["GET"], url_path="cache-stats")
+    def cache_stats(self, _request: Request) -> Response:
+        """Hit ratios of each cache tier, for the worker serving the request."""
+        return Response(get_cache_stats())
\ No newline at end of file
@@ -3,7 +3,9 @@ from celery import Celery
 from django.conf import settings
 from kombu import Exchange, Queue
 
+from core.tasks import scheduled_cron_tasks as core_schedule
 from django_react_starter.settings.base import CELERY_CONFIG_PREFIX
+from products.tasks import scheduled_cron_tasks as products_schedule
 from user.tasks import scheduled_cron_tasks as user_schedule
 
 app = Celery("backend")
@@ -16,9 +18,21 @@ app.conf.task_queues = [
         Exchange(settings.RABBITMQ_USER_QUEUE),
         routing_key=settings.RABBITMQ_USER_QUEUE,
     ),
+    Queue(
+        settings.RABBITMQ_CACHE_QUEUE,
+        Exchange(settings.RABBITMQ_CACHE_QUEUE),
+        routing_key=settings.RABBITMQ_CACHE_QUEUE,
+    ),
+    Queue(
+        settings.RABBITMQ_PRODUCT_QUEUE,
+        Exchange(settings.RABBITMQ_PRODUCT_QUEUE),
+        routing_key=settings.RABBITMQ_PRODUCT_QUEUE,
+    ),
 ]
 
 app.conf.beat_schedule = {
+    **core_schedule,
+    **products_schedule,
     **user_schedule,
 }
 
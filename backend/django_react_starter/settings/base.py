@@ -50,6 +50,7 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.middleware.gzip.GZipMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -107,6 +108,8 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 # > Database
 # --------------------------------------------------------------------------------
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+# Covering indexes only have their non-key columns on PostgreSQL, plain indexes elsewhere
+SILENCED_SYSTEM_CHECKS = ["models.W040"]
 
 # PostgreSQL configuration
 POSTGRES_DB = os.getenv("POSTGRES_DB", "django_react_starter")
@@ -130,6 +133,24 @@ DATABASES = {
     }
 }
 
+# Read replicas of the primary, e.g. "replica-1,replica-2" (see core.db_router)
+POSTGRES_REPLICA_HOSTS = [
+    host for host in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",") if host
+]
+for index, host in enumerate(POSTGRES_REPLICA_HOSTS, start=1):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        # Tests use the primary only
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+DATABASE_REPLICA_MAX_LAG = 5  # seconds
+DATABASE_REPLICA_CHECK_INTERVAL = 5  # seconds
+# How long clients read from the primary after a write, to see their own writes
+READ_YOUR_WRITES_WINDOW = 10  # seconds
+
 # --------------------------------------------------------------------------------
 # > User, Passwords, and Authentication
 # --------------------------------------------------------------------------------
@@ -279,6 +300,8 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
 
 RABBITMQ_USER_QUEUE = "user-queue"
+RABBITMQ_CACHE_QUEUE = "cache-queue"
+RABBITMQ_PRODUCT_QUEUE = "product-queue"
 
 # --------------------------------------------------------------------------------
 # > Redis Cache
@@ -294,6 +317,10 @@ CACHES = {
         "LOCATION": REDIS_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # msgpack + compression of values above COMPRESS_MIN_LENGTH bytes
+            "SERIALIZER": "core.cache_serializers.CompactSerializer",
+            "COMPRESSOR": "core.cache_serializers.AutoCompressor",
+            "COMPRESS_MIN_LENGTH": 1024,
             "CONNECTION_POOL_KWARGS": {
                 "max_connections": 50,
                 "retry_on_timeout": True,
@@ -306,6 +333,14 @@ CACHES = {
     }
 }
 
+# In-process (L1) cache in front of Redis for `core.cache`, kept coherent through pub/sub
+API_CACHE_LOCAL_MAX_BYTES = int(os.getenv("API_CACHE_LOCAL_MAX_BYTES", 16 * 1024 * 1024))
+API_CACHE_INVALIDATION_CHANNEL = f"{APP_NAME}:cache-invalidation"
+# Responses larger than this are not cached by `core.cache` (admission policy)
+API_CACHE_MAX_ENTRY_BYTES = int(os.getenv("API_CACHE_MAX_ENTRY_BYTES", 2 * 1024 * 1024))
+# Host of the requests replayed to warm the cache (see core.cache_warming), in ALLOWED_HOSTS
+API_CACHE_WARMING_HOST = os.getenv("API_CACHE_WARMING_HOST", "localhost")
+
 # --------------------------------------------------------------------------------
 # > CORS Configuration
 # --------------------------------------------------------------------------------
@@ -81,4 +81,9 @@ DATABASES = {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
     }
-}
\ No newline at end of file
+}
+# Set SQLITE_REPLICA=1 to read through a second alias of the same file, to try the
+# replica routing (see core.db_router) locally
+if os.getenv("SQLITE_REPLICA"):
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
\ No newline at end of file
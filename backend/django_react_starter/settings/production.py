@@ -37,6 +37,7 @@ DATABASES = {
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
     }
 }
+DATABASE_REPLICAS = []
 # --------------------------------------------------------------------------------
 # > Email
 # --------------------------------------------------------------------------------
@@ -17,6 +17,9 @@ from core.views import AppViewSet, index, robots_txt
 app_config_view = AppViewSet.as_view({
     "get": "config",
 })
+app_cache_stats_view = AppViewSet.as_view({
+    "get": "cache_stats",
+})
 
 urlpatterns = [
     # Admin - MUST be first and specific
@@ -30,6 +33,7 @@ urlpatterns = [
     
     # App config (for CSRF token and app settings)
     path("api/v1/app/config/", app_config_view, name="app-config"),
+    path("api/v1/app/cache-stats/", app_cache_stats_view, name="app-cache-stats"),
     
     # API Documentation
     path("api/v1/schema/", SpectacularAPIView.as_view(), name="schema"),
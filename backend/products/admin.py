@@ -0,0 +1,88 @@
+"""
+Admin of the products, built for large tables:
+- Counts are estimated (see `core.pagination.EstimatedCountPaginator`), and the changelist
+  never counts the whole table to show the number of results of a search or filter.
+- Searches use the full-text index (see `products.search`), or the primary key for numbers,
+  including in the autocomplete widgets of the models referencing products.
+- Sorting is limited to the indexed columns, so that pages are read in index order.
+- Bulk actions are single UPDATE queries, instead of one save per product.
+"""
+
+from typing import Tuple
+
+from django.contrib import admin, messages
+from django.db.models import QuerySet
+from django.http import HttpRequest
+
+from core.pagination import EstimatedCountPaginator
+from products.models import Product
+from products.search import search_products
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    # List view
+    list_display = (
+        "id",
+        "name",
+        "price",
+        "is_featured",
+        "featured_rank",
+        "created_at",
+        "updated_at",
+    )
+    list_display_links = ("id", "name")
+    list_filter = ("is_featured",)
+    # Only used to show the search box: see get_search_results
+    search_fields = ("name",)
+    ordering = ("-created_at",)
+    sortable_by = ("id", "name", "price", "created_at", "updated_at")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    list_max_show_all = 200
+    actions = ("feature_products", "unfeature_products")
+
+    # Detail view
+    fieldsets = (
+        (None, {"fields": ("id", "name", "description", "price")}),
+        ("Featured", {"fields": ("is_featured", "featured_rank")}),
+        ("Image", {"fields": ("image", "image_width", "image_height")}),
+        ("History", {"fields": ("created_at", "updated_at")}),
+    )
+    readonly_fields = ("id", "image_width", "image_height", "created_at", "updated_at")
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        queryset = super().get_queryset(request)
+        # Not shown in the list, and possibly large
+        if request.resolver_match and request.resolver_match.url_name.endswith("_changelist"):
+            queryset = queryset.defer("description", "image_variants")
+        return queryset
+
+    def get_search_results(
+        self, request: HttpRequest, queryset: QuerySet, search_term: str
+    ) -> Tuple[QuerySet, bool]:
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            return queryset.filter(pk=int(search_term)), False
+        return search_products(queryset, search_term), False
+
+    @admin.action(description="Feature the selected products", permissions=("change",))
+    def feature_products(self, request: HttpRequest, queryset: QuerySet) -> None:
+        count = _selected(queryset).filter(is_featured=False).update(is_featured=True)
+        self.message_user(request, f"{count} product(s) featured.", messages.SUCCESS)
+
+    @admin.action(description="Unfeature the selected products", permissions=("change",))
+    def unfeature_products(self, request: HttpRequest, queryset: QuerySet) -> None:
+        count = _selected(queryset).filter(is_featured=True).update(
+            is_featured=False, featured_rank=0
+        )
+        self.message_user(request, f"{count} product(s) unfeatured.", messages.SUCCESS)
+
+
+def _selected(queryset: QuerySet) -> QuerySet:
+    # Selection as a subquery: the full-text search of SQLite joins its index in ways that
+    # UPDATE queries do not support
+    return Product.objects.filter(pk__in=queryset.order_by().values("pk"))
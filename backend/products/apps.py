@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        from products.cache import (
+            register_product_cache_dependencies,
+            register_product_warm_targets,
+        )
+        from products.changes import register_product_change_receivers
+        from products.images import register_product_image_receivers
+        from products.summary import register_product_summary_receivers
+
+        register_product_cache_dependencies()
+        register_product_warm_targets()
+        register_product_summary_receivers()
+        register_product_change_receivers()
+        register_product_image_receivers()
@@ -0,0 +1,50 @@
+from core.cache_invalidation import register_cache_dependency
+from core.cache_warming import register_warm_target
+
+# Cache tags (`key_prefix`) of the product endpoints
+PRODUCT_LIST_CACHE_TAG = "products:list"
+PRODUCT_DETAIL_CACHE_TAG = "products:detail"
+PRODUCT_FEATURED_CACHE_TAG = "products:featured"
+PRODUCT_STATS_CACHE_TAG = "products:stats"
+PRODUCT_PRICE_RANGE_CACHE_TAG = "products:price_range"
+PRODUCT_FACETS_CACHE_TAG = "products:facets"
+
+# Namespace of the serialized products (see core.fragment_cache), to bump whenever
+# their representation (ProductSerializer, products.representation) changes
+PRODUCT_FRAGMENT_NAMESPACE = "product:v3"
+
+
+def register_product_cache_dependencies() -> None:
+    from products.models import Product
+
+    register_cache_dependency(
+        Product,
+        tags=[
+            PRODUCT_LIST_CACHE_TAG,
+            PRODUCT_FEATURED_CACHE_TAG,
+            PRODUCT_STATS_CACHE_TAG,
+            PRODUCT_PRICE_RANGE_CACHE_TAG,
+            PRODUCT_FACETS_CACHE_TAG,
+        ],
+        object_tags=[PRODUCT_DETAIL_CACHE_TAG],
+    )
+
+
+def register_product_warm_targets() -> None:
+    view = "products.views.ProductViewSet"
+    register_warm_target(
+        PRODUCT_LIST_CACHE_TAG, view, "list", "product-list", PRODUCT_LIST_CACHE_TAG, top_params=20
+    )
+    register_warm_target(
+        PRODUCT_FEATURED_CACHE_TAG, view, "featured", "product-featured", PRODUCT_FEATURED_CACHE_TAG
+    )
+    register_warm_target(
+        PRODUCT_STATS_CACHE_TAG, view, "stats", "product-stats", PRODUCT_STATS_CACHE_TAG
+    )
+    register_warm_target(
+        PRODUCT_PRICE_RANGE_CACHE_TAG,
+        view,
+        "price_range",
+        "product-price-range",
+        PRODUCT_PRICE_RANGE_CACHE_TAG,
+    )
@@ -0,0 +1,160 @@
+"""
+Change feed of the products, for clients mirroring the catalog.
+
+Changes are read after a cursor, in `(changed_at, id)` order: updated (or created)
+products by `(updated_at, id)`, deleted ones from their tombstones by
+`(deleted_at, product_id)`. Both are keyset scans of an index, merged into a single page,
+so polling costs O(changes) whatever the size of the catalog.
+
+`updated_at` is set before the write commits: a slow transaction could commit a change
+behind a cursor that was already returned. Changes of the last `SETTLE_TIME` are therefore
+held back until every transaction that could precede them is committed.
+Tombstones are kept for `TOMBSTONE_RETENTION`: older cursors must resync from scratch.
+"""
+
+from base64 import b64decode, b64encode
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+import binascii
+import json
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q, QuerySet
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from products.models import Product, ProductTombstone
+from products.representation import product_values, represent_products
+
+DEFAULT_CHANGES_LIMIT = 100
+MAX_CHANGES_LIMIT = 1000
+SETTLE_TIME = timedelta(seconds=5)
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+class ExpiredCursor(Exception):
+    """The cursor is older than the retention of the tombstones."""
+
+
+def encode_cursor(changed_at: datetime, pk: int) -> str:
+    # Full precision: a truncated datetime would skip or repeat changes
+    payload = {"t": changed_at.isoformat(), "pk": pk}
+    return b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(encoded: str) -> Tuple[datetime, int]:
+    """Raises ValueError on invalid cursors."""
+    try:
+        payload = json.loads(b64decode(encoded.encode(), validate=True))
+        changed_at = parse_datetime(payload["t"])
+        pk = int(payload["pk"])
+    except (binascii.Error, KeyError, TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if changed_at is None or timezone.is_naive(changed_at):
+        raise ValueError("Invalid cursor")
+    return changed_at, pk
+
+
+def get_changes(
+    cursor: Optional[str],
+    fields: Sequence[str],
+    limit: int = DEFAULT_CHANGES_LIMIT,
+    using: str = DEFAULT_DB_ALIAS,
+) -> Dict[str, Any]:
+    """
+    Returns the changes following a cursor, oldest first.
+
+    Args:
+        cursor: Cursor returned by the previous call, None to start from the beginning
+        fields: Fields of the updated products (see ProductSerializer)
+        limit: Maximum number of changes
+        using: Database alias to read from
+
+    Returns:
+        The changes (`{"id", "change": "updated", "product"}` or `{"id", "change": "deleted"}`),
+        the cursor to continue from and whether more changes are available right away
+
+    Raises:
+        ValueError: On invalid cursors
+        ExpiredCursor: If deletions since the cursor may have been pruned
+    """
+    position = decode_cursor(cursor) if cursor else None
+    now = timezone.now()
+    if position is not None and position[0] < now - TOMBSTONE_RETENTION:
+        raise ExpiredCursor()
+    settled = now - SETTLE_TIME
+
+    products = _after(Product.objects.using(using), "updated_at", "id", position, settled)
+    rows = list(product_values(products, [*fields, "updated_at"])[: limit + 1])
+    tombstones = _after(
+        ProductTombstone.objects.using(using), "deleted_at", "product_id", position, settled
+    )
+    deletions = list(tombstones.values_list("deleted_at", "product_id")[: limit + 1])
+
+    changes = sorted(
+        [((row["updated_at"], row["id"]), UPDATED, row) for row in rows]
+        + [((deleted_at, pk), DELETED, pk) for deleted_at, pk in deletions],
+        key=lambda change: change[0],
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    updated = [row for _, change, row in changes if change == UPDATED]
+    represented = iter(represent_products(updated, fields))
+    results = []
+    for (_, pk), change, _ in changes:
+        result = {"id": pk, "change": change}
+        if change == UPDATED:
+            result["product"] = next(represented)
+        results.append(result)
+    if changes:
+        cursor = encode_cursor(*changes[-1][0])
+    return {"results": results, "cursor": cursor, "has_more": has_more}
+
+
+def _after(
+    queryset: QuerySet,
+    field: str,
+    pk_field: str,
+    position: Optional[Tuple[datetime, int]],
+    until: datetime,
+) -> QuerySet:
+    queryset = queryset.filter(**{f"{field}__lte": until}).order_by(field, pk_field)
+    if position is None:
+        return queryset
+    changed_at, pk = position
+    return queryset.filter(
+        Q(**{f"{field}__gt": changed_at}) | Q(**{field: changed_at, f"{pk_field}__gt": pk})
+    )
+
+
+def record_tombstones(pks: Iterable[int], using: str = DEFAULT_DB_ALIAS) -> None:
+    """Records the deletion of products, in a single upsert."""
+    deleted_at = timezone.now()
+    ProductTombstone.objects.using(using).bulk_create(
+        [ProductTombstone(product_id=pk, deleted_at=deleted_at) for pk in pks],
+        update_conflicts=True,
+        unique_fields=["product_id"],
+        update_fields=["deleted_at"],
+    )
+
+
+def prune_tombstones(using: str = DEFAULT_DB_ALIAS) -> int:
+    """Deletes the tombstones past their retention, returns how many were deleted."""
+    expired = ProductTombstone.objects.using(using).filter(
+        deleted_at__lt=timezone.now() - TOMBSTONE_RETENTION
+    )
+    deleted, _ = expired.delete()
+    return deleted
+
+
+def register_product_change_receivers() -> None:
+    post_delete.connect(_on_delete, sender=Product, dispatch_uid="product-changes-delete")
+
+
+def _on_delete(sender: Any, instance: Product, using: str, **kwargs: Any) -> None:
+    record_tombstones([instance.pk], using=using)
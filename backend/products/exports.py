@@ -0,0 +1,83 @@
+"""
+Streaming export of products as CSV or NDJSON.
+
+Products are read as rows through a database iterator (a server-side cursor on
+PostgreSQL) and represented chunk by chunk with `products.representation`, without
+instantiating models or serializers: memory stays flat whatever the number of exported
+products. Compression is left to `GZipMiddleware`, which compresses streamed responses
+on the fly when the client accepts gzip.
+"""
+
+from typing import Any, Dict, Iterator, List
+import csv
+import io
+import json
+
+from django.db.models import QuerySet
+
+from products.representation import product_values, represent_products
+
+EXPORT_CHUNK_SIZE = 2000
+# Rows per chunk of the response
+ROWS_PER_CHUNK = 500
+# Fields of ProductSerializer, but the image (served separately)
+COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "price_display",
+    "created_at",
+    "updated_at",
+    "is_featured",
+    "featured_rank",
+)
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def export_products(
+    queryset: QuerySet, format: str, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Generates the chunks of the export of the products of a queryset.
+
+    Args:
+        queryset: Products to export, in order
+        format: "csv" (with a header row) or "ndjson" (one JSON object per line)
+        chunk_size: Number of products fetched from the database at a time
+    """
+    records = _record_chunks(queryset, chunk_size)
+    if format == "csv":
+        return _csv_chunks(records)
+    return _ndjson_chunks(records)
+
+
+def _record_chunks(queryset: QuerySet, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    rows = product_values(queryset, COLUMNS).iterator(chunk_size=chunk_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == ROWS_PER_CHUNK:
+            yield represent_products(chunk, COLUMNS)
+            chunk = []
+    if chunk:
+        yield represent_products(chunk, COLUMNS)
+
+
+def _csv_chunks(chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for records in chunks:
+        writer.writerows(records)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # The header alone if there is no product
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[str]:
+    for records in chunks:
+        yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
@@ -0,0 +1,116 @@
+"""
+Price histogram of products, computed with a single grouped query.
+
+The products to count come from any queryset (e.g. the list filters), used as a
+subquery. Window functions provide the bounds of the histogram in the same query:
+- "fixed" buckets have the same width between the min and max price, numbered with
+  `width_bucket` on PostgreSQL and an integer division elsewhere.
+- "quantile" buckets have (about) the same number of products, numbered with `ntile`.
+"""
+
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import QuerySet
+
+FIXED = "fixed"
+QUANTILE = "quantile"
+BUCKETINGS = (FIXED, QUANTILE)
+DEFAULT_BUCKETS = 10
+MAX_BUCKETS = 50
+CENT = Decimal("0.01")
+
+# 0-based bucket of each price, "low" and "high" being the min and max price
+POSTGRESQL_FIXED_BUCKET = (
+    "CASE WHEN high = low THEN 0 ELSE LEAST(width_bucket(price, low, high, %s), %s) - 1 END"
+)
+FIXED_BUCKET = (
+    "CASE WHEN high = low THEN 0 WHEN price >= high THEN %s - 1 "
+    "ELSE CAST((price - low) * %s / (high - low) AS INTEGER) END"
+)
+FIXED_SQL = """
+SELECT bucket, COUNT(*), MIN(low), MIN(high) FROM (
+    SELECT price, low, high, {bucket} AS bucket FROM (
+        SELECT price, MIN(price) OVER () AS low, MAX(price) OVER () AS high
+        FROM ({products}) AS products
+    ) AS bounded
+) AS bucketed
+GROUP BY bucket ORDER BY bucket
+"""
+QUANTILE_SQL = """
+SELECT bucket, COUNT(*), MIN(price), MAX(price) FROM (
+    SELECT price, NTILE(%s) OVER (ORDER BY price) AS bucket FROM ({products}) AS products
+) AS bucketed
+GROUP BY bucket ORDER BY bucket
+"""
+
+
+def price_histogram(
+    queryset: QuerySet, buckets: int = DEFAULT_BUCKETS, bucketing: str = FIXED
+) -> Dict[str, Any]:
+    """
+    Counts the products of a queryset by price bucket.
+
+    Args:
+        queryset: Products to count
+        buckets: Number of buckets (fewer quantile buckets if there are fewer products)
+        bucketing: "fixed" (same width) or "quantile" (same number of products)
+
+    Returns:
+        The total count, min and max price, and the min, max and count of each bucket
+    """
+    try:
+        products_sql, products_params = queryset.order_by().values("price").query.sql_with_params()
+    except EmptyResultSet:
+        # e.g. a search without any term
+        return {"count": 0, "min_price": None, "max_price": None, "buckets": []}
+    connection = connections[queryset.db]
+    if bucketing == FIXED:
+        bucket = POSTGRESQL_FIXED_BUCKET if connection.vendor == "postgresql" else FIXED_BUCKET
+        sql = FIXED_SQL.format(bucket=bucket, products=products_sql)
+        params = [buckets, buckets, *products_params]
+    else:
+        sql = QUANTILE_SQL.format(products=products_sql)
+        params = [buckets, *products_params]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    if bucketing == FIXED:
+        histogram = _fixed_buckets(rows, buckets)
+    else:
+        histogram = [
+            {"min": _price(low), "max": _price(high), "count": count}
+            for _, count, low, high in rows
+        ]
+    return {
+        "count": sum(bucket["count"] for bucket in histogram),
+        "min_price": histogram[0]["min"] if histogram else None,
+        "max_price": histogram[-1]["max"] if histogram else None,
+        "buckets": histogram,
+    }
+
+
+def _fixed_buckets(rows: List[Any], buckets: int) -> List[Dict[str, Any]]:
+    if not rows:
+        return []
+    low, high = _price(rows[0][2]), _price(rows[0][3])
+    counts = {bucket: count for bucket, count, _, _ in rows}
+    if low == high:
+        return [{"min": low, "max": high, "count": counts[0]}]
+    width = (high - low) / buckets
+    return [
+        {
+            "min": (low + width * index).quantize(CENT),
+            "max": high if index == buckets - 1 else (low + width * (index + 1)).quantize(CENT),
+            "count": counts.get(index, 0),
+        }
+        for index in range(buckets)
+    ]
+
+
+def _price(value: Any) -> Optional[Decimal]:
+    # Some databases (e.g. SQLite) return prices computed by SQL as floats
+    return None if value is None else Decimal(str(value)).quantize(CENT)
@@ -0,0 +1,148 @@
+"""
+Product images and their responsive variants.
+
+Originals are stored under a name derived from their content, and their variants (resized
+copies, in the original format and in WebP) under a name derived from the original and the
+variant: a URL never changes content, so it can be cached forever by browsers and proxies.
+Variants are generated by a Celery task once the upload is committed (see
+`products.tasks.generate_product_image_variants`), so uploads never wait for the resizing.
+Until then, the original is served.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+
+# Widths of the variants, only the ones narrower than the original are generated
+PRODUCT_IMAGE_WIDTHS = (320, 640, 1280)
+PRODUCT_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+# To bump whenever the variants change (e.g. their quality), so that they get new URLs
+VARIANTS_VERSION = 1
+WEBP = "webp"
+SAVE_OPTIONS = {
+    "JPEG": {"quality": 85, "optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"quality": 80, "method": 6},
+}
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Storage of files named after their content: saving an existing name keeps the file.
+    Concurrent saves of the same name (e.g. the same image uploaded for two products) may
+    both write it, overwriting the same content.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(allow_overwrite=True, **kwargs)
+
+    def _save(self, name: str, content: Any) -> str:
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+product_image_storage = ContentAddressedStorage()
+
+
+def product_image_path(instance: Any, filename: str) -> str:
+    """`upload_to` of `Product.image`: the name of the file derives from its content."""
+    file = instance.image.file
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    extension = os.path.splitext(filename)[1].lower()
+    return f"products/{digest.hexdigest()[:32]}{extension}"
+
+
+def generate_variants(
+    name: str, widths: Sequence[int] = PRODUCT_IMAGE_WIDTHS
+) -> List[Dict[str, Any]]:
+    """
+    Generates the variants of an original image, narrowest first.
+
+    Each width gets a variant in the format of the original (JPEG, or PNG for images with
+    transparency) and a WebP one. Images narrower than every width get a single pair of
+    variants at their own width, still much lighter than an unoptimized original.
+    Variants that already exist (e.g. of the same image uploaded for another product)
+    are reused.
+    """
+    with product_image_storage.open(name) as file, Image.open(file) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    fallback = "PNG" if has_alpha else "JPEG"
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    stem = os.path.splitext(os.path.basename(name))[0]
+    variants = []
+    for width in [width for width in widths if width < image.width] or [image.width]:
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for format in (fallback, WEBP.upper()):
+            extension = format.lower()
+            variant_name = f"products/variants/{stem}-{width}w-v{VARIANTS_VERSION}.{extension}"
+            if not product_image_storage.exists(variant_name):
+                buffer = io.BytesIO()
+                resized.save(buffer, format, **SAVE_OPTIONS[format])
+                product_image_storage.save(variant_name, ContentFile(buffer.getvalue()))
+            variants.append(
+                {"name": variant_name, "format": extension, "width": width, "height": height}
+            )
+    return variants
+
+
+def image_representation(
+    name: Optional[str],
+    variants: Sequence[Dict[str, Any]],
+    width: Optional[int],
+    height: Optional[int],
+) -> Optional[Dict[str, Any]]:
+    """
+    The `image` of a product: its dimensions, a `src` for browsers ignoring `srcset`,
+    and the `srcset` of the variants in the format of the original and in WebP
+    (empty until the variants are generated).
+    """
+    if not name:
+        return None
+    url = product_image_storage.url
+    fallbacks = [variant for variant in variants if variant["format"] != WEBP]
+    webps = [variant for variant in variants if variant["format"] == WEBP]
+    return {
+        "src": url(fallbacks[-1]["name"]) if fallbacks else url(name),
+        "width": width,
+        "height": height,
+        "srcset": _srcset(fallbacks),
+        "webp_srcset": _srcset(webps),
+    }
+
+
+def _srcset(variants: Sequence[Dict[str, Any]]) -> str:
+    return ", ".join(
+        f"{product_image_storage.url(variant['name'])} {variant['width']}w" for variant in variants
+    )
+
+
+def register_product_image_receivers() -> None:
+    from products.models import Product
+
+    post_save.connect(_on_save, sender=Product, dispatch_uid="product-image-save")
+
+
+def _on_save(sender: Any, instance: Any, using: str, **kwargs: Any) -> None:
+    if getattr(instance, "_image_uploaded", False):
+        from products.tasks import generate_product_image_variants
+
+        pk, name = instance.pk, instance.image.name
+        transaction.on_commit(lambda: generate_product_image_variants.delay(pk, name), using=using)
+        instance._image_uploaded = False
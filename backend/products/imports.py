@@ -0,0 +1,210 @@
+"""
+Bulk import of products from CSV or NDJSON streams.
+
+Rows are parsed lazily and validated with the rules of `ProductCreateSerializer`, then
+written with one `bulk_create` per chunk, each in its own transaction: memory stays
+flat whatever the size of the input. Rows with an `id` update the existing product
+(or create it with that id): when several rows of a chunk have the same id, only the last
+one is written, and the others are reported as duplicates. Invalid rows are reported and
+skipped without aborting the import. The caches and the summary are only refreshed once, at the end.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import codecs
+import csv
+import json
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from rest_framework import serializers
+
+from core.cache_invalidation import invalidate_model_cache
+from products.models import Product
+from products.serializers import ProductCreateSerializer
+from products.summary import refresh_product_summary
+
+IMPORT_BATCH_SIZE = 2000
+MAX_IMPORT_BATCH_SIZE = 10_000
+# Errors and duplicates kept in the report, the following ones are only counted
+MAX_REPORTED_ERRORS = 1000
+CSV_COLUMNS = ("name", "description", "price")
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+UPDATED_FIELDS = ["name", "description", "price", "updated_at"]
+
+Row = Tuple[int, Any]
+
+
+class ImportReport:
+    def __init__(self) -> None:
+        self.imported = 0
+        self.failed = 0
+        self.duplicated = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.duplicates: List[Dict[str, Any]] = []
+
+    def add_error(self, row: int, errors: Any) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def add_duplicate(self, row: int, pk: int, replaced_by: int) -> None:
+        self.duplicated += 1
+        if len(self.duplicates) < MAX_REPORTED_ERRORS:
+            self.duplicates.append({"row": row, "id": pk, "replaced_by": replaced_by})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "duplicated": self.duplicated,
+            "errors": self.errors,
+            "duplicates": self.duplicates,
+        }
+
+
+def import_products(
+    lines: Iterable[str],
+    format: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    using: str = DEFAULT_DB_ALIAS,
+) -> ImportReport:
+    """
+    Imports products from the lines of a CSV or NDJSON document.
+
+    Args:
+        lines: Lines of the document, read as they are consumed
+        format: "csv" (with a header row) or "ndjson" (one JSON object per line)
+        batch_size: Number of products written per query and transaction
+        using: Database alias to write to
+
+    Raises:
+        serializers.ValidationError: If the format or the CSV header is invalid
+    """
+    rows = _parse(lines, format)
+    report = ImportReport()
+    serializer = ProductCreateSerializer()
+    with_ids = False
+    try:
+        for batch in _batches(rows, batch_size):
+            new: List[Product] = []
+            existing: Dict[int, Tuple[int, Product]] = {}
+            for number, data in batch:
+                product = _validate_row(serializer, data)
+                if not isinstance(product, Product):
+                    report.add_error(number, product)
+                elif product.pk is None:
+                    new.append(product)
+                else:
+                    # An upsert cannot write the same row twice: the last occurrence wins
+                    if product.pk in existing:
+                        report.add_duplicate(existing[product.pk][0], product.pk, number)
+                    existing[product.pk] = (number, product)
+            _write(new, [product for _, product in existing.values()], using)
+            with_ids = with_ids or bool(existing)
+            report.imported += len(new) + len(existing)
+    finally:
+        if with_ids:
+            _reset_sequence(using)
+        if report.imported:
+            # Imported products may already be cached (e.g. not found details)
+            invalidate_model_cache(Product, using=using)
+            refresh_product_summary(using=using)
+    return report
+
+
+def decode_lines(stream: Iterable[bytes]) -> Iterator[str]:
+    """Decodes the lines of a binary stream (e.g. a request body) as they are read."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for number, line in enumerate(stream, start=1):
+        try:
+            yield decoder.decode(line)
+        except UnicodeDecodeError:
+            raise serializers.ValidationError(f"Line {number} is not valid UTF-8")
+
+
+def _parse(lines: Iterable[str], format: str) -> Iterator[Row]:
+    if format == "csv":
+        return _parse_csv(lines)
+    if format == "ndjson":
+        return _parse_ndjson(lines)
+    raise serializers.ValidationError(f"Unknown format {format!r}, expected one of {FORMATS}")
+
+
+def _parse_csv(lines: Iterable[str]) -> Iterator[Row]:
+    reader = csv.DictReader(lines)
+    missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise serializers.ValidationError(f"Missing CSV columns: {', '.join(missing)}")
+    for number, row in enumerate(reader, start=1):
+        if not row.get("id"):
+            row.pop("id", None)
+        yield number, row
+
+
+def _parse_ndjson(lines: Iterable[str]) -> Iterator[Row]:
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+def _batches(rows: Iterator[Row], size: int) -> Iterator[List[Row]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate_row(serializer: ProductCreateSerializer, data: Any) -> Any:
+    """Returns the product to write, or the errors of the row."""
+    if not isinstance(data, dict):
+        return {"non_field_errors": ["Expected a JSON object."]}
+    pk = data.get("id")
+    if pk is not None and (not str(pk).isdigit() or int(pk) == 0):
+        return {"id": ["A valid positive integer is required."]}
+    try:
+        # The field validation and `validate_<field>` rules of the create endpoint
+        values = serializer.to_internal_value(data)
+    except serializers.ValidationError as error:
+        return error.detail
+    return Product(pk=None if pk is None else int(pk), **values)
+
+
+def _write(new: List[Product], existing: List[Product], using: str) -> None:
+    """Writes a chunk: the new products, and the upserts of products with distinct ids."""
+    # The plain queryset: the caches and summary are refreshed once the import is over
+    queryset = models.QuerySet(Product).using(using)
+    with transaction.atomic(using=using):
+        if new:
+            queryset.bulk_create(new)
+        if existing:
+            queryset.bulk_create(
+                existing,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=UPDATED_FIELDS,
+            )
+
+
+def _reset_sequence(using: str) -> None:
+    # Explicit ids do not advance the id sequence (e.g. on PostgreSQL)
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), [Product])
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,97 @@
+from typing import Any, Callable, List
+import random
+import statistics
+import time
+
+from django.core.management import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import Q
+
+from products.models import Product
+from products.search import search_products
+
+WORDS = (
+    "wireless keyboard mouse monitor laptop desk chair lamp cable charger speaker headset "
+    "camera microphone webcam router adapter battery backpack notebook pen marker bottle "
+    "mug bag phone tablet watch stand dock hub drive memory card fan cooler case screen "
+    "light switch plug sensor remote controller gamepad printer scanner paper ink toner "
+    "mechanical ergonomic portable compact premium classic smart silent fast slim heavy "
+    "black white silver blue red green aluminium wooden leather plastic steel glass"
+).split()
+SYLLABLES = "ka lo mi ne ru ta vo zi pe qu ba do fi gu ho ja".split()
+DEFAULT_QUERIES = ["keyboard", "wireless mouse", "ergo", "silent mechanical keyboard", "kalomi"]
+BATCH_SIZE = 5000
+PAGE_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the full-text search of products with the former icontains filter. "
+        "Products are generated in a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--products", type=int, default=100_000, help="Number of products to generate"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Number of runs of each query"
+        )
+        parser.add_argument(
+            "queries", nargs="*", help=f"Searches to run (default: {DEFAULT_QUERIES})"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        queries = options["queries"] or DEFAULT_QUERIES
+        with transaction.atomic():
+            self._generate_products(options["products"])
+            print(f"{'search':<30} {'icontains (ms)':>15} {'full-text (ms)':>15} {'matches':>10}")
+            for query in queries:
+                icontains_ms = self._time(lambda: _icontains_page(query), options["repeat"])
+                search_ms = self._time(lambda: _search_page(query), options["repeat"])
+                matches = search_products(Product.objects.all(), query).count()
+                print(f"{query:<30} {icontains_ms:>15.2f} {search_ms:>15.2f} {matches:>10}")
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _generate_products(count: int) -> None:
+        rng = random.Random(0)
+        for start in range(0, count, BATCH_SIZE):
+            Product.objects.bulk_create(
+                Product(
+                    # Brand names make for rarer terms than the shared vocabulary
+                    name=" ".join([*rng.choices(WORDS, k=2), _brand(rng)]).capitalize(),
+                    description=" ".join(rng.choices(WORDS, k=40)),
+                    price=rng.randint(100, 100_000) / 100,
+                )
+                for _ in range(min(BATCH_SIZE, count - start))
+            )
+        print(f"{count} products generated")
+
+    @staticmethod
+    def _time(run: Callable[[], List[Any]], repeat: int) -> float:
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            durations.append((time.perf_counter() - start) * 1000)
+        return statistics.median(durations)
+
+
+def _brand(rng: random.Random) -> str:
+    return "".join(rng.choices(SYLLABLES, k=3))
+
+
+# Both run what a search request of the list endpoint runs: a count and the first page
+def _icontains_page(query: str) -> List[Any]:
+    queryset = Product.objects.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    ).order_by("-created_at", "-pk")
+    queryset.count()
+    return list(queryset[:PAGE_SIZE])
+
+
+def _search_page(query: str) -> List[Any]:
+    queryset = search_products(Product.objects.all(), query).order_by("-rank", "-pk")
+    queryset.count()
+    return list(queryset[:PAGE_SIZE])
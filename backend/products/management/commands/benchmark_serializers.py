@@ -0,0 +1,75 @@
+from typing import Any, Callable, List
+import random
+import statistics
+import time
+
+from django.core.management import BaseCommand, CommandParser
+from django.db import transaction
+
+from products.models import Product
+from products.representation import product_values, represent_products
+from products.serializers import ProductSerializer
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ProductSerializer with the read-only representation of products, "
+        "fetch included. Products are generated in a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "sizes", nargs="*", type=int, help=f"Numbers of products (default: {DEFAULT_SIZES})"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Number of runs of each serialization"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        sizes = sorted(options["sizes"] or DEFAULT_SIZES)
+        fields = ProductSerializer.select_fields({})
+        with transaction.atomic():
+            self._generate_products(sizes[-1])
+            print(
+                f"{'products':>10} {'serializer (ms)':>16} {'representation (ms)':>20} "
+                f"{'speedup':>8}"
+            )
+            for size in sizes:
+                queryset = Product.objects.order_by("pk")[:size]
+                serializer_ms = self._time(
+                    lambda: ProductSerializer(queryset, many=True).data, options["repeat"]
+                )
+                representation_ms = self._time(
+                    lambda: represent_products(product_values(queryset, fields), fields),
+                    options["repeat"],
+                )
+                print(
+                    f"{size:>10} {serializer_ms:>16.1f} {representation_ms:>20.1f} "
+                    f"{serializer_ms / representation_ms:>7.1f}x"
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _generate_products(count: int) -> None:
+        rng = random.Random(0)
+        for start in range(0, count, BATCH_SIZE):
+            Product.objects.bulk_create(
+                Product(
+                    name=f"Product {start + index}",
+                    description="A product description " * 10,
+                    price=rng.randint(100, 100_000) / 100,
+                )
+                for index in range(min(BATCH_SIZE, count - start))
+            )
+
+    @staticmethod
+    def _time(run: Callable[[], List[Any]], repeat: int) -> float:
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            durations.append((time.perf_counter() - start) * 1000)
+        return statistics.median(durations)
@@ -0,0 +1,60 @@
+from typing import Any
+import os
+import time
+
+from django.core.management import BaseCommand, CommandError, CommandParser
+from rest_framework import serializers
+
+from products.imports import FORMATS, IMPORT_BATCH_SIZE, import_products
+
+EXTENSION_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import products from a CSV (with a name, description and price header) "
+        "or NDJSON file. Rows with an id update the existing product."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help="File to import")
+        parser.add_argument(
+            "--format", choices=FORMATS, help="Format of the file (default: from its extension)"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Number of products written per query and transaction",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = options["path"]
+        format = options["format"] or EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            raise CommandError("Unknown file extension, use --format")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+        start = time.perf_counter()
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as file:
+                report = import_products(file, format, options["batch_size"])
+        except serializers.ValidationError as error:
+            raise CommandError(" ".join(str(detail) for detail in error.detail))
+        except (OSError, UnicodeDecodeError) as error:
+            raise CommandError(str(error))
+        duration = time.perf_counter() - start
+        print(
+            f"{report.imported} imported, {report.duplicated} duplicated, "
+            f"{report.failed} failed in {duration:.1f}s"
+        )
+        for duplicate in report.duplicates:
+            print(
+                f"Row {duplicate['row']}: id {duplicate['id']} "
+                f"replaced by row {duplicate['replaced_by']}"
+            )
+        for error in report.errors:
+            messages = "; ".join(
+                f"{field}: {' '.join(map(str, errors))}" for field, errors in error["errors"].items()
+            )
+            print(f"Row {error['row']}: {messages}")
@@ -0,0 +1,15 @@
+from typing import Any
+
+from django.core.management import BaseCommand
+
+from products.summary import repair_product_summary
+
+
+class Command(BaseCommand):
+    help = "Recompute the maintained product summary, repairing it if it drifted"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if repair_product_summary():
+            print("Product summary repaired")
+        else:
+            print("Product summary up to date")
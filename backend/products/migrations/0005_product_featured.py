@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:54
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# SQLite rebuilds the products table to add a NOT NULL column, which drops the triggers
+# keeping the full-text index up to date (see 0002_product_search): they are recreated.
+product_search = import_module('products.migrations.0002_product_search')
+restore_search_triggers = product_search._run({
+    'sqlite': [*product_search.SQLITE_BACKWARD[:3], *product_search.SQLITE_FORWARD[1:]],
+})
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='product',
+            name='featured_rank',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='is_featured',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['featured_rank', 'id'], name='product_featured_idx'),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
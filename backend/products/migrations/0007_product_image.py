@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:06
+
+from importlib import import_module
+
+import products.images
+from django.db import migrations, models
+
+# SQLite rebuilds the products table to add a NOT NULL column, which drops the triggers
+# keeping the full-text index up to date (see 0002_product_search): they are recreated.
+product_search = import_module('products.migrations.0002_product_search')
+restore_search_triggers = product_search._run({
+    'sqlite': [*product_search.SQLITE_BACKWARD[:3], *product_search.SQLITE_FORWARD[1:]],
+})
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_changes'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(blank=True, height_field='image_height', max_length=200, storage=products.images.ContentAddressedStorage(), upload_to=products.images.product_image_path, width_field='image_width'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,40 @@
-# File: products/models.py
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
+
+from core.cache_invalidation import CacheInvalidatingQuerySet
+from products.images import product_image_path, product_image_storage
+
+
+class ProductQuerySet(CacheInvalidatingQuerySet):
+    """
+    Bulk operations do not send model signals: the summary is recomputed after them,
+    in the same transaction (`delete` sends `post_delete` for each product).
+    Bulk updates also set `updated_at`, as `save` does (see products.changes).
+    """
+
+    def update(self, **kwargs):
+        from products.summary import refresh_product_summary
+
+        # `auto_now` is only applied by `save`: bulk updates must reach the change feed too
+        kwargs.setdefault('updated_at', timezone.now())
+        with transaction.atomic(using=self.db):
+            rows = super().update(**kwargs)
+            if rows and 'price' in kwargs:
+                refresh_product_summary(using=self.db)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from products.summary import refresh_product_summary
+
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            if objs:
+                refresh_product_summary(using=self.db)
+        return objs
+
+    def featured(self):
+        return self.filter(is_featured=True).order_by('featured_rank', 'pk')
+
 
 class Product(models.Model):
     name = models.CharField(max_length=200)
@@ -7,6 +42,97 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    is_featured = models.BooleanField(default=False)
+    # Featured products are shown by ascending rank
+    featured_rank = models.PositiveSmallIntegerField(default=0)
+    # Original image, served through its variants (see products.images)
+    image = models.ImageField(
+        upload_to=product_image_path,
+        storage=product_image_storage,
+        width_field='image_width',
+        height_field='image_height',
+        max_length=200,
+        blank=True,
+    )
+    image_width = models.PositiveIntegerField(null=True, blank=True)
+    image_height = models.PositiveIntegerField(null=True, blank=True)
+    image_variants = models.JSONField(default=list, blank=True)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        # One per ordering of the list (see ProductPagination), with the primary key as
+        # tie-breaker: pages are read in index order instead of sorting the table. On
+        # PostgreSQL, they include the other listed columns for index-only scans.
+        indexes = [
+            models.Index(
+                fields=['created_at', 'id'],
+                include=['name', 'price', 'updated_at'],
+                name='product_created_at_id_idx',
+            ),
+            models.Index(
+                fields=['price', 'id'],
+                include=['name', 'created_at', 'updated_at'],
+                name='product_price_id_idx',
+            ),
+            models.Index(
+                fields=['name', 'id'],
+                include=['price', 'created_at', 'updated_at'],
+                name='product_name_id_idx',
+            ),
+            # Change feed (see products.changes)
+            models.Index(fields=['updated_at', 'id'], name='product_updated_at_id_idx'),
+            # Only the few featured products
+            models.Index(
+                fields=['featured_rank', 'id'],
+                condition=models.Q(is_featured=True),
+                name='product_featured_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        # The variants of a new image are generated once it is committed (see products.images)
+        self._image_uploaded = bool(self.image) and not self.image._committed
+        if self._image_uploaded or not self.image:
+            self.image_variants = []
+        # The summary is updated by the pre_save and post_save receivers, in the same transaction
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class ProductSummary(models.Model):
+    """
+    Aggregates of all the products, kept up to date on every product write
+    (see products.summary) so that reading them never scans the products table.
+    It has a single row.
+    """
+
+    count = models.PositiveIntegerField(default=0)
+    total_price = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+
+    def __str__(self):
+        return f"{self.count} products"
+
+
+class ProductTombstone(models.Model):
+    """
+    Deleted product, so that the change feed (see products.changes) can report deletions.
+    Tombstones are pruned after `TOMBSTONE_RETENTION`.
+    """
+
+    product_id = models.BigIntegerField(unique=True)
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'product_id'], name='product_tombstone_idx'),
+        ]
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"Product {self.product_id} deleted at {self.deleted_at}"
@@ -0,0 +1,17 @@
+from core.pagination import KeysetPagination
+
+
+class ProductPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+    orderings = ("-created_at", "created_at", "price", "-price", "name", "-name")
+    search_query_param = "search"
+
+    def get_ordering(self, request):
+        # Searches are ordered by relevance (see products.search), unless asked otherwise
+        if (
+            request.query_params.get(self.search_query_param)
+            and self.ordering_query_param not in request.query_params
+        ):
+            return "-rank"
+        return super().get_ordering(request)
@@ -0,0 +1,76 @@
+"""
+Read-only representation of products built from `.values()` rows.
+
+It produces the output of `ProductSerializer` (with the same sparse fieldsets) without
+instantiating models nor serializer fields for each product: values are formatted
+column by column, e.g. `price_display` reuses the formatted prices. Reads (list, detail,
+export) go through it, writes still go through the serializers.
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework.settings import api_settings
+
+from products.images import image_representation
+from products.serializers import ProductSerializer
+
+
+def product_values(queryset: QuerySet, fields: Sequence[str]) -> QuerySet:
+    """The rows to represent the products of a queryset with the given fields."""
+    model_fields = ProductSerializer.get_model_fields(fields)
+    return queryset.values(*dict.fromkeys(["id", *model_fields]))
+
+
+def represent_products(
+    rows: Iterable[Dict[str, Any]], fields: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """
+    Represents `product_values` rows as `ProductSerializer(..., fields=fields)` would.
+    """
+    rows = list(rows)
+    columns = {}
+    if "price" in fields or "price_display" in fields:
+        prices = [f"{row['price']:.2f}" for row in rows]
+        if "price" in fields:
+            coerce = api_settings.COERCE_DECIMAL_TO_STRING
+            columns["price"] = prices if coerce else [row["price"] for row in rows]
+        if "price_display" in fields:
+            columns["price_display"] = ["$" + price for price in prices]
+    if "image" in fields:
+        columns["image"] = [
+            image_representation(
+                row["image"], row["image_variants"], row["image_width"], row["image_height"]
+            )
+            for row in rows
+        ]
+    for field in fields:
+        if field not in columns:
+            values = [row[field] for row in rows]
+            columns[field] = list(map(_FORMATS[field](), values)) if field in _FORMATS else values
+    values = [columns[field] for field in fields]
+    return [dict(zip(fields, product)) for product in zip(*values)]
+
+
+def _datetime_format() -> Callable[[datetime], str]:
+    # As rendered by rest_framework's DateTimeField, with the current timezone resolved once
+    current_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def format(value: datetime) -> str:
+        if current_timezone is not None:
+            value = value.astimezone(current_timezone)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[: -len("+00:00")] + "Z"
+        return value
+
+    return format
+
+
+_FORMATS: Dict[str, Callable[[], Callable[[Any], Any]]] = {
+    "created_at": _datetime_format,
+    "updated_at": _datetime_format,
+}
@@ -0,0 +1,84 @@
+"""
+Full-text search of products, relevance-ranked and matching word prefixes.
+
+- PostgreSQL: a generated `search_vector` column (name weighted above description)
+  with a GIN index, queried with `to_tsquery` and ranked with `ts_rank_cd`.
+- SQLite: an external-content FTS5 table (`products_product_fts`) kept in sync by
+  triggers, queried with MATCH and ranked with `bm25`.
+
+Both are created by the `0002_product_search` migration. Other databases fall back
+to `icontains`, unranked.
+"""
+
+from typing import List
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "english"
+FTS_TABLE = "products_product_fts"
+# Relative weights of the name and description columns in SQLite's bm25
+FTS_WEIGHTS = (10.0, 1.0)
+
+TOKEN_REGEX = re.compile(r"\w+", re.UNICODE)
+
+
+def search_products(queryset: QuerySet, search: str) -> QuerySet:
+    """
+    Filters the products matching every term of the search (as a word or word prefix),
+    and annotates their relevance as `rank` (the higher the better).
+    """
+    terms = _get_terms(search)
+    if not terms:
+        return queryset.none().annotate(rank=Value(0.0, output_field=FloatField()))
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        return _search_postgresql(queryset, terms)
+    if vendor == "sqlite":
+        return _search_sqlite(queryset, terms)
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition).annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+def _get_terms(search: str) -> List[str]:
+    return TOKEN_REGEX.findall(search.lower())
+
+
+def _search_postgresql(queryset: QuerySet, terms: List[str]) -> QuerySet:
+    tsquery = " & ".join(f"{term}:*" for term in terms)
+    table = queryset.model._meta.db_table
+    # Cast to float8, so that ranks compare exactly in keyset pagination cursors
+    rank = RawSQL(
+        f'ts_rank_cd("{table}"."search_vector", to_tsquery(%s::regconfig, %s))::float8',
+        (SEARCH_CONFIG, tsquery),
+        output_field=FloatField(),
+    )
+    match = RawSQL(
+        f'"{table}"."search_vector" @@ to_tsquery(%s::regconfig, %s)',
+        (SEARCH_CONFIG, tsquery),
+        output_field=BooleanField(),
+    )
+    return queryset.filter(match).annotate(rank=rank)
+
+
+def _search_sqlite(queryset: QuerySet, terms: List[str]) -> QuerySet:
+    # Quoted terms cannot be interpreted as FTS5 operators
+    match = " ".join(f'"{term}"*' for term in terms)
+    table = queryset.model._meta.db_table
+    name_weight, description_weight = FTS_WEIGHTS
+    # Joined rather than in a subquery: bm25 is computed while scanning the MATCH results,
+    # a correlated subquery would run the full-text query again for every product
+    queryset = queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'"{FTS_TABLE}".rowid = "{table}"."id"', f'"{FTS_TABLE}" MATCH %s'],
+        params=[match],
+    )
+    # bm25 is lower for better matches
+    rank = RawSQL(
+        f'-bm25("{FTS_TABLE}", {name_weight}, {description_weight})', (), output_field=FloatField()
+    )
+    return queryset.annotate(rank=rank)
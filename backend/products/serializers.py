@@ -1,9 +1,12 @@
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
+from .images import PRODUCT_IMAGE_MAX_BYTES, image_representation
 from .models import Product
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     price_display = serializers.SerializerMethodField()
+    image = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
@@ -14,13 +17,27 @@ class ProductSerializer(serializers.ModelSerializer):
             'price',
             'price_display',
             'created_at',
-            'updated_at'
+            'updated_at',
+            'is_featured',
+            'featured_rank',
+            'image',
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'price_display']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'price_display', 'image']
+        # What product cards need, the default of the list
+        representations = {'summary': ['id', 'name', 'price', 'image']}
+        field_sources = {
+            'price_display': ['price'],
+            'image': ['image', 'image_variants', 'image_width', 'image_height'],
+        }
 
     def get_price_display(self, obj):
         return f"${obj.price:.2f}"
 
+    def get_image(self, obj):
+        return image_representation(
+            obj.image.name, obj.image_variants, obj.image_width, obj.image_height
+        )
+
     def validate_price(self, value):
         if value < 0:
             raise serializers.ValidationError("Price cannot be negative.")
@@ -49,4 +66,18 @@ class ProductCreateSerializer(serializers.ModelSerializer):
     def validate_name(self, value):
         if len(value.strip()) < 2:
             raise serializers.ValidationError("Product name must be at least 2 characters long.")
-        return value.strip()
\ No newline at end of file
+        return value.strip()
+
+
+class ProductImageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ['image']
+        extra_kwargs = {'image': {'required': True, 'allow_empty_file': False}}
+
+    def validate_image(self, value):
+        if value.size > PRODUCT_IMAGE_MAX_BYTES:
+            raise serializers.ValidationError(
+                f"Image cannot exceed {PRODUCT_IMAGE_MAX_BYTES // (1024 * 1024)} MB."
+            )
+        return value
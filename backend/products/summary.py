@@ -0,0 +1,167 @@
+"""
+Maintained aggregates of the products (count, total, min and max price).
+
+Single product writes update the summary incrementally from the signals, in the
+transaction of the write: the price stored before the write is read from the database,
+locking the product row, so concurrent writes of a product never apply the same change
+twice. Only removing the current min or max price requires a query, an aggregate that
+an index on the price serves directly. Bulk operations, which send no signal, recompute
+the whole summary with a single aggregate query, as does `repair_product_summary`, run
+daily to repair any drift (e.g. from raw SQL writes).
+"""
+
+from decimal import Decimal
+from typing import Any, Optional
+import logging
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from core.cache import invalidate_cache_tags
+from products.cache import PRODUCT_PRICE_RANGE_CACHE_TAG, PRODUCT_STATS_CACHE_TAG
+from products.models import Product, ProductSummary
+
+LOGGER = logging.getLogger("default")
+
+SUMMARY_PK = 1
+# Marks products whose stored price is unknown (e.g. saved without the pre_save receiver)
+UNKNOWN = object()
+# Marks saves that cannot change the price
+UNCHANGED = object()
+
+
+def get_product_summary(using: str = DEFAULT_DB_ALIAS) -> ProductSummary:
+    summary = ProductSummary.objects.using(using).filter(pk=SUMMARY_PK).first()
+    if summary is None:
+        summary = refresh_product_summary(using=using)
+    return summary
+
+
+def refresh_product_summary(using: str = DEFAULT_DB_ALIAS) -> ProductSummary:
+    """Recomputes the summary with a single aggregate query."""
+    aggregates = Product.objects.using(using).aggregate(
+        count=Count("pk"),
+        total_price=Sum("price"),
+        min_price=Min("price"),
+        max_price=Max("price"),
+    )
+    aggregates["total_price"] = aggregates["total_price"] or Decimal(0)
+    summary, _ = ProductSummary.objects.using(using).update_or_create(
+        pk=SUMMARY_PK, defaults=aggregates
+    )
+    return summary
+
+
+def repair_product_summary(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Recomputes the summary, and invalidates the endpoints serving it if it had drifted.
+    Returns whether it had.
+    """
+    fields = ["count", "total_price", "min_price", "max_price"]
+    with transaction.atomic(using=using):
+        current = (
+            ProductSummary.objects.using(using)
+            .select_for_update()
+            .filter(pk=SUMMARY_PK)
+            .values_list(*fields)
+            .first()
+        )
+        summary = refresh_product_summary(using=using)
+    repaired = tuple(getattr(summary, field) for field in fields)
+    if current is None or current == repaired:
+        return False
+    LOGGER.warning(f"Repaired the product summary: {current} instead of {repaired}")
+    invalidate_cache_tags(PRODUCT_STATS_CACHE_TAG, PRODUCT_PRICE_RANGE_CACHE_TAG)
+    return True
+
+
+def apply_price_change(old_price: Any, new_price: Any, using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Updates the summary after a product write.
+
+    Args:
+        old_price: Price before the write (None if the product was created, `UNKNOWN` if unknown)
+        new_price: Price after the write (None if the product was deleted)
+        using: Database alias of the write
+    """
+    with transaction.atomic(using=using):
+        summary = (
+            ProductSummary.objects.using(using).select_for_update().filter(pk=SUMMARY_PK).first()
+        )
+        if summary is None or old_price is UNKNOWN:
+            refresh_product_summary(using=using)
+            return
+        if old_price is not None:
+            summary.count -= 1
+            summary.total_price -= old_price
+        if new_price is not None:
+            summary.count += 1
+            summary.total_price += new_price
+        if old_price is not None and old_price in (summary.min_price, summary.max_price):
+            # The old price may have been the only one at the bound
+            bounds = Product.objects.using(using).aggregate(
+                min_price=Min("price"), max_price=Max("price")
+            )
+            summary.min_price, summary.max_price = bounds["min_price"], bounds["max_price"]
+        elif new_price is not None:
+            summary.min_price = _bound(min, summary.min_price, new_price)
+            summary.max_price = _bound(max, summary.max_price, new_price)
+        summary.save(using=using)
+
+
+def _bound(function: Any, current: Optional[Decimal], price: Decimal) -> Decimal:
+    return price if current is None else function(current, price)
+
+
+def _stored_price(price: Any) -> Decimal:
+    # As rounded when saved, e.g. for prices given as floats
+    field = Product._meta.get_field("price")
+    return field.to_python(price).quantize(Decimal(1).scaleb(-field.decimal_places))
+
+
+def _lock_stored_price(instance: Product, using: str) -> Optional[Decimal]:
+    """
+    Price stored for the product (None if it does not exist), whose row stays locked
+    until the end of the transaction of the write.
+    """
+    if instance.pk is None:
+        return None
+    queryset = Product.objects.using(using).select_for_update().filter(pk=instance.pk)
+    return queryset.values_list("price", flat=True).first()
+
+
+def register_product_summary_receivers() -> None:
+    pre_save.connect(_before_save, sender=Product, dispatch_uid="product-summary-pre-save")
+    post_save.connect(_on_save, sender=Product, dispatch_uid="product-summary-save")
+    pre_delete.connect(_before_delete, sender=Product, dispatch_uid="product-summary-pre-delete")
+    post_delete.connect(_on_delete, sender=Product, dispatch_uid="product-summary-delete")
+
+
+def _before_save(
+    sender: Any, instance: Product, using: str, update_fields: Any = None, **kwargs: Any
+) -> None:
+    if update_fields is not None and "price" not in update_fields:
+        instance._summary_old_price = UNCHANGED
+    else:
+        instance._summary_old_price = _lock_stored_price(instance, using)
+
+
+def _on_save(sender: Any, instance: Product, using: str, **kwargs: Any) -> None:
+    old_price = instance.__dict__.pop("_summary_old_price", UNKNOWN)
+    if old_price is UNCHANGED:
+        return
+    new_price = _stored_price(instance.price)
+    if old_price != new_price:
+        apply_price_change(old_price, new_price, using=using)
+
+
+def _before_delete(sender: Any, instance: Product, using: str, **kwargs: Any) -> None:
+    instance._summary_old_price = _lock_stored_price(instance, using)
+
+
+def _on_delete(sender: Any, instance: Product, using: str, **kwargs: Any) -> None:
+    old_price = instance.__dict__.pop("_summary_old_price", UNKNOWN)
+    # Already deleted by a concurrent write
+    if old_price is not None:
+        apply_price_change(old_price, None, using=using)
@@ -0,0 +1,45 @@
+from typing import Dict
+
+from celery import shared_task
+from celery.schedules import crontab
+from django.conf import settings
+
+
+@shared_task(queue=settings.RABBITMQ_PRODUCT_QUEUE)
+def prune_product_tombstones() -> Dict[str, int]:
+    from products.changes import prune_tombstones
+
+    return {"deleted": prune_tombstones()}
+
+
+@shared_task(queue=settings.RABBITMQ_PRODUCT_QUEUE)
+def repair_product_summary() -> Dict[str, bool]:
+    from products.summary import repair_product_summary
+
+    return {"repaired": repair_product_summary()}
+
+
+@shared_task(queue=settings.RABBITMQ_PRODUCT_QUEUE)
+def generate_product_image_variants(product_id: int, image_name: str) -> Dict[str, int]:
+    from products.images import generate_variants
+    from products.models import Product
+
+    variants = generate_variants(image_name)
+    product = Product.objects.filter(pk=product_id, image=image_name).first()
+    # The product may have been deleted or given another image in the meantime
+    if product is not None:
+        product.image_variants = variants
+        product.save(update_fields=["image_variants", "updated_at"])
+    return {"variants": len(variants)}
+
+
+scheduled_cron_tasks = {
+    "prune_product_tombstones": {
+        "task": "products.tasks.prune_product_tombstones",
+        "schedule": crontab(hour="2", minute="0"),
+    },
+    "repair_product_summary": {
+        "task": "products.tasks.repair_product_summary",
+        "schedule": crontab(hour="3", minute="0"),
+    },
+}
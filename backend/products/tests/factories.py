@@ -0,0 +1,15 @@
+from decimal import Decimal
+
+from factory import Sequence
+from factory.django import DjangoModelFactory
+
+from products.models import Product
+
+
+class ProductFactory(DjangoModelFactory):
+    class Meta:
+        model = Product
+
+    name = Sequence(lambda x: f"Product {x}")
+    description = Sequence(lambda x: f"Description of product {x}")
+    price = Sequence(lambda x: Decimal("10.00") + x)
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.pagination import EstimatedCountPaginator, estimate_count
+from core.tests import BaseActionTestCase
+from products.models import Product
+from products.tests.factories import ProductFactory
+from user.tests.factories import UserFactory
+
+CHANGELIST_URL = reverse("admin:products_product_changelist")
+
+
+class ProductAdminTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        admin = UserFactory()
+        admin.is_staff = admin.is_superuser = True
+        admin.save()
+        self.client.force_login(admin)
+
+    def changelist(self, **params: str) -> list:
+        response = self.client.get(CHANGELIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return [product.name for product in response.context["cl"].result_list]
+
+    def test_uses_estimated_counts(self) -> None:
+        ProductFactory.create_batch(3)
+        with patch("core.pagination.estimate_count", return_value=2_000_000):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(CHANGELIST_URL)
+        self.assertEqual(response.context["cl"].result_count, 2_000_000)
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries))
+
+    def test_small_tables_are_counted(self) -> None:
+        ProductFactory.create_batch(3)
+        with patch("core.pagination.estimate_count", return_value=2):
+            response = self.client.get(CHANGELIST_URL)
+        self.assertEqual(response.context["cl"].result_count, 3)
+
+    def test_search(self) -> None:
+        keyboard = ProductFactory(name="Mechanical keyboard")
+        ProductFactory(name="Mouse")
+        self.assertEqual(self.changelist(q="keyb"), ["Mechanical keyboard"])
+        self.assertEqual(self.changelist(q=str(keyboard.pk)), ["Mechanical keyboard"])
+
+    def test_actions_are_single_updates(self) -> None:
+        products = ProductFactory.create_batch(3)
+        featured = ProductFactory(is_featured=True, featured_rank=2)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                CHANGELIST_URL,
+                {
+                    "action": "feature_products",
+                    "_selected_action": [product.pk for product in products],
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        updates = [query for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Product.objects.filter(is_featured=True).count(), 4)
+
+        # On every product matching a search
+        self.client.post(
+            f"{CHANGELIST_URL}?q=product",
+            {
+                "action": "unfeature_products",
+                "select_across": "1",
+                "_selected_action": [featured.pk],
+            },
+        )
+        self.assertFalse(Product.objects.filter(is_featured=True).exists())
+        featured.refresh_from_db()
+        self.assertEqual(featured.featured_rank, 0)
+
+
+class EstimatedCountPaginatorTestCase(BaseActionTestCase):
+    def test_pages(self) -> None:
+        ProductFactory.create_batch(7)
+        queryset = Product.objects.order_by("-created_at", "-pk")
+        paginator = EstimatedCountPaginator(queryset, 3)
+        self.assertEqual(paginator.count, 7)
+        self.assertEqual(list(paginator.page(2)), list(queryset[3:6]))
+        self.assertEqual(list(paginator.page(3)), list(queryset[6:]))
+
+    def test_filtered_counts_are_capped(self) -> None:
+        ProductFactory.create_batch(3)
+        paginator = EstimatedCountPaginator(Product.objects.filter(price__gt=0), 1)
+        paginator.max_count = 2
+        self.assertEqual(paginator.count, 2)
+
+    def test_estimate_count(self) -> None:
+        ProductFactory.create_batch(3)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.assertEqual(estimate_count(Product.objects.all()), 3)
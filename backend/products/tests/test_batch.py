@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from rest_framework.reverse import reverse
+
+from core.cache import _set_encoded
+from core.tests import BaseActionTestCase
+from products.tests.factories import ProductFactory
+
+PRODUCT_BATCH_URL = reverse("product-batch")
+
+
+def product_url(pk: int) -> str:
+    return reverse("product-detail", kwargs={"pk": pk})
+
+
+class ProductBatchTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def batch(self, ids: str) -> dict:
+        response = self.api_client.get(PRODUCT_BATCH_URL, {"ids": ids})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_in_request_order(self) -> None:
+        first, second, third = ProductFactory.create_batch(3)
+        content = self.batch(f"{third.pk},{first.pk},{third.pk},999999,{second.pk}")
+        self.assertEqual(
+            [product["id"] for product in content["results"]], [third.pk, first.pk, second.pk]
+        )
+        self.assertEqual(content["missing"], [999999])
+        self.assertEqual(content["results"][0], self.api_client.get(product_url(third.pk)).json())
+
+    def test_shares_the_detail_entries(self) -> None:
+        cached, other = ProductFactory.create_batch(2)
+        self.api_client.get(product_url(cached.pk))
+        # A single query for the products that are not cached yet
+        with self.assertNumQueries(1):
+            self.batch(f"{cached.pk},{other.pk}")
+        with self.assertNumQueries(0):
+            self.batch(f"{other.pk},{cached.pk}")
+            self.api_client.get(product_url(other.pk))
+
+    def test_single_round_trips(self) -> None:
+        products = ProductFactory.create_batch(5)
+        ids = ",".join(str(product.pk) for product in products)
+        with (
+            patch("core.cache.cache.get_many", wraps=cache.get_many) as get_many_mock,
+            patch("core.cache._set_encoded", wraps=_set_encoded) as set_encoded_mock,
+        ):
+            self.batch(ids)
+        # Generations, then entries
+        self.assertEqual(get_many_mock.call_count, 2)
+        # A single pipeline
+        self.assertEqual(set_encoded_mock.call_count, 1)
+        self.assertEqual(len(set_encoded_mock.call_args.args[0]), 5)
+
+    def test_is_invalidated_on_write(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            product = ProductFactory(name="Lamp")
+        self.batch(str(product.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            product.name = "Desk lamp"
+            product.save()
+        self.assertEqual(self.batch(str(product.pk))["results"][0]["name"], "Desk lamp")
+
+    def test_invalid_ids(self) -> None:
+        for ids in ["", "1,a", ",".join(str(pk) for pk in range(1, 102))]:
+            response = self.api_client.get(PRODUCT_BATCH_URL, {"ids": ids})
+            self.assertEqual(response.status_code, 400, ids)
@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from kombu.exceptions import OperationalError
+from rest_framework.reverse import reverse
+
+from core.cache_warming import (
+    WARM_DEBOUNCE_DELAY,
+    get_top_params,
+    get_warm_targets,
+    pop_pending_tags,
+    schedule_warming,
+    warm_targets,
+)
+from core.tasks import warm_api_cache
+from core.tests import BaseActionTestCase
+from products.tests.factories import ProductFactory
+from user.tests.factories import UserFactory
+
+PRODUCT_LIST_URL = reverse("product-list")
+PRODUCT_STATS_URL = reverse("product-stats")
+
+
+class ProductCacheWarmingTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_warm_targets(self) -> None:
+        ProductFactory.create_batch(2)
+        results = warm_targets(get_warm_targets(names=["products:stats"]))
+        self.assertEqual(results, {"products:stats": {"warmed": 1, "failed": 0}})
+        with self.assertNumQueries(0):
+            response = self.api_client.get(PRODUCT_STATS_URL)
+        self.assertEqual(response.json()["total_products"], 2)
+
+    @override_settings(ALLOWED_HOSTS=["localhost"], API_CACHE_WARMING_HOST="localhost")
+    def test_warms_on_the_route_and_an_allowed_host(self) -> None:
+        # More than a page, for the list to link the next one
+        ProductFactory.create_batch(21)
+        results = warm_targets(get_warm_targets(names=["products:list"]))
+        self.assertEqual(results, {"products:list": {"warmed": 1, "failed": 0}})
+
+    def test_warms_most_requested_params(self) -> None:
+        ProductFactory(name="Keyboard")
+        self.api_client.get(PRODUCT_LIST_URL, {"search": "Keyboard"})
+        self.assertEqual(get_top_params("products:list", 5), [{"search": ["Keyboard"]}])
+        cache.clear()
+        self.api_client.get(PRODUCT_LIST_URL, {"search": "Keyboard"})
+        results = warm_targets(get_warm_targets(names=["products:list"]))
+        self.assertEqual(results["products:list"]["warmed"], 2)
+        with self.assertNumQueries(0):
+            response = self.api_client.get(PRODUCT_LIST_URL, {"search": "Keyboard"})
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_writes_schedule_warming(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductFactory()
+        mock = self.celery_task_mocks["core.tasks.warm_api_cache.apply_async"]
+        mock.assert_called_once_with(kwargs={"pending": True}, countdown=WARM_DEBOUNCE_DELAY)
+        self.assertIn("products:list", pop_pending_tags())
+
+    def test_debounced_writes_accumulate_their_tags(self) -> None:
+        schedule_warming(["products:stats"])
+        schedule_warming(["products:featured"])
+        mock = self.celery_task_mocks["core.tasks.warm_api_cache.apply_async"]
+        mock.assert_called_once()
+        with patch("core.cache_warming.warm_targets", return_value={}) as warm_targets_mock:
+            warm_api_cache(pending=True)
+        self.assertEqual(
+            sorted(target.name for target in warm_targets_mock.call_args.args[0]),
+            ["products:featured", "products:stats"],
+        )
+        self.assertEqual(pop_pending_tags(), [])
+
+    def test_warming_failures_never_fail_writes(self) -> None:
+        mock = self.celery_task_mocks["core.tasks.warm_api_cache.apply_async"]
+        mock.side_effect = OperationalError("Broker unreachable")
+        self.api_client.force_authenticate(UserFactory())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.post(
+                PRODUCT_LIST_URL, {"name": "Lamp", "description": "Desk lamp", "price": "10.00"}
+            )
+        self.assertEqual(response.status_code, 201)
+        mock.assert_called_once()
+
+    def test_warm_cache_command(self) -> None:
+        call_command("warm_cache", "products:stats", "products:price_range")
+        with self.assertNumQueries(0):
+            self.api_client.get(PRODUCT_STATS_URL)
+        call_command("warm_cache", "--async")
+        self.celery_task_mocks["core.tasks.warm_api_cache.delay"].assert_called_once()
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from core.tests import BaseActionTestCase
+from products.changes import TOMBSTONE_RETENTION, encode_cursor, prune_tombstones
+from products.models import Product, ProductTombstone
+from products.tests.factories import ProductFactory
+
+PRODUCT_CHANGES_URL = reverse("product-changes")
+
+
+@patch("products.changes.SETTLE_TIME", timedelta(0))
+class ProductChangesTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def changes(self, **params: str) -> dict:
+        response = self.api_client.get(PRODUCT_CHANGES_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_through_the_catalog(self) -> None:
+        products = ProductFactory.create_batch(5)
+        ids, cursor, has_more = [], "", True
+        while has_more:
+            content = self.changes(cursor=cursor, limit="2")
+            self.assertLessEqual(len(content["results"]), 2)
+            ids += [change["id"] for change in content["results"]]
+            cursor, has_more = content["cursor"], content["has_more"]
+        self.assertEqual(ids, [product.pk for product in products])
+        # Up to date: nothing new, same cursor
+        self.assertEqual(
+            self.changes(cursor=cursor), {"results": [], "cursor": cursor, "has_more": False}
+        )
+
+    def test_updates_and_deletions(self) -> None:
+        kept, updated, deleted = ProductFactory.create_batch(3)
+        cursor = self.changes()["cursor"]
+        updated.name = "Renamed"
+        updated.save()
+        deleted_pk = deleted.pk
+        deleted.delete()
+        content = self.changes(cursor=cursor)
+        self.assertEqual(
+            [(change["id"], change["change"]) for change in content["results"]],
+            [(updated.pk, "updated"), (deleted_pk, "deleted")],
+        )
+        self.assertEqual(content["results"][0]["product"]["name"], "Renamed")
+        self.assertNotIn(kept.pk, [change["id"] for change in content["results"]])
+
+    def test_bulk_writes(self) -> None:
+        products = ProductFactory.create_batch(3)
+        cursor = self.changes()["cursor"]
+        Product.objects.filter(pk=products[0].pk).update(price=Decimal("1.00"))
+        Product.objects.filter(pk__in=[products[1].pk, products[2].pk]).delete()
+        changes = self.changes(cursor=cursor)["results"]
+        self.assertEqual(changes[0]["product"]["price"], "1.00")
+        self.assertEqual(
+            [change["change"] for change in changes], ["updated", "deleted", "deleted"]
+        )
+        self.assertEqual(ProductTombstone.objects.count(), 2)
+
+    def test_deleted_then_recreated(self) -> None:
+        product = ProductFactory()
+        cursor = self.changes()["cursor"]
+        pk = product.pk
+        product.delete()
+        ProductFactory(id=pk)
+        changes = self.changes(cursor=cursor)["results"]
+        self.assertEqual([change["change"] for change in changes], ["deleted", "updated"])
+
+    def test_invalid_and_expired_cursors(self) -> None:
+        response = self.api_client.get(PRODUCT_CHANGES_URL, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 400)
+        expired = encode_cursor(timezone.now() - TOMBSTONE_RETENTION - timedelta(days=1), 1)
+        response = self.api_client.get(PRODUCT_CHANGES_URL, {"cursor": expired})
+        self.assertEqual(response.status_code, 410)
+
+    def test_prune_tombstones(self) -> None:
+        now = timezone.now()
+        ProductTombstone.objects.create(product_id=1, deleted_at=now - TOMBSTONE_RETENTION * 2)
+        ProductTombstone.objects.create(product_id=2, deleted_at=now)
+        self.assertEqual(prune_tombstones(), 1)
+        self.assertEqual(list(ProductTombstone.objects.values_list("product_id", flat=True)), [2])
+
+    @skipUnless(connection.vendor == "sqlite", "Small tables are read sequentially elsewhere")
+    def test_uses_the_index(self) -> None:
+        ProductFactory.create_batch(3)
+        plan = Product.objects.filter(updated_at__gt=timezone.now()).order_by("updated_at", "id")
+        self.assertIn("product_updated_at_id_idx", plan.explain())
+
+
+class ProductChangesSettleTestCase(BaseActionTestCase):
+    def test_recent_changes_are_held_back(self) -> None:
+        ProductFactory()
+        content = self.api_client.get(PRODUCT_CHANGES_URL).json()
+        self.assertEqual(content["results"], [])
+        self.assertIsNone(content["cursor"])
@@ -0,0 +1,74 @@
+from decimal import Decimal
+from unittest.mock import patch
+import csv
+import gzip
+import io
+import json
+
+from django.core.cache import cache
+from rest_framework.reverse import reverse
+
+from core.tests import BaseActionTestCase
+from products.exports import COLUMNS
+from products.models import Product
+from products.serializers import ProductSerializer
+from products.tests.factories import ProductFactory
+
+PRODUCT_EXPORT_URL = reverse("product-export")
+
+
+class ProductExportTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def export(self, **params: str) -> bytes:
+        response = self.api_client.get(PRODUCT_EXPORT_URL, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_ndjson_matches_the_serializer(self) -> None:
+        ProductFactory(name="Café", price=Decimal("12.30"))
+        ProductFactory(price=Decimal("5"))
+        lines = self.export(export_format="ndjson").decode().splitlines()
+        products = Product.objects.order_by("-created_at")
+        expected = ProductSerializer(products, many=True, fields=COLUMNS).data
+        self.assertEqual([json.loads(line) for line in lines], json.loads(json.dumps(expected)))
+
+    def test_csv_is_chunked(self) -> None:
+        ProductFactory.create_batch(5)
+        with patch("products.exports.ROWS_PER_CHUNK", 2):
+            response = self.api_client.get(PRODUCT_EXPORT_URL)
+            chunks = list(response.streaming_content)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(len(rows), 5)
+        latest = ProductSerializer(Product.objects.latest("created_at"), fields=COLUMNS).data
+        self.assertEqual(rows[0], {key: str(value) for key, value in latest.items()})
+
+    def test_uses_the_list_filters_and_ordering(self) -> None:
+        ProductFactory(name="Cheap keyboard", price=Decimal("5.00"))
+        ProductFactory(name="Keyboard", price=Decimal("50.00"))
+        ProductFactory(name="Lamp", price=Decimal("80.00"))
+        content = self.export(export_format="ndjson", min_price="10", ordering="-price")
+        self.assertEqual(
+            [json.loads(line)["name"] for line in content.decode().splitlines()],
+            ["Lamp", "Keyboard"],
+        )
+        content = self.export(export_format="ndjson", search="keyboard")
+        self.assertEqual(len(content.decode().splitlines()), 2)
+
+    def test_is_compressed_on_the_fly(self) -> None:
+        ProductFactory.create_batch(3)
+        response = self.api_client.get(
+            PRODUCT_EXPORT_URL, {"export_format": "ndjson"}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(response.streaming_content))
+        self.assertEqual(len(content.decode().splitlines()), 3)
+
+    def test_invalid_format(self) -> None:
+        response = self.api_client.get(PRODUCT_EXPORT_URL, {"export_format": "xml"})
+        self.assertEqual(response.status_code, 400)
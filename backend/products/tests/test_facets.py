@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from rest_framework.reverse import reverse
+
+from core.tests import BaseActionTestCase
+from products.tests.factories import ProductFactory
+
+PRODUCT_FACETS_URL = reverse("product-facets")
+
+
+def bucket(low: str, high: str, count: int) -> dict:
+    return {"min": float(low), "max": float(high), "count": count}
+
+
+class ProductFacetsTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        for price in ("10.00", "12.50", "15.00", "19.99", "30.00", "50.00"):
+            ProductFactory(name=f"Keyboard {price}", price=Decimal(price))
+        ProductFactory(name="Lamp", price=Decimal("20.00"))
+
+    def histogram(self, **params: str) -> dict:
+        response = self.api_client.get(PRODUCT_FACETS_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["price"]
+
+    def test_fixed_buckets(self) -> None:
+        with self.assertNumQueries(1):
+            histogram = self.histogram(buckets="4")
+        self.assertEqual(histogram["count"], 7)
+        self.assertEqual((histogram["min_price"], histogram["max_price"]), (10.0, 50.0))
+        self.assertEqual(
+            histogram["buckets"],
+            [
+                bucket("10", "20", 4),
+                bucket("20", "30", 1),
+                bucket("30", "40", 1),
+                bucket("40", "50", 1),
+            ],
+        )
+
+    def test_quantile_buckets(self) -> None:
+        histogram = self.histogram(buckets="3", bucketing="quantile")
+        self.assertEqual([item["count"] for item in histogram["buckets"]], [3, 2, 2])
+        self.assertEqual(histogram["buckets"][0], bucket("10", "15", 3))
+        self.assertEqual(histogram["buckets"][-1], bucket("30", "50", 2))
+
+    def test_follows_the_list_filters(self) -> None:
+        histogram = self.histogram(search="keyboard", max_price="20", buckets="2")
+        self.assertEqual(histogram["buckets"], [bucket("10", "15", 2), bucket("15", "19.99", 2)])
+        histogram = self.histogram(search="lamp")
+        self.assertEqual(histogram["buckets"], [bucket("20", "20", 1)])
+        self.assertEqual(self.histogram(search="!!!")["buckets"], [])
+
+    def test_is_cached_per_filter(self) -> None:
+        self.histogram(search="keyboard")
+        with self.assertNumQueries(0):
+            self.histogram(search="keyboard", ordering="price", page_size="5")
+        with self.assertNumQueries(1):
+            self.histogram(search="lamp")
+
+    def test_invalid_params(self) -> None:
+        for params in ({"buckets": "0"}, {"buckets": "many"}, {"bucketing": "log"}):
+            with self.subTest(params=params):
+                response = self.api_client.get(PRODUCT_FACETS_URL, params)
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,55 @@
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from rest_framework.reverse import reverse
+
+from core.cache_warming import get_warm_targets, warm_targets
+from core.tests import BaseActionTestCase
+from products.models import Product
+from products.tests.factories import ProductFactory
+
+PRODUCT_FEATURED_URL = reverse("product-featured")
+
+
+class ProductFeaturedTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_featured_products_by_rank(self) -> None:
+        ProductFactory(name="Not featured")
+        ProductFactory(name="Second", is_featured=True, featured_rank=2)
+        ProductFactory(name="First", is_featured=True, featured_rank=1)
+        ProductFactory.create_batch(6, is_featured=True, featured_rank=3)
+        response = self.api_client.get(PRODUCT_FEATURED_URL)
+        names = [product["name"] for product in response.json()]
+        self.assertEqual(len(names), 6)
+        self.assertEqual(names[:2], ["First", "Second"])
+        self.assertTrue(response.json()[0]["is_featured"])
+
+    def test_does_not_depend_on_params(self) -> None:
+        ProductFactory(name="Lamp", is_featured=True, price=5)
+        response = self.api_client.get(PRODUCT_FEATURED_URL)
+        with self.assertNumQueries(0):
+            other = self.api_client.get(
+                PRODUCT_FEATURED_URL, {"search": "keyboard", "min_price": "100", "fields": "id"}
+            )
+        self.assertEqual(other.content, response.content)
+
+    def test_is_refreshed_on_write(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            product = ProductFactory(is_featured=True)
+        self.assertEqual(len(self.api_client.get(PRODUCT_FEATURED_URL).json()), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            product.is_featured = False
+            product.save()
+        warm_targets(get_warm_targets(names=["products:featured"]))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.api_client.get(PRODUCT_FEATURED_URL).json(), [])
+
+    @skipUnless(connection.vendor == "sqlite", "Small tables are read sequentially elsewhere")
+    def test_uses_the_partial_index(self) -> None:
+        ProductFactory.create_batch(3, is_featured=True)
+        plan = Product.objects.featured()[:6].explain()
+        self.assertIn("product_featured_idx", plan)
@@ -0,0 +1,173 @@
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+import io
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework.reverse import reverse
+
+from core.tests import BaseActionTestCase
+from products.images import product_image_storage
+from products.models import Product
+from products.tasks import generate_product_image_variants
+from products.tests.factories import ProductFactory
+from user.tests.factories import UserFactory
+
+PRODUCT_LIST_URL = reverse("product-list")
+
+
+def product_image_url(pk: int) -> str:
+    return reverse("product-image", kwargs={"pk": pk})
+
+
+def image_file(
+    width: int, height: int, mode: str = "RGB", format: str = "JPEG"
+) -> SimpleUploadedFile:
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), "orange").save(buffer, format)
+    extension = format.lower()
+    return SimpleUploadedFile(f"photo.{extension}", buffer.getvalue(), f"image/{extension}")
+
+
+class ProductImageTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        media_root = TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.api_client.force_authenticate(UserFactory())
+        self.generate_variants = self.celery_task_mocks[
+            "products.tasks.generate_product_image_variants.delay"
+        ]
+
+    def upload(self, product: Product, file: SimpleUploadedFile) -> dict:
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.put(
+                product_image_url(product.pk), {"image": file}, format="multipart"
+            )
+        self.assertEqual(response.status_code, 202, response.content)
+        return response.json()
+
+    def test_upload_schedules_the_variants(self) -> None:
+        product = ProductFactory()
+        image = self.upload(product, image_file(800, 600))["image"]
+        product.refresh_from_db()
+        self.assertRegex(product.image.name, r"^products/[0-9a-f]{32}\.jpeg$")
+        self.generate_variants.assert_called_once_with(product.pk, product.image.name)
+        # The original is served until the variants are generated
+        self.assertEqual(
+            image,
+            {
+                "src": default_storage.url(product.image.name),
+                "width": 800,
+                "height": 600,
+                "srcset": "",
+                "webp_srcset": "",
+            },
+        )
+
+    def test_names_derive_from_the_content(self) -> None:
+        first, second = ProductFactory.create_batch(2)
+        self.upload(first, image_file(100, 100))
+        self.upload(second, image_file(100, 100))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image.name, second.image.name)
+
+    def test_concurrent_saves_of_the_same_content(self) -> None:
+        product_image_storage.save("products/same.txt", ContentFile(b"content"))
+        # Both saves passed the existence check before either wrote the file
+        with patch.object(product_image_storage, "exists", return_value=False):
+            name = product_image_storage.save("products/same.txt", ContentFile(b"content"))
+        self.assertEqual(name, "products/same.txt")
+        with product_image_storage.open(name) as file:
+            self.assertEqual(file.read(), b"content")
+
+    def test_generate_variants(self) -> None:
+        product = ProductFactory()
+        self.upload(product, image_file(800, 600))
+        product.refresh_from_db()
+        result = generate_product_image_variants(product.pk, product.image.name)
+        self.assertEqual(result, {"variants": 4})
+
+        product.refresh_from_db()
+        self.assertEqual(
+            [
+                (variant["width"], variant["height"], variant["format"])
+                for variant in product.image_variants
+            ],
+            [(320, 240, "jpeg"), (320, 240, "webp"), (640, 480, "jpeg"), (640, 480, "webp")],
+        )
+        for variant in product.image_variants:
+            with default_storage.open(variant["name"]) as file, Image.open(file) as image:
+                self.assertEqual(image.format, variant["format"].upper())
+                self.assertEqual(image.width, variant["width"])
+
+        detail_url = reverse("product-detail", kwargs={"pk": product.pk})
+        image = self.api_client.get(detail_url).json()["image"]
+        stem = product.image.name.removeprefix("products/").removesuffix(".jpeg")
+        self.assertEqual(image["src"], f"/media/products/variants/{stem}-640w-v1.jpeg")
+        self.assertEqual(
+            image["webp_srcset"],
+            f"/media/products/variants/{stem}-320w-v1.webp 320w, "
+            f"/media/products/variants/{stem}-640w-v1.webp 640w",
+        )
+
+    def test_small_and_transparent_images(self) -> None:
+        product = ProductFactory()
+        self.upload(product, image_file(200, 100, mode="RGBA", format="PNG"))
+        product.refresh_from_db()
+        generate_product_image_variants(product.pk, product.image.name)
+        product.refresh_from_db()
+        self.assertEqual(
+            [(variant["width"], variant["format"]) for variant in product.image_variants],
+            [(200, "png"), (200, "webp")],
+        )
+
+    def test_replaced_image_keeps_its_own_variants(self) -> None:
+        product = ProductFactory()
+        self.upload(product, image_file(400, 400))
+        product.refresh_from_db()
+        old_name = product.image.name
+        generate_product_image_variants(product.pk, old_name)
+        product.refresh_from_db()
+        self.assertEqual(len(product.image_variants), 2)
+
+        self.upload(product, image_file(500, 400))
+        product.refresh_from_db()
+        self.assertEqual(product.image_variants, [])
+        # A late task for the previous image changes nothing
+        generate_product_image_variants(product.pk, old_name)
+        product.refresh_from_db()
+        self.assertEqual(product.image_variants, [])
+
+    def test_list_cards_have_the_image(self) -> None:
+        product = ProductFactory()
+        self.upload(product, image_file(100, 100))
+        results = self.api_client.get(PRODUCT_LIST_URL).json()["results"]
+        self.assertEqual(list(results[0]), ["id", "name", "price", "image"])
+        self.assertEqual(results[0]["image"]["width"], 100)
+
+    def test_invalid_image(self) -> None:
+        product = ProductFactory()
+        file = SimpleUploadedFile("photo.jpeg", b"not an image", "image/jpeg")
+        response = self.api_client.put(
+            product_image_url(product.pk), {"image": file}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_delete(self) -> None:
+        product = ProductFactory()
+        self.upload(product, image_file(100, 100))
+        response = self.api_client.delete(product_image_url(product.pk))
+        self.assertEqual(response.status_code, 204)
+        product.refresh_from_db()
+        self.assertFalse(product.image)
+        self.assertIsNone(self.api_client.get(PRODUCT_LIST_URL).json()["results"][0]["image"])
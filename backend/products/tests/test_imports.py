@@ -0,0 +1,123 @@
+from decimal import Decimal
+from tempfile import NamedTemporaryFile
+import json
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from rest_framework.reverse import reverse
+
+from core.tests import BaseActionTestCase
+from products.models import Product, ProductSummary
+from products.tests.factories import ProductFactory
+from user.tests.factories import UserFactory
+
+PRODUCT_LIST_URL = reverse("product-list")
+PRODUCT_IMPORT_URL = reverse("product-bulk-import")
+PRODUCT_STATS_URL = reverse("product-stats")
+
+CSV = (
+    "name,description,price\n"
+    "Keyboard,Mechanical,99.90\n"
+    "X,Too short,10\n"
+    '"Desk, oak","Wide\nand sturdy",250\n'
+    "Mouse,Wireless,-5\n"
+)
+
+
+class ProductImportTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.api_client.force_authenticate(UserFactory())
+
+    def post(self, body: str, content_type: str, **params: str) -> dict:
+        url = PRODUCT_IMPORT_URL
+        if params:
+            url += "?" + "&".join(f"{key}={value}" for key, value in params.items())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.generic("POST", url, body, content_type=content_type)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_csv_reports_invalid_rows(self) -> None:
+        report = self.post(CSV, "text/csv", batch_size="1")
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [2, 4])
+        self.assertIn("name", report["errors"][0]["errors"])
+        self.assertIn("price", report["errors"][1]["errors"])
+        desk = Product.objects.get(name="Desk, oak")
+        self.assertEqual(desk.description, "Wide\nand sturdy")
+        self.assertEqual(desk.price, Decimal("250"))
+
+    def test_ndjson_upserts_rows_with_an_id(self) -> None:
+        product = ProductFactory(name="Old name")
+        lines = [
+            {"id": product.pk, "name": "New name", "description": "Updated", "price": "5.00"},
+            {"name": "Lamp", "description": "LED", "price": 30},
+            "not an object",
+        ]
+        body = "\n".join(json.dumps(line) for line in lines) + "\n\n{invalid\n"
+        report = self.post(body, "application/x-ndjson")
+        self.assertEqual((report["imported"], report["failed"]), (2, 2))
+        product.refresh_from_db()
+        self.assertEqual((product.name, product.price), ("New name", Decimal("5.00")))
+        self.assertEqual(Product.objects.count(), 2)
+        # The id sequence follows explicit ids
+        self.assertGreater(ProductFactory().pk, product.pk)
+
+    def test_reports_duplicate_ids(self) -> None:
+        product = ProductFactory(name="Old name")
+        lines = [
+            {"id": product.pk, "name": "First", "description": "Desk", "price": 1},
+            {"name": "Lamp", "description": "LED", "price": 30},
+            {"id": product.pk, "name": "Second", "description": "Desk", "price": 2},
+            {"id": product.pk, "name": "Third", "description": "Desk", "price": 3},
+        ]
+        body = "\n".join(json.dumps(line) for line in lines)
+        report = self.post(body, "application/x-ndjson")
+        self.assertEqual((report["imported"], report["duplicated"]), (2, 2))
+        self.assertEqual(
+            report["duplicates"],
+            [
+                {"row": 1, "id": product.pk, "replaced_by": 3},
+                {"row": 3, "id": product.pk, "replaced_by": 4},
+            ],
+        )
+        product.refresh_from_db()
+        self.assertEqual(product.name, "Third")
+        # In distinct batches, each row is written
+        report = self.post(body, "application/x-ndjson", batch_size="1")
+        self.assertEqual((report["imported"], report["duplicated"]), (4, 0))
+
+    def test_invalidates_caches_and_summary_once(self) -> None:
+        ProductFactory(price=Decimal("1.00"))
+        self.assertEqual(len(self.api_client.get(PRODUCT_LIST_URL).json()["results"]), 1)
+        self.assertEqual(self.api_client.get(PRODUCT_STATS_URL).json()["total_products"], 1)
+        self.post(CSV, "text/csv", batch_size="1")
+        self.assertEqual(len(self.api_client.get(PRODUCT_LIST_URL).json()["results"]), 3)
+        stats = self.api_client.get(PRODUCT_STATS_URL).json()
+        self.assertEqual(stats["total_products"], 3)
+        self.assertEqual(stats["max_price"], 250.0)
+        self.assertEqual(ProductSummary.objects.get().count, 3)
+
+    def test_invalid_requests(self) -> None:
+        response = self.api_client.post(PRODUCT_IMPORT_URL, {"name": "Keyboard"}, format="json")
+        self.assertEqual(response.status_code, 415)
+        response = self.api_client.generic(
+            "POST", PRODUCT_IMPORT_URL, "title,price\nKeyboard,10\n", content_type="text/csv"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.api_client.force_authenticate(None)
+        response = self.api_client.generic("POST", PRODUCT_IMPORT_URL, CSV, content_type="text/csv")
+        self.assertIn(response.status_code, (401, 403))
+        self.assertEqual(Product.objects.count(), 0)
+
+    def test_command(self) -> None:
+        with NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write(CSV)
+            file.flush()
+            call_command("import_products", file.name, "--batch-size", "2")
+        self.assertEqual(Product.objects.count(), 2)
+        with self.assertRaises(CommandError):
+            call_command("import_products", "products.txt")
@@ -0,0 +1,75 @@
+from typing import List
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+
+from core.tests import BaseActionTestCase
+from products.tests.factories import ProductFactory
+
+PRODUCT_LIST_URL = reverse("product-list")
+
+
+def query_plan(sql: str) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+        return "\n".join(" ".join(str(value) for value in row) for row in cursor.fetchall())
+
+
+class ProductIndexesTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        ProductFactory.create_batch(5)
+        if connection.vendor == "postgresql":
+            # Tables this small are otherwise read sequentially
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def page_queries(self, params: dict) -> List[str]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.api_client.get(PRODUCT_LIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if "LIMIT" in query["sql"] and "COUNT(" not in query["sql"]
+        ]
+
+    def assertUsesIndex(self, params: dict, index: str) -> None:
+        queries = self.page_queries(params)
+        self.assertEqual(len(queries), 1)
+        plan = query_plan(queries[0])
+        self.assertIn(index, plan)
+        # Not sorted after the scan
+        self.assertNotIn("TEMP B-TREE", plan)
+        self.assertNotRegex(plan, r"(?m)^\s*Sort\b")
+
+    def test_orderings_use_an_index(self) -> None:
+        indexes = {
+            "created_at": "product_created_at_id_idx",
+            "price": "product_price_id_idx",
+            "name": "product_name_id_idx",
+        }
+        for field, index in indexes.items():
+            for ordering in (field, f"-{field}"):
+                with self.subTest(ordering=ordering):
+                    self.assertUsesIndex({"ordering": ordering, "page_size": 2}, index)
+
+    def test_next_pages_use_an_index(self) -> None:
+        response = self.api_client.get(PRODUCT_LIST_URL, {"ordering": "price", "page_size": 2})
+        self.assertUsesIndex(
+            {"ordering": "price", "page_size": 2, "cursor": _cursor(response.json()["next"])},
+            "product_price_id_idx",
+        )
+
+    def test_price_range_uses_an_index(self) -> None:
+        self.assertUsesIndex(
+            {"ordering": "price", "min_price": "10", "max_price": "500"}, "product_price_id_idx"
+        )
+
+
+def _cursor(url: str) -> str:
+    return parse_qs(urlparse(url).query)["cursor"][0]
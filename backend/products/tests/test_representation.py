@@ -0,0 +1,35 @@
+from decimal import Decimal
+
+from core.tests import BaseActionTestCase
+from products.models import Product
+from products.representation import product_values, represent_products
+from products.serializers import ProductSerializer
+from products.tests.factories import ProductFactory
+
+
+class ProductRepresentationTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        ProductFactory(name="Café", price=Decimal("0.5"))
+        ProductFactory(price=Decimal("999999.99"))
+        ProductFactory(price=Decimal("42"))
+
+    def test_matches_the_serializer(self) -> None:
+        selections = [
+            ProductSerializer.select_fields({}),
+            ProductSerializer.select_fields({}, "summary"),
+            ["price_display"],
+            ["id", "updated_at"],
+        ]
+        queryset = Product.objects.order_by("pk")
+        for fields in selections:
+            with self.subTest(fields=fields):
+                expected = ProductSerializer(queryset, many=True, fields=fields).data
+                products = represent_products(product_values(queryset, fields), fields)
+                self.assertEqual(products, expected)
+                self.assertEqual(list(products[0]), list(expected[0]))
+
+    def test_only_reads_the_needed_columns(self) -> None:
+        rows = list(product_values(Product.objects.all(), ["price_display"]))
+        self.assertEqual(set(rows[0]), {"id", "price"})
+        self.assertEqual(represent_products([], ["id"]), [])
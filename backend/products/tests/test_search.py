@@ -0,0 +1,56 @@
+from rest_framework.reverse import reverse
+
+from core.tests import BaseActionTestCase
+from products.models import Product
+from products.search import search_products
+from products.tests.factories import ProductFactory
+
+PRODUCT_LIST_URL = reverse("product-list")
+
+
+def search(query: str) -> list:
+    return list(
+        search_products(Product.objects.all(), query)
+        .order_by("-rank", "-pk")
+        .values_list("name", flat=True)
+    )
+
+
+class ProductSearchTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        # Relevance depends on how rare the terms are
+        ProductFactory.create_batch(10)
+
+    def test_ranks_name_matches_first(self) -> None:
+        ProductFactory(name="Desk lamp", description="Goes well with a keyboard")
+        ProductFactory(name="Mechanical keyboard", description="Clicky switches")
+        ProductFactory(name="Mouse", description="Wireless")
+        self.assertEqual(search("keyboard"), ["Mechanical keyboard", "Desk lamp"])
+
+    def test_matches_prefixes_and_all_terms(self) -> None:
+        ProductFactory(name="Wireless keyboard", description="Bluetooth")
+        ProductFactory(name="Wired keyboard", description="USB")
+        self.assertEqual(search("keyb wirel"), ["Wireless keyboard"])
+        self.assertEqual(search("!!!"), [])
+
+    def test_index_follows_writes(self) -> None:
+        product = ProductFactory(name="Keyboard")
+        product.name = "Monitor"
+        product.save()
+        self.assertEqual(search("keyboard"), [])
+        self.assertEqual(search("monitor"), ["Monitor"])
+        product.delete()
+        self.assertEqual(search("monitor"), [])
+
+    def test_list_search_is_paginated_by_relevance(self) -> None:
+        ProductFactory(name="Lamp", description="Keyboard light")
+        ProductFactory(name="Keyboard", description="Keyboard with a keyboard cover")
+        ProductFactory(name="Keyboard stand", description="Wood")
+        response = self.api_client.get(PRODUCT_LIST_URL, {"search": "keyboard", "page_size": 2})
+        names = [product["name"] for product in response.json()["results"]]
+        self.assertEqual(response.json()["count"], 3)
+        self.assertEqual(sorted(names), ["Keyboard", "Keyboard stand"])
+        response = self.api_client.get(response.json()["next"])
+        names += [product["name"] for product in response.json()["results"]]
+        self.assertEqual(names[-1], "Lamp")
@@ -0,0 +1,123 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count, Max, Min, Sum
+from rest_framework.reverse import reverse
+
+from core.tests import BaseActionTestCase
+from products.models import Product, ProductSummary
+from products.summary import get_product_summary, repair_product_summary
+from products.tests.factories import ProductFactory
+
+PRODUCT_STATS_URL = reverse("product-stats")
+PRODUCT_PRICE_RANGE_URL = reverse("product-price-range")
+
+
+class ProductSummaryTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def assertSummaryIsUpToDate(self) -> None:
+        summary = ProductSummary.objects.get()
+        expected = Product.objects.aggregate(
+            count=Count("pk"),
+            total_price=Sum("price"),
+            min_price=Min("price"),
+            max_price=Max("price"),
+        )
+        self.assertEqual(summary.count, expected["count"])
+        self.assertEqual(summary.total_price, expected["total_price"] or 0)
+        self.assertEqual(summary.min_price, expected["min_price"])
+        self.assertEqual(summary.max_price, expected["max_price"])
+
+    def test_follows_single_writes(self) -> None:
+        first = ProductFactory(price=Decimal("10.00"))
+        second = ProductFactory(price=Decimal("30.00"))
+        ProductFactory(price=Decimal("20.00"))
+        self.assertSummaryIsUpToDate()
+        second.price = Decimal("5.50")
+        second.save()
+        self.assertSummaryIsUpToDate()
+        first.delete()
+        self.assertSummaryIsUpToDate()
+        # Removes the min price
+        Product.objects.get(pk=second.pk).delete()
+        self.assertSummaryIsUpToDate()
+        Product.objects.all().delete()
+        self.assertSummaryIsUpToDate()
+
+    def test_price_change_updates_without_scanning(self) -> None:
+        ProductFactory(price=Decimal("10.00"))
+        product = ProductFactory(price=Decimal("20.00"))
+        ProductFactory(price=Decimal("30.00"))
+        product.price = Decimal("25.12")
+        # The locked price read, the product update, the summary read and update, and two
+        # savepoints
+        with self.assertNumQueries(4 + 2 * 2):
+            product.save()
+        self.assertSummaryIsUpToDate()
+
+    def test_stale_instances(self) -> None:
+        product = ProductFactory(price=Decimal("10.00"))
+        ProductFactory(price=Decimal("20.00"))
+        # Two instances of the same row
+        other = Product.objects.get(pk=product.pk)
+        product.price = Decimal("30.00")
+        product.save()
+        other.price = Decimal("40.00")
+        other.save()
+        self.assertSummaryIsUpToDate()
+        # Changed by another process, then reloaded
+        Product.objects.filter(pk=product.pk).update(price=Decimal("5.00"))
+        product.refresh_from_db()
+        product.price = Decimal("15.00")
+        product.save()
+        self.assertSummaryIsUpToDate()
+        # Deleted from a stale instance
+        other.delete()
+        self.assertSummaryIsUpToDate()
+
+    def test_repair(self) -> None:
+        ProductFactory(price=Decimal("10.00"))
+        ProductFactory(price=Decimal("20.00"))
+        self.assertFalse(repair_product_summary())
+        self.api_client.get(PRODUCT_STATS_URL)
+        ProductSummary.objects.update(count=5, total_price=Decimal("1.00"))
+        call_command("repair_product_summary")
+        self.assertSummaryIsUpToDate()
+        # The cached stats are invalidated
+        self.assertEqual(self.api_client.get(PRODUCT_STATS_URL).json()["total_products"], 2)
+
+    def test_follows_bulk_writes(self) -> None:
+        Product.objects.bulk_create(
+            Product(name=f"Product {index}", description="", price=Decimal(index))
+            for index in range(1, 6)
+        )
+        self.assertSummaryIsUpToDate()
+        Product.objects.filter(price__gt=3).update(price=Decimal("1.25"))
+        self.assertSummaryIsUpToDate()
+        Product.objects.update(name="Renamed")
+        self.assertSummaryIsUpToDate()
+
+    def test_is_computed_if_missing(self) -> None:
+        ProductFactory.create_batch(2)
+        ProductSummary.objects.all().delete()
+        self.assertEqual(get_product_summary().count, 2)
+        self.assertSummaryIsUpToDate()
+
+    def test_endpoints_do_not_scan_products(self) -> None:
+        ProductFactory(price=Decimal("10.00"))
+        ProductFactory(price=Decimal("25.00"))
+        with self.assertNumQueries(1):
+            stats = self.api_client.get(PRODUCT_STATS_URL).json()
+        with self.assertNumQueries(1):
+            price_range = self.api_client.get(PRODUCT_PRICE_RANGE_URL).json()
+        self.assertEqual(stats["total_products"], 2)
+        self.assertEqual(stats["average_price"], 17.5)
+        self.assertEqual(price_range, {"min_price": 10.0, "max_price": 25.0, "count": 2})
+
+    def test_endpoints_without_products(self) -> None:
+        response = self.api_client.get(PRODUCT_PRICE_RANGE_URL)
+        self.assertEqual(response.json(), {"min_price": 0, "max_price": 0, "count": 0})
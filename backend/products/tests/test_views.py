@@ -0,0 +1,214 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+
+from core.tests import BaseActionTestCase
+from products.models import Product
+from products.tests.factories import ProductFactory
+from user.tests.factories import UserFactory
+
+PRODUCT_LIST_URL = reverse("product-list")
+PRODUCT_STATS_URL = reverse("product-stats")
+
+
+def product_detail_url(pk: int) -> str:
+    return reverse("product-detail", kwargs={"pk": pk})
+
+
+class ProductViewSetTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_list_is_served_from_cache(self) -> None:
+        ProductFactory.create_batch(3)
+        response = self.api_client.get(PRODUCT_LIST_URL)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            cached_response = self.api_client.get(PRODUCT_LIST_URL)
+        self.assertEqual(cached_response.status_code, 200)
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(cached_response["ETag"], response["ETag"])
+        self.assertEqual(cached_response["Content-Type"], "application/json")
+
+    def test_list_only_serializes_edited_products(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            first, second, third = ProductFactory.create_batch(3)
+        self.api_client.get(PRODUCT_LIST_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.name = "Renamed"
+            second.save()
+        with patch("core.fragment_cache.cache.set_many", wraps=cache.set_many) as set_many_mock:
+            # The count and page of ids and versions, then the edited product
+            with self.assertNumQueries(3):
+                response = self.api_client.get(PRODUCT_LIST_URL)
+        self.assertEqual(len(set_many_mock.call_args.args[0]), 1)
+        names = {product["id"]: product["name"] for product in response.json()["results"]}
+        self.assertEqual(names[second.pk], "Renamed")
+        self.assertEqual(names[first.pk], first.name)
+        self.assertEqual(names[third.pk], third.name)
+
+    def test_list_not_modified_if_etag_matches(self) -> None:
+        ProductFactory()
+        etag = self.api_client.get(PRODUCT_LIST_URL)["ETag"]
+        response = self.api_client.get(PRODUCT_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_list_is_paginated(self) -> None:
+        ProductFactory.create_batch(5)
+        response = self.api_client.get(PRODUCT_LIST_URL, {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 5)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertIsNone(response.json()["previous"])
+        self.assertIsNotNone(response.json()["next"])
+
+    def test_cached_list_links_follow_the_request(self) -> None:
+        ProductFactory.create_batch(3)
+        self.api_client.get(PRODUCT_LIST_URL, {"page_size": 2}, HTTP_HOST="localhost")
+        with self.assertNumQueries(0):
+            response = self.api_client.get(PRODUCT_LIST_URL, {"page_size": 2})
+        self.assertTrue(
+            response.json()["next"].startswith(f"http://testserver{PRODUCT_LIST_URL}?cursor=")
+        )
+
+    def test_list_pages_through_ties(self) -> None:
+        products = ProductFactory.create_batch(3, price=Decimal("10.00"))
+        products += ProductFactory.create_batch(2, price=Decimal("5.00"))
+        ids, previous, url = [], None, PRODUCT_LIST_URL
+        params = {"page_size": 2, "ordering": "price"}
+        while url:
+            response = self.api_client.get(url, params if url == PRODUCT_LIST_URL else None)
+            ids += [product["id"] for product in response.json()["results"]]
+            previous, url = response.json()["previous"], response.json()["next"]
+        expected = sorted(products, key=lambda product: (product.price, product.pk))
+        self.assertEqual(ids, [product.pk for product in expected])
+        # Going backwards from the last page
+        response = self.api_client.get(previous)
+        self.assertEqual(
+            [product["id"] for product in response.json()["results"]],
+            [product.pk for product in expected[2:4]],
+        )
+
+    def test_list_without_count(self) -> None:
+        ProductFactory.create_batch(2)
+        response = self.api_client.get(PRODUCT_LIST_URL, {"count": "false"})
+        self.assertNotIn("count", response.json())
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_list_page_size_is_bounded(self) -> None:
+        ProductFactory.create_batch(3)
+        with patch("products.pagination.ProductPagination.max_page_size", 2):
+            response = self.api_client.get(PRODUCT_LIST_URL, {"page_size": 1000})
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_list_invalid_cursor(self) -> None:
+        response = self.api_client.get(PRODUCT_LIST_URL, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_defaults_to_the_summary(self) -> None:
+        ProductFactory(price=Decimal("12.50"))
+        with CaptureQueriesContext(connection) as context:
+            response = self.api_client.get(PRODUCT_LIST_URL)
+        self.assertEqual(list(response.json()["results"][0]), ["id", "name", "price", "image"])
+        self.assertFalse(any("description" in query["sql"] for query in context.captured_queries))
+        response = self.api_client.get(PRODUCT_LIST_URL, {"representation": "full"})
+        self.assertIn("description", response.json()["results"][0])
+
+    def test_sparse_fieldsets(self) -> None:
+        product = ProductFactory(price=Decimal("12.50"))
+        response = self.api_client.get(PRODUCT_LIST_URL, {"fields": "price_display,name"})
+        self.assertEqual(
+            response.json()["results"], [{"name": product.name, "price_display": "$12.50"}]
+        )
+        response = self.api_client.get(
+            product_detail_url(product.pk), {"omit": "description,created_at,updated_at"}
+        )
+        self.assertEqual(
+            list(response.json()),
+            ["id", "name", "price", "price_display", "is_featured", "featured_rank", "image"],
+        )
+        # The selection is part of the cache key
+        response = self.api_client.get(product_detail_url(product.pk))
+        self.assertIn("description", response.json())
+
+    def test_sparse_fieldsets_are_validated(self) -> None:
+        invalid = (
+            {"fields": "name,secret"},
+            {"omit": "id,name,price,image"},
+            {"representation": "x"},
+        )
+        for params in invalid:
+            with self.subTest(params=params):
+                response = self.api_client.get(PRODUCT_LIST_URL, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_stats(self) -> None:
+        ProductFactory(price="10.00")
+        ProductFactory(price="30.00")
+        response = self.api_client.get(PRODUCT_STATS_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total_products"], 2)
+        self.assertEqual(response.json()["average_price"], 20.0)
+
+    def test_retrieve_not_found_is_cached(self) -> None:
+        response = self.api_client.get(product_detail_url(1))
+        self.assertEqual(response.status_code, 404)
+        with self.assertNumQueries(0):
+            response = self.api_client.get(product_detail_url(1))
+        self.assertEqual(response.status_code, 404)
+
+
+class ProductCacheInvalidationTestCase(BaseActionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_create_invalidates_list(self) -> None:
+        self.assertEqual(len(self.api_client.get(PRODUCT_LIST_URL).json()["results"]), 0)
+        self.api_client.force_authenticate(UserFactory())
+        payload = {"name": "Keyboard", "description": "Mechanical", "price": "99.90"}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.post(PRODUCT_LIST_URL, data=payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.api_client.get(PRODUCT_LIST_URL).json()["results"]), 1)
+
+    def test_update_only_invalidates_the_updated_detail(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            first, second = ProductFactory.create_batch(2)
+        self.api_client.get(product_detail_url(first.pk))
+        self.api_client.get(product_detail_url(second.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            first.name = "Renamed"
+            first.save()
+        with self.assertNumQueries(1):
+            response = self.api_client.get(product_detail_url(first.pk))
+        self.assertEqual(response.data["name"], "Renamed")
+        with self.assertNumQueries(0):
+            self.api_client.get(product_detail_url(second.pk))
+
+    def test_bulk_operations_invalidate(self) -> None:
+        product = ProductFactory(price="10.00")
+        self.api_client.get(product_detail_url(product.pk))
+        self.api_client.get(PRODUCT_STATS_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.update(price="20.00")
+        self.assertEqual(self.api_client.get(PRODUCT_STATS_URL).json()["max_price"], 20.0)
+        self.assertEqual(
+            self.api_client.get(product_detail_url(product.pk)).data["price"], "20.00"
+        )
+
+    def test_invalidations_are_sent_once_per_transaction(self) -> None:
+        products = ProductFactory.create_batch(3)
+        with patch("core.cache_invalidation.invalidate_cache_tags") as invalidate_mock:
+            with self.captureOnCommitCallbacks(execute=True):
+                for product in products:
+                    product.save()
+        self.assertEqual(invalidate_mock.call_count, 1)
+        self.assertIn("products:list", invalidate_mock.call_args.args)
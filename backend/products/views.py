@@ -1,29 +1,152 @@
 # File: products/views.py
+from operator import itemgetter
+
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from django.db.models import Q
-from core.cache import cache_api_response
+from core.cache import cache_api_response, get_cached_objects
+from core.fragment_cache import fragments_response, object_version
+from .cache import (
+    PRODUCT_DETAIL_CACHE_TAG,
+    PRODUCT_FACETS_CACHE_TAG,
+    PRODUCT_FEATURED_CACHE_TAG,
+    PRODUCT_FRAGMENT_NAMESPACE,
+    PRODUCT_LIST_CACHE_TAG,
+    PRODUCT_PRICE_RANGE_CACHE_TAG,
+    PRODUCT_STATS_CACHE_TAG,
+)
+from .changes import DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT, ExpiredCursor, get_changes
+from .exports import CONTENT_TYPES as EXPORT_CONTENT_TYPES, export_products
+from .facets import BUCKETINGS, DEFAULT_BUCKETS, FIXED, MAX_BUCKETS, price_histogram
+from .imports import (
+    CONTENT_TYPE_FORMATS,
+    IMPORT_BATCH_SIZE,
+    MAX_IMPORT_BATCH_SIZE,
+    decode_lines,
+    import_products,
+)
 from .models import Product
-from .serializers import ProductSerializer, ProductCreateSerializer
+from .pagination import ProductPagination
+from .representation import product_values, represent_products
+from .search import search_products
+from .summary import get_product_summary
+from .serializers import ProductSerializer, ProductCreateSerializer, ProductImageSerializer
+
+FEATURED_LIMIT = 6
+DETAIL_TIMEOUT = 6 * 3600
+MAX_BATCH_IDS = 100
+
 
 class ProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all().order_by('-created_at')
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = ProductPagination
     
+    # Actions whose products can be restricted with the `fields`, `omit` and `representation`
+    # parameters (see core.serializers.SparseFieldsetMixin), with their default representation
+    sparse_fieldset_actions = {'list': 'summary', 'retrieve': None}
+
     def get_serializer_class(self):
         if self.action == 'create':
             return ProductCreateSerializer
         return ProductSerializer
 
-    @cache_api_response(timeout=300, key_prefix="products:list", vary_on_params=True)
+    def get_serializer_fields(self):
+        if not hasattr(self, '_serializer_fields'):
+            self._serializer_fields = ProductSerializer.select_fields(
+                self.request.query_params, self.sparse_fieldset_actions[self.action]
+            )
+        return self._serializer_fields
+
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        """
+        Assembled from per-product fragments: editing a product only re-serializes that product.
+        Only the columns of the selected fields are loaded, and each selection has its fragments.
+        """
+        fields = self.get_serializer_fields()
+        page = self._list_page(request).data
+        return fragments_response(
+            request,
+            f"{PRODUCT_FRAGMENT_NAMESPACE}:{','.join(fields)}",
+            page["versions"],
+            load=lambda pks: product_values(Product.objects.filter(pk__in=pks), fields),
+            serialize=lambda rows: represent_products(rows, fields),
+            # Links built from this request: the cached page only has the cursors
+            envelope=self.paginator.link_page_info(
+                request, {key: value for key, value in page.items() if key != "versions"}
+            ),
+            get_pk=itemgetter('id'),
+        )
+
+    # Product writes invalidate these entries (see products.cache), hence the long timeouts
+    @cache_api_response(
+        timeout=3600,
+        key_prefix=PRODUCT_LIST_CACHE_TAG,
+        vary_on_params=True,
+        stale_timeout=60,
+        track_params=True,
+    )
+    def _list_page(self, request):
+        """
+        Ids and versions of the products of the requested page, with the pagination cursors.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).defer('description')
+        products = self.paginate_queryset(queryset)
+        return Response({
+            **self.paginator.get_page_info(),
+            'versions': [[product.pk, object_version(product.updated_at)] for product in products],
+        })
 
-    @cache_api_response(timeout=600, key_prefix="products:detail")
+    @cache_api_response(
+        timeout=DETAIL_TIMEOUT,
+        key_prefix=PRODUCT_DETAIL_CACHE_TAG,
+        negative_timeout=30,
+        object_kwarg="pk",
+    )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        fields = self.get_serializer_fields()
+        queryset = product_values(self.filter_queryset(self.get_queryset()), fields)
+        row = get_object_or_404(queryset, **{self.lookup_field: kwargs[self.lookup_field]})
+        return Response(represent_products([row], fields)[0])
+
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """
+        Get the products of the comma-separated `ids`, in that order, from the cached entries of
+        the detail endpoint: one MGET for all of them, one query for the ones not cached.
+        Ids without a product are listed in `missing`.
+        """
+        ids = [pk for pk in request.query_params.get('ids', '').split(',') if pk.strip()]
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in ids))
+        except ValueError:
+            ids = []
+        if not ids or len(ids) > MAX_BATCH_IDS:
+            return Response(
+                {'detail': f"ids must be 1 to {MAX_BATCH_IDS} comma-separated product ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fields = ProductSerializer.select_fields({})
+        products = get_cached_objects(
+            PRODUCT_DETAIL_CACHE_TAG,
+            ids,
+            load=lambda pks: {
+                product['id']: product
+                for product in represent_products(
+                    product_values(Product.objects.filter(pk__in=pks), fields), fields
+                )
+            },
+            timeout=DETAIL_TIMEOUT,
+        )
+        return Response({
+            'results': [products[pk] for pk in ids if pk in products],
+            'missing': [pk for pk in ids if pk not in products],
+        })
 
     def get_queryset(self):
         queryset = Product.objects.all().order_by('-created_at')
@@ -31,10 +154,8 @@ class ProductViewSet(viewsets.ModelViewSet):
         # Add search functionality
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search)
-            )
+            # Relevance-ranked full-text search, see products.search
+            queryset = search_products(queryset, search).order_by('-rank', '-pk')
         
         # Add price filtering
         min_price = self.request.query_params.get('min_price', None)
@@ -60,46 +181,173 @@ class ProductViewSet(viewsets.ModelViewSet):
         
         return queryset
     
-    @cache_api_response(timeout=600, key_prefix="products:featured")
+    # The same for every request, whatever its parameters: a single entry, kept in memory
+    # and recomputed (warmed) after product writes
+    @cache_api_response(
+        timeout=24 * 3600,
+        key_prefix=PRODUCT_FEATURED_CACHE_TAG,
+        vary_on_params=False,
+        stale_timeout=120,
+        cache_rendered=True,
+        local_timeout=30,
+    )
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """
-        Get featured products (first 6 products for now).
-        In the future, you could add a 'featured' boolean field to the Product model.
+        Get the featured products, by rank.
         """
-        featured_products = self.get_queryset()[:6]
-        serializer = self.get_serializer(featured_products, many=True)
-        return Response(serializer.data)
+        fields = ProductSerializer.select_fields({})
+        featured_products = product_values(Product.objects.featured(), fields)[:FEATURED_LIMIT]
+        return Response(represent_products(featured_products, fields))
 
-    @cache_api_response(timeout=900, key_prefix="products:price_range")
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Get the products changed or deleted since `cursor`, oldest first (see products.changes).
+        Clients mirroring the catalog poll with the returned cursor to only fetch the deltas.
+        """
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_CHANGES_LIMIT))
+        except ValueError:
+            limit = DEFAULT_CHANGES_LIMIT
+        limit = min(max(limit, 1), MAX_CHANGES_LIMIT)
+
+        try:
+            changes = get_changes(
+                request.query_params.get('cursor'), ProductSerializer.select_fields({}), limit
+            )
+        except ExpiredCursor:
+            return Response(
+                {'detail': "The cursor has expired, the catalog must be fetched again."},
+                status=status.HTTP_410_GONE,
+            )
+        except ValueError:
+            return Response({'detail': "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(changes)
+
+    @action(detail=True, methods=['put', 'delete'], parser_classes=[MultiPartParser, FormParser])
+    def image(self, request, pk=None):
+        """
+        Upload (multipart `image` field) or remove the image of a product. The upload returns
+        right away: the variants served to clients are generated in the background
+        (see products.images), the original is served until then.
+        """
+        product = self.get_object()
+        if request.method == 'DELETE':
+            product.image = ''
+            product.save()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = ProductImageSerializer(product, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        fields = ProductSerializer.select_fields({})
+        row = product_values(Product.objects.filter(pk=product.pk), fields).get()
+        return Response(represent_products([row], fields)[0], status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream all the products matching the list filters and ordering, as CSV or NDJSON
+        (`export_format` parameter, see products.exports).
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return Response(
+                {'detail': f"export_format must be one of {', '.join(EXPORT_CONTENT_TYPES)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            export_products(queryset, export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{export_format}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """
+        Import products from a CSV or NDJSON body, read as a stream (see products.imports).
+        Invalid rows are skipped and reported, as are rows replaced by a later row with the
+        same id.
+        """
+        format = CONTENT_TYPE_FORMATS.get(request.content_type.split(';')[0].strip())
+        if format is None:
+            return Response(
+                {'detail': f"Content type must be one of {', '.join(CONTENT_TYPE_FORMATS)}."},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        try:
+            batch_size = int(request.query_params.get('batch_size', IMPORT_BATCH_SIZE))
+        except ValueError:
+            batch_size = IMPORT_BATCH_SIZE
+        batch_size = min(max(batch_size, 1), MAX_IMPORT_BATCH_SIZE)
+
+        report = import_products(decode_lines(request.stream or ()), format, batch_size)
+        return Response(report.as_dict())
+
+    @cache_api_response(
+        timeout=3600, key_prefix=PRODUCT_PRICE_RANGE_CACHE_TAG, stale_timeout=300, cache_rendered=True, local_timeout=30
+    )
     @action(detail=False, methods=['get'])
     def price_range(self, request):
         """
-        Get the price range of all products (min and max prices).
+        Get the price range of all products (min and max prices), from the maintained summary.
         """
-        products = Product.objects.all()
-        if not products.exists():
+        summary = get_product_summary()
+        if summary.count == 0:
             return Response({
                 'min_price': 0,
                 'max_price': 0,
                 'count': 0
             })
 
-        prices = products.values_list('price', flat=True)
         return Response({
-            'min_price': min(prices),
-            'max_price': max(prices),
-            'count': len(prices)
+            'min_price': summary.min_price,
+            'max_price': summary.max_price,
+            'count': summary.count
         })
 
-    @cache_api_response(timeout=900, key_prefix="products:stats")
+    # Only the parameters filtering the products and shaping the histogram matter
+    @cache_api_response(
+        timeout=3600,
+        key_prefix=PRODUCT_FACETS_CACHE_TAG,
+        vary_on_params=('search', 'min_price', 'max_price', 'buckets', 'bucketing'),
+        stale_timeout=300,
+        cache_rendered=True,
+    )
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Get the price histogram of the products matching the list filters (see products.facets).
+        `buckets` sets the number of buckets, `bucketing` their kind (fixed or quantile).
+        """
+        bucketing = request.query_params.get('bucketing', FIXED)
+        try:
+            buckets = int(request.query_params.get('buckets', DEFAULT_BUCKETS))
+        except ValueError:
+            buckets = 0
+        if bucketing not in BUCKETINGS or not 1 <= buckets <= MAX_BUCKETS:
+            return Response(
+                {'detail': f"buckets must be between 1 and {MAX_BUCKETS}, "
+                           f"bucketing one of {', '.join(BUCKETINGS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({'price': price_histogram(self.get_queryset(), buckets, bucketing)})
+
+    @cache_api_response(
+        timeout=3600, key_prefix=PRODUCT_STATS_CACHE_TAG, stale_timeout=300, cache_rendered=True, local_timeout=30
+    )
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """
-        Get basic statistics about products.
+        Get basic statistics about products, from the maintained summary.
         """
-        total_products = Product.objects.count()
-        if total_products == 0:
+        summary = get_product_summary()
+        if summary.count == 0:
             return Response({
                 'total_products': 0,
                 'average_price': 0,
@@ -107,12 +355,9 @@ class ProductViewSet(viewsets.ModelViewSet):
                 'max_price': 0
             })
 
-        prices = Product.objects.values_list('price', flat=True)
-        average_price = sum(prices) / len(prices)
-
         return Response({
-            'total_products': total_products,
-            'average_price': round(average_price, 2),
-            'min_price': min(prices),
-            'max_price': max(prices)
+            'total_products': summary.count,
+            'average_price': round(summary.total_price / summary.count, 2),
+            'min_price': summary.min_price,
+            'max_price': summary.max_price
         })
\ No newline at end of file
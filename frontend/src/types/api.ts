@@ -29,11 +29,22 @@ export interface DownloadCategory {
 }
 
 // Product types
+export interface ProductImage {
+  src: string;
+  width: number;
+  height: number;
+  srcset: string;
+  webp_srcset: string;
+}
+
 export interface Product extends BaseModel {
   name: string;
   description: string;
   price: number;
   price_display: string;
+  is_featured: boolean;
+  featured_rank: number;
+  image: ProductImage | null;
 }
 
 // Stats types
@@ -50,6 +61,36 @@ export interface PriceRange {
   count: number;
 }
 
+export interface PriceHistogramBucket {
+  min: number;
+  max: number;
+  count: number;
+}
+
+export interface ProductFacets {
+  price: {
+    count: number;
+    min_price: number | null;
+    max_price: number | null;
+    buckets: PriceHistogramBucket[];
+  };
+}
+
+export interface ProductBatch {
+  results: Product[];
+  missing: number[];
+}
+
+export type ProductChange =
+  | { id: number; change: "updated"; product: Product }
+  | { id: number; change: "deleted" };
+
+export interface ProductChanges {
+  results: ProductChange[];
+  cursor: string | null;
+  has_more: boolean;
+}
+
 // API hook return type
 export interface ApiHookReturn<T> {
   data: T | null;